@@ -32,6 +32,10 @@ from typing import Any
 
 import yaml
 
+# libyaml's classes when PyYAML was built with it; both write the same bytes.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 KEYSERVERS = [
     "keys.openpgp.org",
     "keyserver.ubuntu.com",
@@ -253,7 +257,7 @@ def process(
 
     if manifest_path.exists():
         with manifest_path.open() as f:
-            manifest = yaml.safe_load(f) or default_manifest()
+            manifest = yaml.load(f, Loader=SafeLoader) or default_manifest()  # noqa: S506
     else:
         manifest_path.parent.mkdir(parents=True, exist_ok=True)
         manifest = default_manifest()
@@ -291,7 +295,7 @@ def process(
 
     manifest.setdefault("nodes", []).append(new_node)
     with manifest_path.open("w") as f:
-        yaml.dump(manifest, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(manifest, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
 
     result.node_name = node_name
     result.vpn_ip = next_ip
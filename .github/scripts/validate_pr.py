@@ -11,6 +11,8 @@ passed as the first argument) against the network model:
   * IPs are valid, inside the VPN network, and not shared across nodes
   * roles and status use known values
   * node names are unique
+  * field types match the manifest JSON schema (when ``redundanet`` is
+    installed, through its compiled validator; every violation is listed)
 
 Exits non-zero (and lists the problems) if the manifest is invalid.
 """
@@ -23,6 +25,18 @@ from pathlib import Path
 
 import yaml
 
+# libyaml's loader when PyYAML was built with it; far faster on big manifests.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+try:
+    from redundanet.core.manifest import MANIFEST_VALIDATOR
+    from redundanet.core.schema import describe
+except ImportError:  # pragma: no cover - the package is installed in CI
+    MANIFEST_VALIDATOR = None
+
+# Schema keywords whose failures the checks below already report by node name.
+_REPORTED_HERE = {"required", "enum"}
+
 VALID_ROLES = {"tinc_vpn", "tahoe_introducer", "tahoe_storage", "tahoe_client"}
 VALID_STATUS = {"active", "pending", "inactive"}
 
@@ -48,7 +62,7 @@ def validate(manifest_path: str) -> tuple[list[str], list[str]]:
 
     try:
         with Path(manifest_path).open() as f:
-            manifest = yaml.safe_load(f)
+            manifest = yaml.load(f, Loader=SafeLoader)  # noqa: S506 - a safe loader
     except FileNotFoundError:
         return [f"Manifest not found: {manifest_path}"], warnings
     except yaml.YAMLError as e:
@@ -57,6 +71,13 @@ def validate(manifest_path: str) -> tuple[list[str], list[str]]:
     if not isinstance(manifest, dict):
         return [f"{manifest_path}: top-level document must be a mapping"], warnings
 
+    if MANIFEST_VALIDATOR is not None:
+        errors.extend(
+            f"Schema: {describe(error)}"
+            for error in MANIFEST_VALIDATOR.iter_errors(manifest)
+            if error.validator not in _REPORTED_HERE
+        )
+
     # --- network section ---
     network = manifest.get("network")
     if not isinstance(network, dict):
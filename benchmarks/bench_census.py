@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark the share-census scanners on a synthetic Tahoe shares tree.
+
+Compares the original two-walk implementation (Path.iterdir for the index
+list, rglob + stat for the byte total) with the single-pass scandir scanner,
+serially and on a thread pool, plus an incremental CensusIndex refresh and a
+full rescan that also reads every share's lease records.
+
+    python benchmarks/bench_census.py [--objects 200000] [--shares 2] [--dir PATH]
+
+Point --dir at a directory on the disk you care about (an SD card, a spinning
+disk); the default temp dir is usually tmpfs or page-cached, where the thread
+pool has little I/O latency to hide and the gain is mostly fewer syscalls.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from redundanet.monitor.census import (
+    LEASE_DURATION_SECONDS,
+    CensusIndex,
+    bytes_to_si,
+    scan_shares,
+)
+
+
+def legacy_list_storage_indexes(shares_dir: Path) -> list[str]:
+    indexes: list[str] = []
+    for prefix in sorted(shares_dir.iterdir()):
+        if not prefix.is_dir() or prefix.name == "incoming":
+            continue
+        for si_dir in sorted(prefix.iterdir()):
+            if si_dir.is_dir() and any(p.is_file() for p in si_dir.iterdir()):
+                indexes.append(si_dir.name)
+    return indexes
+
+
+def legacy_disk_used_bytes(shares_dir: Path) -> int:
+    total = 0
+    for path in shares_dir.rglob("*"):
+        if path.is_file():
+            total += path.stat().st_size
+    return total
+
+
+def build_tree(root: Path, objects: int, shares: int) -> Path:
+    shares_dir = root / "shares"
+    for _ in range(objects):
+        si = bytes_to_si(os.urandom(16))
+        si_dir = shares_dir / si[:2] / si
+        si_dir.mkdir(parents=True, exist_ok=True)
+        for num in range(shares):
+            (si_dir / str(num)).write_bytes(b"\0" * 512)
+    return shares_dir
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=200_000)
+    parser.add_argument("--shares", type=int, default=2, help="share files per object")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", type=Path, default=None, help="where to build the tree")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        start = time.perf_counter()
+        shares_dir = build_tree(Path(tmp), args.objects, args.shares)
+        print(
+            f"built {args.objects} objects x {args.shares} shares "
+            f"in {time.perf_counter() - start:.1f}s under {tmp}"
+        )
+
+        expected = legacy_list_storage_indexes(shares_dir)
+        scan = scan_shares(shares_dir, workers=args.workers)
+        if scan.indexes != expected or scan.total_bytes != legacy_disk_used_bytes(shares_dir):
+            raise SystemExit("scan_shares disagrees with the legacy scanner")
+
+        index = CensusIndex(shares_dir, workers=args.workers)
+        index.refresh()
+
+        results = {
+            "legacy (iterdir + rglob)": timed(
+                lambda: (
+                    legacy_list_storage_indexes(shares_dir),
+                    legacy_disk_used_bytes(shares_dir),
+                ),
+                args.repeat,
+            ),
+            "scandir, 1 worker": timed(lambda: scan_shares(shares_dir, workers=1), args.repeat),
+            f"scandir, {args.workers} workers": timed(
+                lambda: scan_shares(shares_dir, workers=args.workers), args.repeat
+            ),
+            "CensusIndex refresh (unchanged)": timed(index.refresh, args.repeat),
+            "full rescan reading leases": timed(
+                lambda: CensusIndex(
+                    shares_dir, workers=args.workers, lease_duration=LEASE_DURATION_SECONDS
+                ).refresh(),
+                args.repeat,
+            ),
+        }
+
+    baseline = results["legacy (iterdir + rglob)"]
+    print(f"{'scanner':<36}{'seconds':>10}{'speedup':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<36}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark the hub's replication counting on synthetic node censuses.
+
+Compares the original per-object ``dict`` of holder counts (with each node's
+indexes held as a ``set``) against sorted IndexArrays counted by
+replication_counts — with NumPy when it is installed and with the pure-Python
+fallback — reporting the time per collection and the peak memory of building
+the held censuses and counting them.
+
+    python benchmarks/bench_replication.py [--objects 1000000] [--nodes 10] [--copies 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from redundanet.monitor import replication
+from redundanet.monitor.census import PackedIndexes
+from redundanet.monitor.replication import IndexArray, replication_counts
+
+
+def build_censuses(objects: int, nodes: int, copies: int) -> list[PackedIndexes]:
+    """Each object placed on ``copies`` random nodes, as sorted binary censuses."""
+    held: list[list[bytes]] = [[] for _ in range(nodes)]
+    rng = random.Random(0)  # noqa: S311 - reproducible placement, not a secret
+    for _ in range(objects):
+        key = os.urandom(16)
+        for node in rng.sample(range(nodes), min(copies, nodes)):
+            held[node].append(key)
+    return [PackedIndexes(b"".join(sorted(keys))) for keys in held]
+
+
+def legacy(censuses: list[PackedIndexes], target: int) -> tuple[int, int]:
+    sets = [set(census) for census in censuses]
+    holders: dict[bytes, int] = {}
+    for indexes in sets:
+        for storage_index in indexes:
+            holders[storage_index] = holders.get(storage_index, 0) + 1
+    return len(holders), sum(1 for count in holders.values() if count >= target)
+
+
+def engine(censuses: list[PackedIndexes], target: int) -> tuple[int, int]:
+    return replication_counts([IndexArray.from_values(c) for c in censuses], target)
+
+
+def measure(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """(median seconds, peak MiB allocated during one run)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples), peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=10)
+    parser.add_argument("--copies", type=int, default=3, help="nodes holding each object")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    censuses = build_censuses(args.objects, args.nodes, args.copies)
+    print(
+        f"built {args.objects} objects on {args.nodes} nodes x {args.copies} copies "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    target = min(args.copies, args.nodes)
+    expected = legacy(censuses, target)
+
+    runs: dict[str, Callable[[], tuple[int, int]]] = {
+        "legacy (set + dict of counts)": lambda: legacy(censuses, target)
+    }
+    if replication.np is not None:
+        runs["IndexArray, NumPy"] = lambda: engine(censuses, target)
+    numpy = replication.np
+
+    def fallback() -> tuple[int, int]:
+        replication.np = None
+        try:
+            return engine(censuses, target)
+        finally:
+            replication.np = numpy
+
+    runs["IndexArray, pure Python"] = fallback
+
+    results = {}
+    for name, run in runs.items():
+        if run() != expected:
+            raise SystemExit(f"{name} disagrees with the legacy counts")
+        results[name] = measure(run, args.repeat)
+
+    baseline = results["legacy (set + dict of counts)"][0]
+    print(f"{'engine':<34}{'seconds':>10}{'speedup':>10}{'peak MiB':>10}")
+    for name, (seconds, peak) in results.items():
+        print(f"{name:<34}{seconds:>10.3f}{baseline / seconds:>9.1f}x{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark manifest YAML load and dump, pure Python against libyaml.
+
+Builds synthetic manifests of 100, 1,000 and 10,000 nodes and times
+PyYAML's pure-Python SafeLoader/SafeDumper against the libyaml classes that
+redundanet.utils.yaml_io uses, checking first that both dump the same bytes.
+
+    python benchmarks/bench_yaml.py [--nodes 100 1000 10000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+import yaml
+
+from redundanet.utils import yaml_io
+
+
+def build_manifest(nodes: int) -> dict[str, Any]:
+    return {
+        "network": {
+            "name": "bench",
+            "version": "1.0.0",
+            "domain": "bench.local",
+            "vpn_network": "10.100.0.0/16",
+            "tahoe": {"shares_needed": 3, "shares_happy": 7, "shares_total": 10},
+        },
+        "introducer_furl": "pb://bench@tcp:10.100.0.1:3458/introducer",
+        "nodes": [
+            {
+                "name": f"node-{i:05d}",
+                "internal_ip": f"192.168.{i // 250}.{i % 250 + 1}",
+                "vpn_ip": f"10.100.{i // 250}.{i % 250 + 1}",
+                "gpg_key_id": f"{i:040X}",
+                "region": ("eu-west", "us-east", "ap-south")[i % 3],
+                "status": "active",
+                "roles": ["tinc_vpn", "tahoe_storage"],
+                "ports": {"tinc": 655, "tahoe_storage": 3457, "tahoe_client": 3456},
+                "storage_contribution": "500GB",
+                "is_publicly_accessible": i % 10 == 0,
+            }
+            for i in range(nodes)
+        ],
+    }
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not yaml_io.LIBYAML:
+        raise SystemExit("PyYAML was built without libyaml; nothing to compare")
+
+    def pure_dump(data: dict[str, Any]) -> str:
+        return yaml.dump(data, Dumper=yaml.SafeDumper, **yaml_io.DUMP_OPTIONS)
+
+    print(f"{'nodes':>7}{'op':>6}{'pure s':>10}{'libyaml s':>11}{'speedup':>9}")
+    for nodes in args.nodes:
+        manifest = build_manifest(nodes)
+        text = yaml_io.dump(manifest)
+        if text != pure_dump(manifest) or yaml_io.load(text) != yaml.safe_load(text):
+            raise SystemExit(f"libyaml and pure Python disagree at {nodes} nodes")
+        rows = {
+            "load": (
+                timed(lambda: yaml.load(text, Loader=yaml.SafeLoader), args.repeat),  # noqa: B023
+                timed(lambda: yaml_io.load(text), args.repeat),  # noqa: B023
+            ),
+            "dump": (
+                timed(lambda: pure_dump(manifest), args.repeat),  # noqa: B023
+                timed(lambda: yaml_io.dump(manifest), args.repeat),  # noqa: B023
+            ),
+        }
+        for op, (pure, fast) in rows.items():
+            print(f"{nodes:>7}{op:>6}{pure:>10.3f}{fast:>11.3f}{pure / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,10 +21,8 @@ import subprocess
 import time
 from pathlib import Path
 
-import yaml
-
 from redundanet.core.deployment import git_sync
-from redundanet.core.manifest import locate_manifest
+from redundanet.core.manifest import MANIFEST_CACHE, locate_manifest
 from redundanet.utils.logging import get_logger, setup_logging
 from redundanet.vpn.peers import sync_peer_host_files, tinc_name
 from redundanet.vpn.tinc import TincConfig, TincManager
@@ -64,7 +62,7 @@ def run_once(
     if manifest_file is None:
         logger.warning("No manifest.yaml present; nothing to sync")
         return False
-    manifest = yaml.safe_load(manifest_file.read_text()) or {}
+    manifest = MANIFEST_CACHE.load_dict(manifest_file)  # no YAML work if unchanged
     nodes = manifest.get("nodes", [])
 
     hosts_dir = config_dir / "hosts"
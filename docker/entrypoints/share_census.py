@@ -4,35 +4,90 @@
 Serves GET /census — the list of opaque storage indexes this node holds — so
 the hub's status page can compute per-object replication across the network.
 
+The census comes from a persistent index (CENSUS_INDEX_PATH) that a background
+thread refreshes incrementally every CENSUS_REFRESH_SECONDS; requests are
+answered from the ready-encoded snapshot and never walk the shares tree. Every
+response carries an ETag naming the census and its representation (encoding,
+sketch, since), and a hub that sends it back in If-None-Match for the same
+request gets a bodyless 304 while nothing changed. GET /census?since=<generation>
+returns only the storage indexes added and removed after that generation, or
+the full list when the generation is unknown or too old. Hubs that accept the
+binary census type get raw 16-byte indexes, gzip/zstd-encoded on request;
+everyone else gets JSON. GET /census?sketch=1 returns a bounded sample of the
+indexes plus a HyperLogLog instead, for hubs tracking very large grids.
+
+When share expiry is enabled (REDUNDANET_EXPIRE_ENABLED, the same settings the
+storage node's tahoe.cfg is rendered from) the census also carries a
+``leases`` section: a lease-age histogram and the shares and bytes that reach
+REDUNDANET_LEASE_DURATION within the next two weeks.
+
 SECURITY: binds the node's VPN IP only, so only authenticated mesh members can
 query it. Storage indexes reveal nothing about file contents, names, or owners.
 """
 
 from __future__ import annotations
 
-import json
+import contextlib
 import os
+import threading
 import time
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
-from redundanet.monitor.census import CENSUS_PORT, census_payload
+from redundanet.monitor.census import (
+    CENSUS_PORT,
+    CENSUS_REFRESH_SECONDS,
+    CensusIndex,
+    CensusSnapshot,
+    etag_matches,
+    parse_lease_duration,
+)
 from redundanet.utils.logging import get_logger, setup_logging
 
 SHARES_DIR = Path("/data/storage/shares")
+CENSUS_INDEX_PATH = Path("/data/storage/census-index.json")
+
+
+def refresher_loop(snapshot: CensusSnapshot) -> None:
+    logger = get_logger()
+    while True:
+        time.sleep(CENSUS_REFRESH_SECONDS)
+        try:
+            snapshot.refresh()
+        except Exception as e:  # keep serving the last census on any failure
+            logger.warning("Census refresh failed", error=str(e))
 
 
 class Handler(BaseHTTPRequestHandler):
     server_version = "redundanet-census"
-    node_name = "storage"
+    snapshot: CensusSnapshot | None = None
 
     def do_GET(self) -> None:
-        if not self.path.startswith("/census"):
+        url = urlsplit(self.path)
+        if url.path != "/census" or self.snapshot is None:
             self.send_error(404)
             return
-        body = json.dumps(census_payload(self.node_name, SHARES_DIR)).encode()
+        query = parse_qs(url.query)
+        since: int | None = None  # no usable generation: answer with the full census
+        with contextlib.suppress(KeyError, ValueError):
+            since = int(query["since"][0])
+        request = {
+            "since": since,
+            "sketch": query.get("sketch", ["0"])[0] == "1",
+            "accept": self.headers.get("Accept", ""),
+            "accept_encoding": self.headers.get("Accept-Encoding", ""),
+        }
+        etag = self.snapshot.etag_for(**request)
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body, headers = self.snapshot.response(**request)
         self.send_response(200)
-        self.send_header("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
@@ -44,12 +99,28 @@ class Handler(BaseHTTPRequestHandler):
 def main() -> None:
     setup_logging(level=os.environ.get("REDUNDANET_LOG_LEVEL", "INFO"))
     logger = get_logger()
-    Handler.node_name = os.environ.get("REDUNDANET_NODE_NAME", "storage")
+    node_name = os.environ.get("REDUNDANET_NODE_NAME", "storage")
     vpn_ip = os.environ.get("REDUNDANET_INTERNAL_VPN_IP", "")
     if not vpn_ip:
         logger.error("REDUNDANET_INTERNAL_VPN_IP is required")
         raise SystemExit(1)
 
+    lease_duration: int | None = None  # expiry off: nothing will be collected
+    if os.environ.get("REDUNDANET_EXPIRE_ENABLED", "true").lower() == "true":
+        try:
+            lease_duration = parse_lease_duration(
+                os.environ.get("REDUNDANET_LEASE_DURATION", "90 days")
+            )
+        except ValueError as e:
+            logger.warning("Lease census disabled", error=str(e))
+
+    # Build (or catch up) the persistent index before the first request.
+    index = CensusIndex(SHARES_DIR, CENSUS_INDEX_PATH, lease_duration=lease_duration)
+    snapshot = CensusSnapshot(node_name, index)
+    snapshot.refresh()
+    Handler.snapshot = snapshot
+    threading.Thread(target=refresher_loop, args=(snapshot,), daemon=True).start()
+
     # The VPN interface comes up after tinc starts; retry until we can bind.
     while True:
         try:
@@ -2,63 +2,96 @@
 """Public network-status page for the RedundaNet hub.
 
 Runs under supervisord next to tincd and the introducer. A background thread
-collects the network status every minute (manifest + VPN pings + introducer
-announcements); a stdlib HTTP server serves the cached snapshot:
+collects the network status (manifest + VPN pings + introducer announcements)
+every few seconds, probing only the nodes its scheduler has due: healthy ones
+every minute, flapping ones every run, unreachable ones with backoff. An
+asyncio HTTP/1.1 server (redundanet.monitor.httpd: keep-alive, a connection
+cap, read and write deadlines) serves the cached snapshot from one event loop:
 
     /             human status page
-    /status.json  machine-readable status (alerting hook)
+    /status.json  machine-readable status (alerting hook); ?summary=1 for the
+                  verdict and counts only
+                  Both take ?role=, ?state=online|offline|unknown, ?region= and
+                  ?page= (100 nodes each), answered from per-filter indexes
+                  built with the snapshot; the page is paged by default.
+    /history.json RTT/loss series of one node:
+                  ?node=NAME[&from=T][&to=T][&step=SECONDS], T = unix time or ISO
+                  8601; defaults to the last 24h. Downsampled server-side to at
+                  most 1000 min/avg/p95 buckets.
+    /events       server-sent events: "hello" with the live state's tag on
+                  connect, then a "diff" whenever a collection changes a node's
+                  state, the verdict or the notes; the page patches itself
+    /metrics      Prometheus metrics, rendered with each snapshot (plus its age)
     /healthz      liveness for the fly.io check
 
+REDUNDANET_CENSUS_MODE=sketch switches replication to estimates from census
+sketches for very large grids; the default "exact" mode counts every object.
+
+The page and /status.json are compressed once per snapshot (gzip, plus br and
+zstd when brotli/zstandard are installed) and carry a strong ETag: a request
+picks a variant by Accept-Encoding, and a matching If-None-Match gets a 304.
+
 A collector failure can never take the page down — the page keeps serving the
 last snapshot and shows how stale it is.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import os
-import subprocess
 import threading
 import time
+import urllib.error
+import urllib.parse
 import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http import HTTPStatus
 from pathlib import Path
-
-import yaml
-
-from redundanet.core.manifest import locate_manifest
-from redundanet.monitor.census import CENSUS_PORT
-from redundanet.monitor.render import render_html
-from redundanet.monitor.status import append_sample, collect_status, uptime_stats
+from typing import Any
+
+from redundanet.core.manifest import MANIFEST_CACHE, locate_manifest
+from redundanet.monitor.census import CENSUS_PORT, census_accept_headers, decode_census_response
+from redundanet.monitor.encoding import EncodedBody
+from redundanet.monitor.events import RETRY_MS, EventBroadcaster, sse_event
+from redundanet.monitor.history import HistoryStore
+from redundanet.monitor.httpd import HTTPServer, Request, Response, error_response
+from redundanet.monitor.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from redundanet.monitor.metrics import Histogram, render_metrics, snapshot_age_metric
+from redundanet.monitor.probe import probe
+from redundanet.monitor.render import render_diff, render_parts, state_tag
+from redundanet.monitor.schedule import ProbeScheduler
+from redundanet.monitor.status import (
+    CensusCache,
+    CollectorTimings,
+    NetworkStatus,
+    append_sample,
+    collect_status,
+    rtt_percentiles,
+    uptime_stats,
+)
+from redundanet.monitor.views import NodeQuery, StatusViews
 from redundanet.utils.logging import get_logger, setup_logging
 
 MANIFEST_DIR = Path("/var/lib/redundanet/manifest")
 FURL_PATH = Path("/var/lib/tahoe-introducer/private/introducer.furl")
-HISTORY_PATH = Path("/var/lib/tahoe-introducer/monitor/history.jsonl")
+HISTORY_PATH = Path("/var/lib/tahoe-introducer/monitor/history.bin")
+# Written by earlier versions; imported into HISTORY_PATH on first start.
+LEGACY_HISTORY_PATH = Path("/var/lib/tahoe-introducer/monitor/history.jsonl")
 INTRODUCER_JSON = "http://127.0.0.1:4458/?t=json"
 INTERVAL = 60
-
-
-def ping(vpn_ip: str) -> float | None:
-    """RTT in ms to a VPN IP, or None if unreachable."""
-    if not vpn_ip:
-        return None
-    try:
-        result = subprocess.run(
-            ["ping", "-c", "1", "-W", "2", vpn_ip], capture_output=True, text=True, timeout=5
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        return None
-    if result.returncode != 0:
-        return None
-    for token in result.stdout.split():
-        if token.startswith("time="):
-            try:
-                return float(token[5:])
-            except ValueError:
-                return None
-    return 0.0
+# The page says it is stale after this many seconds without a collection.
+STALE_AFTER = 5 * INTERVAL
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+# Open /events streams; each holds one of the front end's connections.
+MAX_EVENT_STREAMS = 192
+# Filtered or paged bodies kept per snapshot.
+VIEW_CACHE_SIZE = 64
+DEFAULT_QUERY = NodeQuery()
 
 
 def storage_server_count() -> int | None:
@@ -71,15 +104,68 @@ def storage_server_count() -> int | None:
         return None
 
 
-def fetch_census(vpn_ip: str) -> dict | None:
-    """A storage node's /census payload over the VPN, or None."""
+# Per storage node: the ETag of the census we hold, and the totals that came
+# with it — enough to answer a 304 without the node resending anything.
+_CENSUS_VALIDATORS: dict[str, tuple[str, dict]] = {}
+
+
+def fetch_census(vpn_ip: str, since: int | None = None) -> dict | None:
+    """A storage node's /census payload over the VPN, or None.
+
+    With ``since`` the node answers with only the indexes added and removed
+    after that generation (or the full census if it no longer has it). Nodes
+    that support it answer in the compact binary encoding, decoded straight
+    into packed 16-byte indexes; older nodes answer JSON. A delta request also
+    carries the ETag of the census we hold, and a 304 comes back as an empty
+    delta.
+    """
+    if not vpn_ip:
+        return None
+    query = f"?since={since}" if since is not None else ""
+    headers = census_accept_headers()
+    held = _CENSUS_VALIDATORS.get(vpn_ip)
+    if since is not None and held and held[1].get("generation") == since:
+        headers["If-None-Match"] = held[0]
+    request = urllib.request.Request(
+        f"http://{vpn_ip}:{CENSUS_PORT}/census{query}", headers=headers
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            payload = decode_census_response(
+                response.read(),
+                response.headers.get("Content-Type", ""),
+                response.headers.get("Content-Encoding", ""),
+            )
+            etag = response.headers.get("ETag", "")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and held and "If-None-Match" in headers:
+            return {**held[1], "since": since, "added": [], "removed": []}
+        return None
+    except Exception:
+        return None
+    if etag:
+        totals = ("node", "generation", "object_count", "disk_used_bytes", "leases")
+        _CENSUS_VALIDATORS[vpn_ip] = (etag, {k: payload[k] for k in totals if k in payload})
+    else:
+        _CENSUS_VALIDATORS.pop(vpn_ip, None)
+    return payload
+
+
+def fetch_census_sketch(vpn_ip: str) -> dict | None:
+    """A storage node's census sketch (sample + HyperLogLog) over the VPN, or None."""
     if not vpn_ip:
         return None
+    request = urllib.request.Request(
+        f"http://{vpn_ip}:{CENSUS_PORT}/census?sketch=1",
+        headers={"Accept-Encoding": census_accept_headers()["Accept-Encoding"]},
+    )
     try:
-        with urllib.request.urlopen(
-            f"http://{vpn_ip}:{CENSUS_PORT}/census", timeout=5
-        ) as response:
-            return json.load(response)
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            return decode_census_response(
+                response.read(),
+                response.headers.get("Content-Type", ""),
+                response.headers.get("Content-Encoding", ""),
+            )
     except Exception:
         return None
 
@@ -93,94 +179,395 @@ def manifest_synced_at() -> datetime | None:
     return datetime.fromtimestamp(source.stat().st_mtime, tz=UTC)
 
 
+@dataclass(frozen=True)
+class _View:
+    """One collection's output; replaced whole, never modified (but for its cache)."""
+
+    html: str
+    json_body: bytes
+    metrics: bytes
+    collected_at: float
+    page: EncodedBody
+    status: EncodedBody
+    summary: EncodedBody
+    state_tag: str = ""  # the page's live state, see render_diff
+    views: StatusViews | None = None
+    # Filtered, paged and stale-marked bodies, encoded on first request.
+    cache: dict[tuple[str, NodeQuery, bool], EncodedBody] = field(default_factory=dict)
+
+
 class Snapshot:
-    """The latest collected status, shared between collector and server."""
+    """The latest collected status, shared between collector and server.
+
+    The page and JSON are encoded once per collection (see
+    :class:`EncodedBody`); requests only pick a variant. Filtered and paged
+    views are cut from the snapshot's :class:`StatusViews` and kept until the
+    next one. The collector publishes a new :class:`_View` with one reference
+    swap, so readers never take a lock.
+    """
 
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self.html = "<html><body>collecting first sample…</body></html>"
-        self.json_body = b'{"overall": "starting"}'
-        self.collected_at = 0.0
+        html = "<html><body>collecting first sample…</body></html>"
+        json_body = b'{"overall": "starting"}'
+        starting = EncodedBody(json_body, JSON_CONTENT_TYPE)
+        self._view = _View(
+            html,
+            json_body,
+            b"",
+            0.0,
+            EncodedBody(html.encode(), HTML_CONTENT_TYPE),
+            starting,
+            starting,
+        )
 
-    def update(self, html: str, json_body: bytes) -> None:
-        with self._lock:
-            self.html = html
-            self.json_body = json_body
-            self.collected_at = time.time()
+    def update(
+        self,
+        html: str,
+        json_body: bytes,
+        metrics: bytes = b"",
+        state_tag: str = "",
+        views: StatusViews | None = None,
+        summary: bytes | None = None,
+    ) -> None:
+        status = EncodedBody(json_body, JSON_CONTENT_TYPE)
+        self._view = _View(
+            html,
+            json_body,
+            metrics,
+            time.time(),
+            EncodedBody(html.encode(), HTML_CONTENT_TYPE),
+            status,
+            status if summary is None else EncodedBody(summary, JSON_CONTENT_TYPE),
+            state_tag,
+            views,
+        )
 
     def get(self) -> tuple[str, bytes, float]:
-        with self._lock:
-            return self.html, self.json_body, self.collected_at
+        view = self._view
+        return view.html, view.json_body, view.collected_at
+
+    def get_metrics(self) -> tuple[bytes, float]:
+        view = self._view
+        return view.metrics, view.collected_at
+
+    @staticmethod
+    def _remember(view: _View, key: tuple[str, NodeQuery, bool], body: EncodedBody) -> EncodedBody:
+        if len(view.cache) >= VIEW_CACHE_SIZE:
+            del view.cache[next(iter(view.cache))]  # the oldest
+        view.cache[key] = body
+        return body
+
+    def get_page(self, query: NodeQuery = DEFAULT_QUERY) -> EncodedBody | None:
+        """The page for ``query``, marked stale once the collector has fallen
+        behind; None if the query asks for a page past the last. Raises
+        ValueError for a role or region no node has."""
+        view = self._view
+        stale = bool(view.collected_at) and time.time() - view.collected_at > STALE_AFTER
+        if view.views is None or (query == DEFAULT_QUERY and not stale):
+            return view.page
+        key = ("html", query, stale)
+        cached = view.cache.get(key)
+        if cached is not None:
+            return cached
+        view.views.index.check(query)
+        html = view.html
+        if query != DEFAULT_QUERY:
+            page = view.views.page(query)
+            if page is None:
+                return None
+            html = view.views.html(query, page)
+        if stale:
+            since = datetime.fromtimestamp(view.collected_at, tz=UTC)
+            html = html.replace("</body>", f"<!-- stale since {since} --></body>")
+        return self._remember(view, key, EncodedBody(html.encode(), HTML_CONTENT_TYPE))
+
+    def get_status(self, query: NodeQuery = DEFAULT_QUERY) -> EncodedBody | None:
+        """/status.json for ``query``: every node by default, else a filtered page.
+
+        Raises ValueError for a role or region no node has.
+        """
+        view = self._view
+        if view.views is None or query == DEFAULT_QUERY:
+            return view.status
+        key = ("json", query, False)
+        cached = view.cache.get(key)
+        if cached is not None:
+            return cached
+        view.views.index.check(query)
+        page = view.views.page(query)
+        if page is None:
+            return None
+        body = EncodedBody(view.views.json(query, page), JSON_CONTENT_TYPE)
+        return self._remember(view, key, body)
+
+    def get_summary(self) -> EncodedBody:
+        return self._view.summary
+
+    def get_state_tag(self) -> str:
+        return self._view.state_tag
 
 
 SNAPSHOT = Snapshot()
+# Storage nodes' censuses, held between collections so each poll is a delta.
+CENSUS_CACHE = CensusCache()
+# Which nodes each collector run probes; it runs every SCHEDULER.tick seconds.
+SCHEDULER = ProbeScheduler(base_interval=INTERVAL)
+# Open /events streams, and the live page state the last patch was made from.
+EVENTS = EventBroadcaster()
+LIVE_STATE: dict[str, Any] | None = None
 
 
-def collect_once(node_name: str) -> None:
-    logger = get_logger()
-    manifest_file = locate_manifest(MANIFEST_DIR)
-    manifest = {}
-    if manifest_file is not None:
-        manifest = yaml.safe_load(manifest_file.read_text()) or {}
+@dataclass(frozen=True)
+class _Built:
+    """What the current snapshot was built from."""
+
+    manifest: dict[str, Any]  # the parsed manifest, shared by MANIFEST_CACHE while unchanged
+    result: str  # the status without its timestamps, serialized
+
+    def unchanged(self, manifest: dict[str, Any], result: str | None = None) -> bool:
+        same_manifest = manifest is self.manifest or not (manifest or self.manifest)
+        return same_manifest and (result is None or result == self.result)
+
+
+# Most collector runs probe few nodes or none: a run that changes nothing keeps
+# the snapshot (and skips the history scans, rendering and metrics). The
+# snapshot is still rebuilt whenever a history sample is due, an INTERVAL after
+# the last one.
+BUILT: _Built | None = None
+# Uptime windows and RTT percentiles for the history store they were scanned
+# from, scanned again only when a sample is added.
+HISTORY_STATS: tuple[HistoryStore, dict[int, dict[str, float]], dict[str, Any]] | None = None
+
+
+# Duration of each collect_once phase, over the process's lifetime.
+PHASES: defaultdict[str, Histogram] = defaultdict(Histogram)
+
+
+# Held while the history is written or read: the collector may grow its files.
+HISTORY_LOCK = threading.Lock()
 
+
+@functools.cache
+def history_store() -> HistoryStore:
+    """The uptime history ring buffer, opened (and migrated) on first use."""
+    return HistoryStore.open(HISTORY_PATH, legacy=LEGACY_HISTORY_PATH)
+
+
+def sample_due(now: float) -> bool:
+    """Whether an INTERVAL has passed since the newest history sample."""
+    with HISTORY_LOCK:
+        newest = history_store().newest
+    return newest is None or now - newest >= INTERVAL - SCHEDULER.tick / 2
+
+
+def _parse_time(value: str) -> float:
+    """Unix seconds or an ISO 8601 time (UTC unless it says otherwise)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)).timestamp()
+
+
+def history_series(query: str) -> tuple[int, dict]:
+    """``(HTTP status, JSON body)`` for a /history.json query string."""
+    params = {k: v[-1] for k, v in urllib.parse.parse_qs(query).items()}
+    node = params.get("node")
+    if not node:
+        return 400, {"error": "node is required"}
+    try:
+        end = _parse_time(params["to"]) if "to" in params else time.time()
+        start = _parse_time(params["from"]) if "from" in params else end - 86400
+        step = int(params["step"]) if "step" in params else None
+    except ValueError as e:
+        return 400, {"error": f"bad query: {e}"}
+    if start >= end or (step is not None and step <= 0):
+        return 400, {"error": "need from < to and a positive step"}
+    with HISTORY_LOCK:
+        history = history_store()
+        if node not in history.latency_samples and node not in history.daily:
+            return 404, {"error": f"no history for node {node!r}"}
+        return 200, history.latency(node, start, end, step)
+
+
+def result_key(status: NetworkStatus) -> str:
+    """The status as it would be served, bar when and how long it took to collect."""
+    data = status.to_dict()
+    data.pop("generated_at", None)
+    data.pop("collector", None)
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def collect_once(node_name: str, census_mode: str = "exact", carry_forward: bool = False) -> None:
+    """Collect the status and rebuild the snapshot.
+
+    With ``carry_forward`` (the collector loop) a run keeps the previous
+    snapshot when the scheduler has nothing due, or when what it probed and
+    fetched changed nothing, unless a history sample is due.
+    """
+    global LIVE_STATE, BUILT, HISTORY_STATS
+    logger = get_logger()
+    started = time.perf_counter()
+    now = time.time()
+    timings = CollectorTimings(interval=INTERVAL)
+    with timings.phase("manifest"):
+        manifest_file = locate_manifest(MANIFEST_DIR)
+        manifest = {}
+        if manifest_file is not None:  # parsed again only when the file changes
+            manifest = MANIFEST_CACHE.load_dict(manifest_file)
+
+    sampling = sample_due(now)
+    built = None if sampling or not carry_forward else BUILT
+    if built is not None and built.unchanged(manifest) and not SCHEDULER.due(now):
+        logger.debug("Nothing due; snapshot carried forward")
+        return
+
+    with timings.phase("introducer"):
+        storage_connected = storage_server_count()
     status = collect_status(
         manifest=manifest,
         self_name=node_name,
-        ping=ping,
-        storage_connected=storage_server_count(),
+        ping=None,
+        probe_batch=probe,  # every node from one ICMP socket: RTT over 3 echoes, loss
+        storage_connected=storage_connected,
         furl_present=FURL_PATH.exists() and FURL_PATH.stat().st_size > 0,
         manifest_synced_at=manifest_synced_at(),
+        now=datetime.fromtimestamp(now, UTC),
         fetch_census=fetch_census,
+        census_cache=CENSUS_CACHE,
+        fetch_sketch=fetch_census_sketch if census_mode == "sketch" else None,
+        timings=timings,
+        scheduler=SCHEDULER,
     )
-    append_sample(HISTORY_PATH, status)
-    uptimes = uptime_stats(HISTORY_PATH, timedelta(hours=24))
+    result = result_key(status)
+    if built is not None and built.unchanged(manifest, result):
+        logger.debug("No result changed; snapshot carried forward")
+        EVENTS.publish(sse_event("updated", status.generated_at))
+        return
+    with timings.phase("history"), HISTORY_LOCK:
+        history = history_store()
+        # One sample per INTERVAL whatever the run rate, unprobed nodes at
+        # their last state: uptime weighs every node's time equally.
+        stats = HISTORY_STATS if HISTORY_STATS and HISTORY_STATS[0] is history else None
+        if sampling:
+            append_sample(history, status)
+            stats = None
+        if stats is None:
+            windows = {days: uptime_stats(history, timedelta(days=days)) for days in (1, 7, 30, 90)}
+            stats = HISTORY_STATS = (history, windows, rtt_percentiles(history, timedelta(days=1)))
+        _, windows, percentiles = stats
     for node in status.nodes:
-        node.uptime_24h = uptimes.get(node.name)
-
-    SNAPSHOT.update(
-        render_html(status),
-        json.dumps(status.to_dict(), indent=1).encode(),
+        node.rtt_p50_ms, node.rtt_p95_ms = percentiles.get(node.name, (None, None))
+        node.uptime_24h = windows[1].get(node.name)
+        node.uptime_7d = windows[7].get(node.name)
+        node.uptime_30d = windows[30].get(node.name)
+        node.uptime_90d = windows[90].get(node.name)
+
+    # Everything but rendering, which has to see the note.
+    timings.total = round(time.perf_counter() - started, 4)
+    if timings.overran:
+        slowest = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in timings.slowest())
+        status.notes.append(
+            f"the last collection took {timings.total:.0f}s, longer than its {INTERVAL}s "
+            f"interval (slowest: {slowest})"
+        )
+    with timings.phase("render_html"):
+        views = StatusViews(status, render_parts(status))
+        html = views.html(DEFAULT_QUERY, views.first_page())
+    timings.total = round(time.perf_counter() - started, 4)
+    json_body = json.dumps(status.to_dict(), indent=1).encode()
+    for phase, seconds in timings.phases.items():
+        PHASES[phase].observe(seconds)
+    metrics = render_metrics(status, PHASES, time.time()).encode()
+    LIVE_STATE, diff = render_diff(LIVE_STATE, status)
+    summary = json.dumps(status.summary_dict(), indent=1).encode()
+    SNAPSHOT.update(html, json_body, metrics, state_tag(LIVE_STATE), views, summary)
+    BUILT = _Built(manifest, result)
+    # After the update: a viewer reloading now gets the new page. Live pages
+    # hear of every collection, so their "updated" time stays current.
+    if diff is not None:
+        EVENTS.publish(sse_event("diff", json.dumps(diff, separators=(",", ":"))))
+    else:
+        EVENTS.publish(sse_event("updated", status.generated_at))
+    logger.info(
+        "Status collected",
+        overall=status.overall,
+        duration_s=timings.total,
+        overran=timings.overran,
+        **{f"{phase}_s": seconds for phase, seconds in timings.phases.items()},
     )
-    logger.info("Status collected", overall=status.overall)
+    logger.debug("Collection node timings", nodes=timings.nodes)
 
 
-def collector_loop(node_name: str) -> None:
+def collector_loop(node_name: str, census_mode: str = "exact") -> None:
     logger = get_logger()
     while True:
         try:
-            collect_once(node_name)
+            collect_once(node_name, census_mode, carry_forward=True)
         except Exception as e:  # the page must survive any collector failure
             logger.warning("Status collection failed", error=str(e))
-        time.sleep(INTERVAL)
-
-
-class Handler(BaseHTTPRequestHandler):
-    server_version = "redundanet-status"
-
-    def do_GET(self) -> None:
-        html, json_body, collected_at = SNAPSHOT.get()
-        if self.path.startswith("/healthz"):
-            body, ctype = b"ok\n", "text/plain"
-        elif self.path.startswith("/status.json"):
-            body, ctype = json_body, "application/json"
-        elif self.path in ("/", "/index.html"):
-            stale = time.time() - collected_at > 5 * INTERVAL
-            if stale and collected_at:
-                marker = f"<!-- stale since {datetime.fromtimestamp(collected_at, tz=UTC)} -->"
-                html = html.replace("</body>", marker + "</body>")
-            body, ctype = html.encode(), "text/html; charset=utf-8"
-        else:
-            self.send_error(404)
-            return
-        self.send_response(200)
-        self.send_header("Content-Type", ctype)
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-cache")
-        self.end_headers()
-        self.wfile.write(body)
-
-    def log_message(self, *args: object) -> None:  # quiet access log
-        pass
+        time.sleep(SCHEDULER.tick)
+
+
+def encoded_response(encoded: EncodedBody, request: Request) -> Response:
+    """A pre-encoded body in the client's preferred coding, or 304 if it has it."""
+    accept_encoding = request.headers.get("accept-encoding", "")
+    coding, body, etag = encoded.negotiate(accept_encoding)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if encoded.not_modified(request.headers.get("if-none-match", ""), accept_encoding):
+        return Response(HTTPStatus.NOT_MODIFIED, headers=headers)
+    headers["Content-Type"] = encoded.content_type
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(HTTPStatus.OK, body, headers)
+
+
+async def route(request: Request) -> Response:
+    """Answer one request from the cached snapshot."""
+    path = request.path
+    if path in ("/", "/index.html", "/status.json"):
+        params = urllib.parse.parse_qs(request.query, keep_blank_values=True)
+        if path == "/status.json" and params.get("summary", ["0"])[-1] != "0":
+            return encoded_response(SNAPSHOT.get_summary(), request)
+        get = SNAPSHOT.get_status if path == "/status.json" else SNAPSHOT.get_page
+        try:
+            encoded = get(NodeQuery.parse(request.query))
+        except ValueError as e:
+            return error_response(HTTPStatus.BAD_REQUEST, str(e))
+        if encoded is None:
+            return error_response(HTTPStatus.NOT_FOUND, "no such page")
+        return encoded_response(encoded, request)
+    if path == "/events":
+        if EVENTS.subscribers >= MAX_EVENT_STREAMS:  # leave connections for page loads
+            busy = error_response(HTTPStatus.SERVICE_UNAVAILABLE, "too many event streams")
+            busy.headers["Retry-After"] = "30"
+            return busy
+        hello = sse_event("hello", SNAPSHOT.get_state_tag(), retry_ms=RETRY_MS)
+        headers = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        return Response(HTTPStatus.OK, headers=headers, stream=EVENTS.stream(hello))
+    if path == "/healthz":
+        return Response(HTTPStatus.OK, b"ok\n", {"Content-Type": "text/plain"})
+    if path == "/metrics":
+        metrics, collected_at = SNAPSHOT.get_metrics()
+        if not collected_at:
+            return error_response(HTTPStatus.SERVICE_UNAVAILABLE, "no snapshot collected yet")
+        body = metrics + snapshot_age_metric(time.time() - collected_at).encode()
+        headers = {"Content-Type": METRICS_CONTENT_TYPE, "Cache-Control": "no-cache"}
+        return Response(HTTPStatus.OK, body, headers)
+    if path == "/history.json":
+        # Off the event loop: it reads files and may wait for the collector.
+        code, series = await asyncio.to_thread(history_series, request.query)
+        body = json.dumps(series, separators=(",", ":")).encode()
+        return Response(
+            code, body, {"Content-Type": JSON_CONTENT_TYPE, "Cache-Control": "no-cache"}
+        )
+    return error_response(HTTPStatus.NOT_FOUND)
+
+
+async def serve(port: int) -> None:
+    server = await HTTPServer(route).start("0.0.0.0", port)  # noqa: S104
+    async with server:
+        await server.serve_forever()
 
 
 def main() -> None:
@@ -188,10 +575,13 @@ def main() -> None:
     logger = get_logger()
     node_name = os.environ.get("REDUNDANET_NODE_NAME", "hub")
     port = int(os.environ.get("REDUNDANET_STATUS_PORT", "8080"))
+    # "exact" holds every storage index; "sketch" estimates replication at
+    # bounded memory per node, for grids with tens of millions of objects.
+    census_mode = os.environ.get("REDUNDANET_CENSUS_MODE", "exact")
 
-    threading.Thread(target=collector_loop, args=(node_name,), daemon=True).start()
+    threading.Thread(target=collector_loop, args=(node_name, census_mode), daemon=True).start()
     logger.info("Status server listening", port=port)
-    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()  # noqa: S104
+    asyncio.run(serve(port))
 
 
 if __name__ == "__main__":
@@ -63,16 +63,12 @@ def get_introducer_furl() -> str | None:
 
     # Check manifest.yaml (top-level introducer_furl key); the manifest dir may
     # be a plain dir or a full repo clone (manifests/manifest.yaml).
-    from redundanet.core.manifest import locate_manifest
+    # Polled until the FURL shows up: the cache parses it only when it changes.
+    from redundanet.core.manifest import MANIFEST_CACHE, locate_manifest
 
     manifest_file = locate_manifest(manifest_dir)
     if manifest_file is not None:
-        import yaml
-
-        with manifest_file.open() as f:
-            manifest = yaml.safe_load(f) or {}
-
-        furl = manifest.get("introducer_furl")
+        furl = MANIFEST_CACHE.load_dict(manifest_file).get("introducer_furl")
         if furl:
             logger.info("Found introducer FURL in manifest.yaml")
             return furl
@@ -93,9 +93,9 @@ def main() -> None:
     nodes: list[dict] = []
     manifest_file = locate_manifest(MANIFEST_DIR)
     if manifest_file is not None:
-        import yaml
+        from redundanet.utils import yaml_io
 
-        manifest = yaml.safe_load(manifest_file.read_text()) or {}
+        manifest = yaml_io.load_file(manifest_file) or {}
         nodes = manifest.get("nodes", [])
     else:
         logger.warning("No manifest found in %s; starting with no peers", str(MANIFEST_DIR))
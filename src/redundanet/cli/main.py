@@ -18,6 +18,7 @@ from redundanet.cli.node import app as node_app
 from redundanet.cli.storage import app as storage_app
 from redundanet.core.config import load_settings
 from redundanet.core.deployment import Deployment, git_sync
+from redundanet.core.exceptions import ValidationError
 from redundanet.core.manifest import Manifest
 from redundanet.utils.logging import setup_logging
 
@@ -464,6 +465,12 @@ def validate_manifest(
     """
     try:
         manifest = Manifest.from_file(manifest_path)
+    except ValidationError as e:
+        # Every schema violation, not just the first, so one run fixes them all.
+        console.print(f"[red]Validation failed:[/red] {e.message}")
+        for error in e.errors:
+            console.print(f"  [red]✗[/red] {error}")
+        raise typer.Exit(1) from None
     except Exception as e:
         console.print(f"[red]Validation failed:[/red] {e}")
         raise typer.Exit(1) from None
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import shutil
 from pathlib import Path
 from typing import Annotated, Any
@@ -98,6 +99,28 @@ def _load_manifest(settings: AppSettings) -> Manifest | None:
         return None
 
 
+def _probe_peers(
+    deployment: Deployment, settings: AppSettings, targets: list[str]
+) -> dict[str, dict[str, Any]] | None:
+    """Echo statistics for every peer from one batch probe in the tinc container.
+
+    The VPN only exists inside the tinc container's network namespace, so the
+    prober runs there. None if the container's image predates the prober.
+    """
+    if not targets:
+        return {}
+    result = deployment.exec(
+        settings.tinc_service, ["python", "-m", "redundanet.monitor.probe", "--json", *targets]
+    )
+    if not result.success:
+        return None
+    try:
+        stats = json.loads(result.stdout)
+    except ValueError:
+        return None
+    return stats if isinstance(stats, dict) else None
+
+
 def _print_peer_table(
     deployment: Deployment,
     settings: AppSettings,
@@ -109,17 +132,32 @@ def _print_peer_table(
     table.add_column("Node", style="cyan")
     table.add_column("VPN IP", style="green")
     table.add_column("Status")
-
-    for node in manifest.nodes:
-        if node.name == settings.node_name:
-            continue
-        target = node.vpn_ip or node.internal_ip
-        ping = deployment.exec(settings.tinc_service, ["ping", "-c", "1", "-W", "1", target])
-        online = ping.success
+    table.add_column("RTT (min/avg)", justify="right")
+    table.add_column("Loss", justify="right")
+
+    peers = [
+        (node.name, node.vpn_ip or node.internal_ip)
+        for node in manifest.nodes
+        if node.name != settings.node_name
+    ]
+    stats = _probe_peers(deployment, settings, [target for _, target in peers])
+
+    for name, target in peers:
+        rtt = loss = "—"
+        if stats is not None:
+            entry = stats.get(target) or {}
+            online = bool(entry.get("rtts_ms"))
+            if online:
+                rtt = f"{entry['min_ms']:.1f}/{entry['avg_ms']:.1f} ms"
+            if entry.get("loss_pct") is not None:
+                loss = f"{entry['loss_pct']:.0f}%"
+        else:  # older tinc image: one ping per peer
+            ping = deployment.exec(settings.tinc_service, ["ping", "-c", "1", "-W", "1", target])
+            online = ping.success
         if online_only and not online:
             continue
         status = "[green]online[/green]" if online else "[red]offline[/red]"
-        table.add_row(node.name, target, status)
+        table.add_row(name, target, status, rtt, loss)
 
     console.print(table)
 
@@ -192,12 +230,11 @@ def _load_manifest_dict(manifest_path: Path) -> dict[str, Any]:
     repo) must produce a clean, actionable error — not a raw traceback (a
     fresh node hit exactly that during a join).
     """
-    import yaml
+    from redundanet.utils import yaml_io
 
     try:
-        with manifest_path.open() as f:
-            data = yaml.safe_load(f)
-    except yaml.YAMLError as e:
+        data = yaml_io.load_file(manifest_path)
+    except yaml_io.YAMLError as e:
         console.print(f"[red]Error:[/red] the synced manifest is not valid YAML: {e}")
         console.print(
             "This usually means a broken commit landed on the manifest repository. "
@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, NamedTuple
 
-import yaml
-from jsonschema import ValidationError as JsonSchemaValidationError
-from jsonschema import validate
-
 from redundanet.core.config import NetworkConfig, NodeConfig
 from redundanet.core.exceptions import ManifestError, ValidationError
+from redundanet.core.schema import SchemaValidator
+from redundanet.utils import yaml_io
 
 
 class ManifestValidation(NamedTuple):
@@ -62,7 +65,8 @@ MANIFEST_SCHEMA: dict[str, Any] = {
                 "type": "object",
                 "required": ["name", "internal_ip"],
                 "properties": {
-                    "name": {"type": "string"},
+                    # The uptime history keeps 64 bytes of a name (ASCII, see NodeConfig).
+                    "name": {"type": "string", "maxLength": 64},
                     "internal_ip": {"type": "string"},
                     "vpn_ip": {"type": "string"},
                     "public_ip": {"type": "string"},
@@ -99,6 +103,9 @@ MANIFEST_SCHEMA: dict[str, Any] = {
     },
 }
 
+# Checked and compiled once; reused by every Manifest.from_dict and by the CI gate.
+MANIFEST_VALIDATOR = SchemaValidator(MANIFEST_SCHEMA)
+
 
 def locate_manifest(manifest_dir: Path, filename: str = "manifest.yaml") -> Path | None:
     """Find the manifest file under a manifest directory.
@@ -115,8 +122,69 @@ def locate_manifest(manifest_dir: Path, filename: str = "manifest.yaml") -> Path
     return None
 
 
+# Nodes sharing one index value, keyed by id() so duplicates and removal are
+# O(1); insertion order is manifest order.
+_Bucket = dict[int, NodeConfig]
+
+
+class _NodeIndex:
+    """Secondary indexes over a manifest's nodes, each mapping a value to its nodes.
+
+    Built in one pass and updated per node, so lookups and validation never
+    scan the node list. A node's index keys are read when it is added and
+    removed; a node changed in place must be re-indexed (see
+    :meth:`Manifest.reindex`).
+    """
+
+    def __init__(self, nodes: Iterable[NodeConfig]) -> None:
+        self.by_name: dict[str, _Bucket] = {}
+        self.by_role: dict[str, _Bucket] = {}
+        self.by_ip: dict[str, _Bucket] = {}  # internal_ip and vpn_ip
+        self.by_key_id: dict[str, _Bucket] = {}
+        self.by_region: dict[str, _Bucket] = {}
+        for node in nodes:
+            self.add(node)
+
+    def _keys(self, node: NodeConfig) -> Iterator[tuple[dict[str, _Bucket], str]]:
+        yield self.by_name, node.name
+        for role in dict.fromkeys(r.value for r in node.roles):
+            yield self.by_role, role
+        for ip in dict.fromkeys((node.internal_ip, node.vpn_ip)):
+            if ip:
+                yield self.by_ip, ip
+        if node.gpg_key_id:
+            yield self.by_key_id, node.gpg_key_id
+        if node.region:
+            yield self.by_region, node.region
+
+    def add(self, node: NodeConfig) -> None:
+        for index, key in self._keys(node):
+            index.setdefault(key, {})[id(node)] = node
+
+    def remove(self, node: NodeConfig) -> None:
+        for index, key in self._keys(node):
+            bucket = index[key]
+            del bucket[id(node)]
+            if not bucket:
+                del index[key]
+
+    @staticmethod
+    def first(index: dict[str, _Bucket], key: str) -> NodeConfig | None:
+        bucket = index.get(key)
+        return next(iter(bucket.values())) if bucket else None
+
+    @staticmethod
+    def every(index: dict[str, _Bucket], key: str) -> list[NodeConfig]:
+        return list(index.get(key, {}).values())
+
+
 class Manifest:
-    """Manages the RedundaNet network manifest."""
+    """Manages the RedundaNet network manifest.
+
+    Nodes are indexed by name, role, IP (internal and VPN), GPG key id and
+    region. Change the node list through :meth:`add_node` and
+    :meth:`remove_node` (or assign ``nodes`` as a whole) so the indexes follow.
+    """
 
     def __init__(
         self,
@@ -129,6 +197,19 @@ class Manifest:
         self.introducer_furl = introducer_furl
         self._path: Path | None = None
 
+    @property
+    def nodes(self) -> list[NodeConfig]:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: list[NodeConfig]) -> None:
+        self._nodes = nodes
+        self._index = _NodeIndex(nodes)
+
+    def reindex(self) -> None:
+        """Rebuild the node indexes after nodes were changed in place."""
+        self._index = _NodeIndex(self._nodes)
+
     @classmethod
     def from_file(cls, path: Path | str) -> Manifest:
         """Load manifest from a YAML file."""
@@ -137,9 +218,8 @@ class Manifest:
             raise ManifestError(f"Manifest file not found: {path}")
 
         try:
-            with path.open() as f:
-                data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
+            data = yaml_io.load_file(path)
+        except yaml_io.YAMLError as e:
             raise ManifestError(f"Failed to parse YAML: {e}") from e
 
         manifest = cls.from_dict(data)
@@ -149,14 +229,10 @@ class Manifest:
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Manifest:
         """Create a Manifest from a dictionary."""
-        # Validate against schema first
-        try:
-            validate(instance=data, schema=MANIFEST_SCHEMA)
-        except JsonSchemaValidationError as e:
-            raise ValidationError(
-                "Manifest validation failed",
-                errors=[str(e.message)],
-            ) from e
+        # Validate against schema first, reporting every violation at once
+        errors = MANIFEST_VALIDATOR.errors(data)
+        if errors:
+            raise ValidationError("Manifest validation failed", errors=errors)
 
         # Parse network config
         network_data = data.get("network", {})
@@ -266,8 +342,7 @@ class Manifest:
 
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        with path.open("w") as f:
-            yaml.dump(self.to_dict(), f, default_flow_style=False, sort_keys=False)
+        yaml_io.dump_file(path, self.to_dict())
 
         self._path = path
 
@@ -281,11 +356,12 @@ class Manifest:
         """
         errors: list[str] = []
         warnings: list[str] = []
+        # Every rule reads the node indexes, built in one pass over the nodes.
+        index = self._index
 
         # Duplicate node names collide in the tinc host-file layout and silently
         # drop a peer's auth -> the network cannot function. ERROR.
-        names = [node.name for node in self.nodes]
-        duplicates = [name for name in set(names) if names.count(name) > 1]
+        duplicates = [name for name, nodes in index.by_name.items() if len(nodes) > 1]
         if duplicates:
             errors.append(f"Duplicate node names: {duplicates}")
 
@@ -293,21 +369,18 @@ class Manifest:
         # internal_ip equals its own vpn_ip is valid (and recommended) and must
         # not be flagged — only an address owned by two or more distinct nodes
         # is. ERROR.
-        ip_owners: dict[str, set[str]] = {}
-        for node in self.nodes:
-            node_ips = {node.internal_ip}
-            if node.vpn_ip:
-                node_ips.add(node.vpn_ip)
-            for ip in node_ips:
-                ip_owners.setdefault(ip, set()).add(node.name)
-        duplicate_ips = sorted(ip for ip, owners in ip_owners.items() if len(owners) > 1)
+        duplicate_ips = sorted(
+            ip
+            for ip, nodes in index.by_ip.items()
+            if len(nodes) > 1 and len({node.name for node in nodes.values()}) > 1
+        )
         if duplicate_ips:
             errors.append(f"Duplicate IP addresses: {duplicate_ips}")
 
         # Introducer presence/count. Without an introducer (or an externally
         # provided FURL) the grid cannot bootstrap — ERROR. More than one is
         # merely unusual under the current single-introducer design — WARNING.
-        introducers = [n for n in self.nodes if "tahoe_introducer" in [r.value for r in n.roles]]
+        introducers = index.by_role.get("tahoe_introducer", {})
         if len(introducers) > 1:
             warnings.append(
                 f"Found {len(introducers)} introducer nodes. "
@@ -330,7 +403,12 @@ class Manifest:
         # Short GPG key ids are brute-forceable (Evil32 fingerprint-suffix
         # collisions) and the runtime refuses to fetch/match them, so a node
         # with a short id cannot be authenticated at all. ERROR.
-        short_key_nodes = [n.name for n in self.nodes if n.gpg_key_id and len(n.gpg_key_id) < 40]
+        short_key_nodes = [
+            node.name
+            for key_id, nodes in index.by_key_id.items()
+            if len(key_id) < 40
+            for node in nodes.values()
+        ]
         if short_key_nodes:
             errors.append(
                 "Nodes using short GPG key ids instead of full 40-char fingerprints "
@@ -341,7 +419,7 @@ class Manifest:
         # is a capacity nudge (a growing network legitimately starts short);
         # happy == count means no write-redundancy headroom (losing one node
         # makes the grid read-only). Both advisory.
-        storage_nodes = [n for n in self.nodes if "tahoe_storage" in [r.value for r in n.roles]]
+        storage_nodes = index.by_role.get("tahoe_storage", {})
         happy = self.network.tahoe.shares_happy
         if len(storage_nodes) < happy:
             warnings.append(
@@ -367,14 +445,23 @@ class Manifest:
 
     def get_node(self, name: str) -> NodeConfig | None:
         """Get a node by name."""
-        for node in self.nodes:
-            if node.name == name:
-                return node
-        return None
+        return self._index.first(self._index.by_name, name)
+
+    def get_node_by_ip(self, ip: str) -> NodeConfig | None:
+        """Get the node using ``ip`` as its internal or VPN address."""
+        return self._index.first(self._index.by_ip, ip)
+
+    def get_node_by_key_id(self, key_id: str) -> NodeConfig | None:
+        """Get a node by its GPG key id (case and spaces are ignored)."""
+        return self._index.first(self._index.by_key_id, key_id.upper().replace(" ", ""))
 
     def get_nodes_by_role(self, role: str) -> list[NodeConfig]:
         """Get all nodes with a specific role."""
-        return [node for node in self.nodes if role in [r.value for r in node.roles]]
+        return self._index.every(self._index.by_role, role)
+
+    def get_nodes_by_region(self, region: str) -> list[NodeConfig]:
+        """Get all nodes in a region."""
+        return self._index.every(self._index.by_region, region)
 
     def get_introducers(self) -> list[NodeConfig]:
         """Get all introducer nodes."""
@@ -392,13 +479,16 @@ class Manifest:
         """Add a new node to the manifest."""
         if self.get_node(node.name):
             raise ManifestError(f"Node '{node.name}' already exists")
-        self.nodes.append(node)
+        self._nodes.append(node)
+        self._index.add(node)
 
     def remove_node(self, name: str) -> bool:
         """Remove a node from the manifest."""
         node = self.get_node(name)
         if node:
-            self.nodes.remove(node)
+            self._index.remove(node)
+            # By identity: equal duplicates must not be confused with this one.
+            del self._nodes[next(i for i, n in enumerate(self._nodes) if n is node)]
             return True
         return False
 
@@ -411,3 +501,81 @@ class Manifest:
         path = Path(path)
         with path.open("w") as f:
             json.dump(MANIFEST_SCHEMA, f, indent=2)
+
+
+# A file modified this recently may change again within the same mtime tick
+# without changing size; its content is hashed on every load until it settles.
+MTIME_SETTLE_NS = 2_000_000_000
+
+
+@dataclass
+class _CachedManifest:
+    mtime_ns: int
+    size: int
+    digest: bytes
+    data: dict[str, Any]
+    manifest: Manifest | None = None
+
+
+class ManifestCache:
+    """Parsed manifests, reparsed only when the file's content changes.
+
+    An entry is keyed on the path and checked by ``(mtime, size)``; when those
+    move (or the file was written in the last :data:`MTIME_SETTLE_NS`), the
+    content hash decides whether it really changed. So a long-running process
+    polling an unchanged manifest does one ``stat`` per load and no YAML work.
+
+    The returned dicts and :class:`Manifest` objects are shared between
+    callers: treat them as read-only.
+    """
+
+    def __init__(self, settle_ns: int = MTIME_SETTLE_NS) -> None:
+        self.settle_ns = settle_ns
+        self.parses = 0  # YAML parses so far, for tests and logs
+        self._entries: dict[Path, _CachedManifest] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, path: Path) -> _CachedManifest:
+        try:
+            stat = path.stat()
+        except FileNotFoundError as e:
+            raise ManifestError(f"Manifest file not found: {path}") from e
+        entry = self._entries.get(path)
+        settled = time.time_ns() - stat.st_mtime_ns > self.settle_ns
+        if entry and settled and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            return entry
+        raw = path.read_bytes()
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if entry and entry.digest == digest:  # touched, not changed (e.g. a git checkout)
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            return entry
+        try:
+            data = yaml_io.load(raw) or {}
+        except yaml_io.YAMLError as e:
+            raise ManifestError(f"Failed to parse YAML: {e}") from e
+        self.parses += 1
+        entry = self._entries[path] = _CachedManifest(stat.st_mtime_ns, stat.st_size, digest, data)
+        return entry
+
+    def load_dict(self, path: Path | str) -> dict[str, Any]:
+        """The manifest's parsed YAML (``{}`` for an empty file)."""
+        with self._lock:
+            return self._entry(Path(path)).data
+
+    def load(self, path: Path | str) -> Manifest:
+        """The manifest as a validated :class:`Manifest`."""
+        path = Path(path)
+        with self._lock:
+            entry = self._entry(path)
+            if entry.manifest is None:
+                entry.manifest = Manifest.from_dict(entry.data)
+                entry.manifest._path = path
+            return entry.manifest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by the long-running container processes (status server, manifest sync).
+MANIFEST_CACHE = ManifestCache()
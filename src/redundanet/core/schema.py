@@ -0,0 +1,176 @@
+"""JSON Schema validation compiled once per schema.
+
+``jsonschema.validate`` checks the schema itself and builds a fresh validator
+on every call, then walks the whole instance through its generic keyword
+dispatch; on a 10,000-node manifest that is about a second, and it stops at
+the first error. :class:`SchemaValidator` checks the schema once, keeps one
+``Draft7Validator``, and compiles the schema into plain Python predicates for
+the keywords manifests use. Valid documents (the common case) only run the
+predicates; an invalid one goes through ``iter_errors`` so every problem is
+reported with jsonschema's own messages. A schema using any other keyword
+skips the predicates and always takes the ``Draft7Validator`` path.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from jsonschema import Draft7Validator
+from jsonschema import ValidationError as JsonSchemaValidationError
+
+Check = Callable[[Any], bool]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+_TYPES: dict[str, Check] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "integer": _is_integer,
+    "number": _is_number,
+}
+
+# Keywords the compiler understands; annotations are accepted and ignored.
+_KEYWORDS = frozenset(
+    {"type", "enum", "minimum", "maxLength", "pattern", "required", "properties", "items"}
+    | {"$schema", "$comment", "title", "description", "default"}
+)
+
+
+def _all(checks: list[Check]) -> Check:
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value: Any) -> bool:
+        # A plain loop: all() over a generator costs a frame per call, per node.
+        for check in checks:  # noqa: SIM110
+            if not check(value):
+                return False
+        return True
+
+    return check_all
+
+
+def _compile_type(names: str | list[str]) -> Check | None:
+    names = [names] if isinstance(names, str) else names
+    if any(name not in _TYPES for name in names):
+        return None
+    tests = [_TYPES[name] for name in names]
+    if len(tests) == 1:
+        return tests[0]
+    return lambda value: any(test(value) for test in tests)
+
+
+def _compile_properties(properties: dict[str, Any]) -> Check | None:
+    compiled: dict[str, Check] = {}
+    for key, subschema in properties.items():
+        check = compile_schema(subschema)
+        if check is None:
+            return None
+        compiled[key] = check
+
+    def check_properties(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return True
+        for key, item in value.items():
+            check = compiled.get(key)
+            if check is not None and not check(item):
+                return False
+        return True
+
+    return check_properties
+
+
+def compile_schema(schema: dict[str, Any]) -> Check | None:
+    """A predicate that is true exactly when Draft 7 finds ``schema`` satisfied.
+
+    Returns None when the schema uses a keyword (or an ``enum`` of non-strings)
+    the compiler does not handle.
+    """
+    if not isinstance(schema, dict) or set(schema) - _KEYWORDS:
+        return None
+    checks: list[Check] = []
+    if "type" in schema:
+        type_check = _compile_type(schema["type"])
+        if type_check is None:
+            return None
+        checks.append(type_check)
+    if "enum" in schema:
+        if not all(isinstance(allowed, str) for allowed in schema["enum"]):
+            return None
+        allowed = frozenset(schema["enum"])
+        checks.append(lambda value: isinstance(value, str) and value in allowed)
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+        checks.append(lambda value: not _is_number(value) or value >= minimum)
+    if "maxLength" in schema:
+        longest = schema["maxLength"]
+        checks.append(lambda value: not isinstance(value, str) or len(value) <= longest)
+    if "pattern" in schema:
+        search = re.compile(schema["pattern"]).search
+        checks.append(lambda value: not isinstance(value, str) or search(value) is not None)
+    if "required" in schema:
+        required = tuple(schema["required"])
+        checks.append(
+            lambda value: not isinstance(value, dict) or all(key in value for key in required)
+        )
+    if "properties" in schema:
+        properties_check = _compile_properties(schema["properties"])
+        if properties_check is None:
+            return None
+        checks.append(properties_check)
+    if "items" in schema:
+        item_check = compile_schema(schema["items"])
+        if item_check is None:
+            return None
+        checks.append(lambda value: not isinstance(value, list) or all(map(item_check, value)))
+    return _all(checks) if checks else lambda _: True
+
+
+def describe(error: JsonSchemaValidationError) -> str:
+    """One error as ``path: message``, e.g. ``nodes[3].status: 'x' is not one of ...``."""
+    if not error.absolute_path:
+        return error.message
+    return f"{error.json_path.removeprefix('$.')}: {error.message}"
+
+
+class SchemaValidator:
+    """A Draft 7 schema, checked and compiled once, for validating many documents."""
+
+    def __init__(self, schema: dict[str, Any]) -> None:
+        Draft7Validator.check_schema(schema)
+        self.schema = schema
+        self._validator = Draft7Validator(schema)
+        self._check = compile_schema(schema)
+
+    @property
+    def compiled(self) -> bool:
+        """Whether valid documents are checked by the compiled predicates."""
+        return self._check is not None
+
+    def is_valid(self, instance: Any) -> bool:
+        if self._check is not None:
+            return self._check(instance)
+        return self._validator.is_valid(instance)
+
+    def iter_errors(self, instance: Any) -> Iterator[JsonSchemaValidationError]:
+        """Every schema violation in ``instance`` (none when it is valid)."""
+        if not self.is_valid(instance):
+            yield from self._validator.iter_errors(instance)
+
+    def errors(self, instance: Any) -> list[str]:
+        """Every schema violation in ``instance``, described; empty when valid."""
+        return [describe(error) for error in self.iter_errors(instance)]
@@ -7,51 +7,1090 @@ replication (how many distinct servers hold each object) without anyone
 revealing filenames, owners, or contents.
 
 Tahoe share layout:  <shares_dir>/<2-char prefix>/<storage_index>/<sharenum>
+
+Walking that tree is expensive on multi-TB nodes, so the census endpoint keeps
+a persistent :class:`CensusIndex` and only rescans prefix directories whose
+mtime moved since the last pass. Every change to the set of indexes bumps the
+index's generation, and a short journal of recent changes lets the hub ask for
+``/census?since=<generation>`` and receive only what was added and removed.
+
+Storage nodes garbage-collect shares whose newest lease is older than the
+network's lease duration. With lease reading enabled the scan also reads each
+share file's lease records — only those few header bytes, never the share
+data — so the census can report what is about to expire.
 """
 
 from __future__ import annotations
 
+import base64
+import bisect
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, overload
+
+try:  # optional: zstd is offered only when the zstandard package is installed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
 
 CENSUS_PORT = 3459  # served on the node's VPN IP only
 
+CENSUS_INDEX_VERSION = 3
+# Full rescans catch what directory mtimes cannot show: shares growing in place
+# (mutable shares, added leases) and clock or filesystem oddities.
+FULL_RESCAN_SECONDS = 3600
+# A directory modified this recently may change again within the same mtime
+# tick; its mtime is not trusted and it is rescanned on the next pass.
+MTIME_SETTLE_NS = 2_000_000_000
+# Deltas are answerable this many generations (and changed indexes) back; an
+# older ``since`` gets the full census instead.
+CENSUS_JOURNAL_LENGTH = 256
+CENSUS_JOURNAL_MAX_CHANGES = 100_000
+# Prefix directories scanned concurrently: overlapping the per-directory I/O
+# matters most on spinning disks and SD cards.
+SCAN_WORKERS = 8
+
+_DAY = 86400
+# Matches 'expire.override_lease_duration' in the storage nodes' tahoe.cfg.
+LEASE_DURATION_SECONDS = 90 * _DAY
+# Shares expiring within this many days are reported (and warned about).
+LEASE_WARN_DAYS = 14
+# Upper edges of the lease-age histogram; older leases land in a final bucket.
+LEASE_AGE_BUCKETS_DAYS = (7, 30, 60, 90)
+
 
 def list_storage_indexes(shares_dir: Path) -> list[str]:
     """All storage indexes with at least one share on disk."""
-    indexes: list[str] = []
-    if not shares_dir.is_dir():
-        return indexes
-    for prefix in sorted(shares_dir.iterdir()):
-        # Skip Tahoe's staging area and stray files.
-        if not prefix.is_dir() or prefix.name == "incoming":
-            continue
-        for si_dir in sorted(prefix.iterdir()):
-            if si_dir.is_dir() and any(p.is_file() for p in si_dir.iterdir()):
-                indexes.append(si_dir.name)
-    return indexes
+    return scan_shares(shares_dir).indexes
 
 
 def disk_used_bytes(shares_dir: Path) -> int:
     """Total bytes of stored shares."""
+    return scan_shares(shares_dir).total_bytes
+
+
+@dataclass
+class _PrefixEntry:
+    """What one prefix directory held when it was last scanned."""
+
+    mtime_ns: int  # 0 = not trusted, rescan on the next pass
+    indexes: list[str] = field(default_factory=list)
+    # SI directories without share files yet: Tahoe creates the directory
+    # before moving the first share in, which does not touch the prefix mtime.
+    empty: list[str] = field(default_factory=list)
+    bytes: int = 0  # every file under the prefix, shares or not
+    # [renewal day, shares, bytes] per UTC day the newest lease was renewed;
+    # day -1 holds shares without a readable lease. Empty unless leases are read.
+    leases: list[list[int]] = field(default_factory=list)
+
+
+@dataclass
+class _Change:
+    """The indexes one generation added and removed."""
+
+    generation: int
+    added: list[str]
+    removed: list[str]
+
+
+def _tree_bytes(path: str) -> int:
+    """Bytes of every file below a directory (staging area, odd nesting)."""
     total = 0
-    if not shares_dir.is_dir():
-        return 0
-    for path in shares_dir.rglob("*"):
-        if path.is_file():
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        total += entry.stat().st_size
+                    elif entry.is_dir():
+                        total += _tree_bytes(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        return total
+    return total
+
+
+# --- leases -------------------------------------------------------------------
+#
+# Tahoe share containers keep their lease records at fixed places:
+#   immutable: ">LLL" header (version, data length, lease count) with the
+#              72-byte leases ">L32s32sL" appended after the share data;
+#   mutable:   a 100-byte header (magic, write enabler, data length, extra
+#              lease offset), four 92-byte lease slots ">LL32s32s20s" right
+#              after it, and any further leases at the extra lease offset.
+# A lease's stored expiration is its renewal time plus Tahoe's 31-day default;
+# the age-based expirer measures lease age from that renewal time.
+
+_IMMUTABLE_HEADER = struct.Struct(">LLL")
+_IMMUTABLE_LEASE = struct.Struct(">L32s32sL")
+_MUTABLE_MAGICS = (
+    b"Tahoe mutable container v1\n\x75\x09\x44\x03\x8e",
+    b"Tahoe mutable container v2\n\x75\x09\x44\x03\x8e",
+)
+_MUTABLE_HEADER = struct.Struct(">32s20s32sQQ")
+_MUTABLE_LEASE = struct.Struct(">LL32s32s20s")
+_MUTABLE_LEASE_SLOTS = 4
+_LEASE_RENEWAL_SECONDS = 31 * _DAY  # Tahoe's DEFAULT_RENEWAL_TIME
+_MAX_LEASES = 4096  # anything beyond this is a corrupt or foreign header
+_NO_LEASE_DAY = -1
+
+
+def _lease_expirations(fd: int, size: int) -> list[int]:
+    """The expiration times stored in one share file's lease records."""
+    header = os.pread(fd, _MUTABLE_HEADER.size, 0)
+    if header[:32] in _MUTABLE_MAGICS and len(header) == _MUTABLE_HEADER.size:
+        extra_offset = _MUTABLE_HEADER.unpack(header)[4]
+        slots = os.pread(fd, _MUTABLE_LEASE_SLOTS * _MUTABLE_LEASE.size, _MUTABLE_HEADER.size)
+        records = [lease[1] for lease in _MUTABLE_LEASE.iter_unpack(slots)]
+        if 0 < extra_offset < size:
+            (extra,) = struct.unpack(">L", os.pread(fd, 4, extra_offset).rjust(4, b"\0"))
+            if extra <= _MAX_LEASES:
+                data = os.pread(fd, extra * _MUTABLE_LEASE.size, extra_offset + 4)
+                usable = len(data) - len(data) % _MUTABLE_LEASE.size
+                records += [lease[1] for lease in _MUTABLE_LEASE.iter_unpack(data[:usable])]
+        return [expiration for expiration in records if expiration]  # 0 = empty slot
+    if len(header) < _IMMUTABLE_HEADER.size:
+        return []
+    version, _, count = _IMMUTABLE_HEADER.unpack_from(header)
+    offset = size - count * _IMMUTABLE_LEASE.size
+    if version not in (1, 2) or count > _MAX_LEASES or offset < _IMMUTABLE_HEADER.size:
+        return []
+    data = os.pread(fd, count * _IMMUTABLE_LEASE.size, offset)
+    usable = len(data) - len(data) % _IMMUTABLE_LEASE.size
+    return [lease[3] for lease in _IMMUTABLE_LEASE.iter_unpack(data[:usable])]
+
+
+def read_share_lease(path: str) -> tuple[int, int | None]:
+    """A share file's size and the time its newest lease was renewed.
+
+    Reads only the header and lease records (positional reads, no mapping of
+    the share data). None means no readable lease — the file is not a Tahoe
+    share container or holds no lease, and the expirer will collect it.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        expirations = _lease_expirations(fd, size)
+    finally:
+        os.close(fd)
+    if not expirations:
+        return size, None
+    return size, max(expirations) - _LEASE_RENEWAL_SECONDS
+
+
+def parse_lease_duration(text: str) -> int:
+    """Seconds in a Tahoe duration such as "90 days", "3 months" or "1 year"."""
+    value = text.strip().lower()
+    unit = 1
+    for suffix, seconds in (("day", _DAY), ("month", 31 * _DAY), ("year", 365 * _DAY)):
+        stripped = value.removesuffix("s")
+        if stripped.endswith(suffix):
+            value, unit = stripped[: -len(suffix)].strip(), seconds
+            break
+    try:
+        return int(value) * unit
+    except ValueError:
+        raise ValueError(f"not a lease duration: {text!r}") from None
+
+
+def lease_summary(
+    buckets: Iterable[Sequence[int]],
+    lease_duration: int = LEASE_DURATION_SECONDS,
+    now: float | None = None,
+    warn_days: int = LEASE_WARN_DAYS,
+) -> dict[str, Any]:
+    """Lease-age histogram and what expires soon, from [renewal day, shares, bytes] buckets.
+
+    Ages and expiry dates are counted in whole UTC days, so the summary (and
+    the census ETag that covers it) moves at most once a day on its own.
+    """
+    today = int((time.time() if now is None else now) // _DAY)
+    duration_days = lease_duration // _DAY
+    edges = (*LEASE_AGE_BUCKETS_DAYS, None)
+    shares_by_age = [0] * len(edges)
+    bytes_by_age = [0] * len(edges)
+    expiring = [0, 0]
+    unleased = [0, 0]
+    for day, shares, size in buckets:
+        if day == _NO_LEASE_DAY:
+            unleased[0] += shares
+            unleased[1] += size
+            continue
+        age = max(today - day, 0)
+        slot = bisect.bisect_left(LEASE_AGE_BUCKETS_DAYS, age)
+        shares_by_age[slot] += shares
+        bytes_by_age[slot] += size
+        if age + warn_days >= duration_days:  # includes overdue, not yet collected
+            expiring[0] += shares
+            expiring[1] += size
+    return {
+        "lease_duration_days": duration_days,
+        "age_histogram": [
+            {"max_age_days": edge, "shares": count, "bytes": size}
+            for edge, count, size in zip(edges, shares_by_age, bytes_by_age, strict=True)
+        ],
+        "expiring_within_days": warn_days,
+        "expiring_shares": expiring[0],
+        "expiring_bytes": expiring[1],
+        "unleased_shares": unleased[0],
+        "unleased_bytes": unleased[1],
+    }
+
+
+# --- scanning -----------------------------------------------------------------
+
+
+def _scan_prefix(prefix: Path, mtime_ns: int, leases: bool = False) -> _PrefixEntry:
+    """One prefix directory in a single scandir pass: its indexes and bytes.
+
+    scandir hands back each entry's type with the name, so the only extra
+    syscall is the stat for a share's size — or, with ``leases``, the open
+    and two positional reads of its lease records.
+    """
+    entry = _PrefixEntry(mtime_ns=mtime_ns)
+    lease_days: dict[int, list[int]] = {}
+    with os.scandir(prefix) as children:
+        si_dirs = []
+        for child in children:
             try:
-                total += path.stat().st_size
+                if child.is_dir():
+                    si_dirs.append(child)
+                elif child.is_file():
+                    entry.bytes += child.stat().st_size
             except OSError:
                 continue
-    return total
+    for si_dir in sorted(si_dirs, key=lambda d: d.name):
+        has_share = False
+        try:
+            with os.scandir(si_dir.path) as files:
+                for path in files:
+                    try:
+                        if path.is_file() and leases:
+                            has_share = True
+                            size, renewed = read_share_lease(path.path)
+                            entry.bytes += size
+                            day = _NO_LEASE_DAY if renewed is None else renewed // _DAY
+                            totals = lease_days.setdefault(day, [0, 0])
+                            totals[0] += 1
+                            totals[1] += size
+                        elif path.is_file():
+                            has_share = True
+                            entry.bytes += path.stat().st_size
+                        elif path.is_dir():
+                            entry.bytes += _tree_bytes(path.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue  # removed mid-scan
+        (entry.indexes if has_share else entry.empty).append(si_dir.name)
+    entry.leases = [[day, *totals] for day, totals in sorted(lease_days.items())]
+    return entry
+
+
+def _scan_prefixes(
+    prefixes: list[tuple[Path, int]], workers: int = SCAN_WORKERS, leases: bool = False
+) -> list[_PrefixEntry | None]:
+    """Scan prefix directories on a thread pool; None for one that vanished."""
+
+    def scan(item: tuple[Path, int]) -> _PrefixEntry | None:
+        try:
+            return _scan_prefix(*item, leases=leases)
+        except OSError:
+            return None
 
+    if workers <= 1 or len(prefixes) <= 1:
+        return [scan(item) for item in prefixes]
+    with ThreadPoolExecutor(max_workers=min(workers, len(prefixes))) as pool:
+        return list(pool.map(scan, prefixes))
 
-def census_payload(node_name: str, shares_dir: Path) -> dict[str, Any]:
-    """The JSON body served at /census."""
-    indexes = list_storage_indexes(shares_dir)
+
+@dataclass
+class ShareScan:
+    """One full walk of a shares tree: the census's indexes and byte totals."""
+
+    indexes: list[str]
+    share_bytes: int  # under the prefix directories
+    other_bytes: int  # Tahoe's incoming/ staging area and stray files
+
+    @property
+    def total_bytes(self) -> int:
+        return self.share_bytes + self.other_bytes
+
+
+def _list_prefixes(shares_dir: Path) -> tuple[list[tuple[Path, int]], int]:
+    """The prefix directories (with mtimes) and the bytes found beside them."""
+    prefixes: list[tuple[Path, int]] = []
+    other_bytes = 0
+    try:
+        with os.scandir(shares_dir) as children:
+            for child in children:
+                try:
+                    if child.is_dir():
+                        # Tahoe's staging area is not part of the census.
+                        if child.name == "incoming":
+                            other_bytes += _tree_bytes(child.path)
+                        else:
+                            prefixes.append((Path(child.path), child.stat().st_mtime_ns))
+                    elif child.is_file():
+                        other_bytes += child.stat().st_size
+                except OSError:
+                    continue
+    except OSError:
+        return [], 0  # no shares directory (yet)
+    prefixes.sort()
+    return prefixes, other_bytes
+
+
+def scan_shares(shares_dir: Path, workers: int = SCAN_WORKERS) -> ShareScan:
+    """Walk the shares tree once, fanning out across prefix directories."""
+    prefixes, other_bytes = _list_prefixes(shares_dir)
+    indexes: list[str] = []
+    share_bytes = 0
+    for entry in _scan_prefixes(prefixes, workers):
+        if entry is not None:
+            indexes.extend(entry.indexes)
+            share_bytes += entry.bytes
+    return ShareScan(indexes=indexes, share_bytes=share_bytes, other_bytes=other_bytes)
+
+
+class CensusIndex:
+    """Persistent, incrementally maintained census of a shares tree.
+
+    Adding or removing a storage-index directory bumps its prefix directory's
+    mtime, so a pass only stats the ~1024 prefixes and rescans the ones that
+    moved. The index is saved as JSON next to the shares so a restarted census
+    server answers immediately instead of walking the disk again.
+
+    Generations start at the wall-clock millisecond the index was created, so
+    a rebuilt index never reuses a generation a hub might still be holding —
+    an unknown ``since`` always falls back to the full census.
+
+    With a ``lease_duration`` (seconds) every scanned share's lease records
+    are read too, kept per prefix as renewal-day buckets, and summarised in
+    the census's ``leases`` section. Renewing a lease rewrites the share in
+    place without touching its prefix's mtime, so renewals show up at the
+    next full rescan.
+    """
+
+    def __init__(
+        self,
+        shares_dir: Path,
+        index_path: Path | None = None,
+        full_rescan_seconds: float = FULL_RESCAN_SECONDS,
+        workers: int = SCAN_WORKERS,
+        lease_duration: int | None = None,
+        lease_warn_days: int = LEASE_WARN_DAYS,
+    ) -> None:
+        self.shares_dir = shares_dir
+        self.index_path = index_path
+        self.full_rescan_seconds = full_rescan_seconds
+        self.workers = workers
+        self.lease_duration = lease_duration
+        self.lease_warn_days = lease_warn_days
+        self._prefixes: dict[str, _PrefixEntry] = {}
+        self._full_scan_at = 0.0
+        self._generation = time.time_ns() // 1_000_000
+        self._journal: list[_Change] = []
+        self._journal_base = self._generation  # oldest generation a delta can start from
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if self.index_path is None:
+            return
+        try:
+            data = json.loads(self.index_path.read_text())
+            if data.get("version") != CENSUS_INDEX_VERSION:
+                return
+            if data.get("leases", False) != (self.lease_duration is not None):
+                return  # built with lease reading toggled: its buckets don't fit
+            prefixes = {name: _PrefixEntry(**entry) for name, entry in data["prefixes"].items()}
+            full_scan_at = float(data.get("full_scan_at", 0.0))
+            generation = int(data["generation"])
+            journal = [_Change(**change) for change in data["journal"]]
+            journal_base = int(data["journal_base"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return  # unreadable or foreign index: rebuild from disk
+        self._prefixes = prefixes
+        self._full_scan_at = full_scan_at
+        self._generation = generation
+        self._journal = journal
+        self._journal_base = journal_base
+
+    def _save(self) -> None:
+        if self.index_path is None:
+            return
+        data = {
+            "version": CENSUS_INDEX_VERSION,
+            "leases": self.lease_duration is not None,
+            "full_scan_at": self._full_scan_at,
+            "generation": self._generation,
+            "journal_base": self._journal_base,
+            "journal": [asdict(change) for change in self._journal],
+            "prefixes": {name: asdict(entry) for name, entry in self._prefixes.items()},
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            tmp.replace(self.index_path)
+        except OSError:
+            pass  # the in-memory index still serves; the next pass retries
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the disk. Returns True if it changed."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        now = time.time()
+        full = now - self._full_scan_at >= self.full_rescan_seconds
+        changed = False
+        added: list[str] = []
+        removed: list[str] = []
+        prefixes, _ = _list_prefixes(self.shares_dir)
+        seen = {prefix.name for prefix, _ in prefixes}
+        now_ns = time.time_ns()
+        rescans: list[tuple[Path, int]] = []
+        for prefix, mtime_ns in prefixes:
+            old = self._prefixes.get(prefix.name)
+            if not full and old is not None and old.mtime_ns == mtime_ns and not old.empty:
+                continue
+            settled = now_ns - mtime_ns > MTIME_SETTLE_NS
+            rescans.append((prefix, mtime_ns if settled else 0))
+        scanned = _scan_prefixes(rescans, self.workers, leases=self.lease_duration is not None)
+        for (prefix, _), new in zip(rescans, scanned, strict=True):
+            if new is None:
+                continue  # removed mid-scan; the next pass sees its parent change
+            old = self._prefixes.get(prefix.name)
+            if old is None or (old.indexes, old.empty, old.bytes, old.leases) != (
+                new.indexes,
+                new.empty,
+                new.bytes,
+                new.leases,
+            ):
+                changed = True
+                old_indexes = set(old.indexes) if old else set()
+                new_indexes = set(new.indexes)
+                added.extend(new_indexes - old_indexes)
+                removed.extend(old_indexes - new_indexes)
+            self._prefixes[prefix.name] = new
+        for gone in set(self._prefixes) - seen:
+            removed.extend(self._prefixes.pop(gone).indexes)
+            changed = True
+        if added or removed:
+            self._record(added, removed)
+        if full:
+            self._full_scan_at = now
+        if changed or full:
+            self._save()
+        return changed
+
+    def _record(self, added: list[str], removed: list[str]) -> None:
+        """Start a new generation and journal what it changed."""
+        self._generation += 1
+        if len(added) + len(removed) > CENSUS_JOURNAL_MAX_CHANGES:
+            # Too big to be worth a delta (e.g. the initial build).
+            self._journal.clear()
+            self._journal_base = self._generation
+            return
+        self._journal.append(_Change(self._generation, sorted(added), sorted(removed)))
+        journaled = sum(len(c.added) + len(c.removed) for c in self._journal)
+        while len(self._journal) > CENSUS_JOURNAL_LENGTH or journaled > CENSUS_JOURNAL_MAX_CHANGES:
+            oldest = self._journal.pop(0)
+            journaled -= len(oldest.added) + len(oldest.removed)
+            self._journal_base = oldest.generation
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    @property
+    def journal_range(self) -> tuple[int, int]:
+        """``(oldest, newest)`` generation a delta can start from."""
+        with self._lock:
+            return self._journal_base, self._generation
+
+    def changes_since(self, since: int) -> tuple[list[str], list[str]] | None:
+        """Net (added, removed) since a generation, or None if it is unknown or pruned."""
+        with self._lock:
+            return self._changes_since(since)
+
+    def _changes_since(self, since: int) -> tuple[list[str], list[str]] | None:
+        if not self._journal_base <= since <= self._generation:
+            return None
+        added: set[str] = set()
+        removed: set[str] = set()
+        for change in self._journal:
+            if change.generation <= since:
+                continue
+            for si in change.added:
+                if si in removed:
+                    removed.discard(si)  # removed then re-added: no net change
+                else:
+                    added.add(si)
+            for si in change.removed:
+                if si in added:
+                    added.discard(si)
+                else:
+                    removed.add(si)
+        return sorted(added), sorted(removed)
+
+    def storage_indexes(self) -> list[str]:
+        """All indexed storage indexes, sorted (prefixes are the SIs' first chars)."""
+        with self._lock:
+            return self._storage_indexes()
+
+    def _storage_indexes(self) -> list[str]:
+        return [si for name in sorted(self._prefixes) for si in self._prefixes[name].indexes]
+
+    def disk_used_bytes(self) -> int:
+        """Bytes of the indexed shares, as of each prefix's last scan."""
+        with self._lock:
+            return self._disk_used_bytes()
+
+    def _disk_used_bytes(self) -> int:
+        return sum(entry.bytes for entry in self._prefixes.values())
+
+    def census(self, since: int | None = None) -> dict[str, Any]:
+        """The index's part of a census payload, taken under one lock.
+
+        A delta (``added``/``removed``) when ``since`` is a generation still in
+        the journal; otherwise the full ``storage_indexes`` list.
+        """
+        with self._lock:
+            body: dict[str, Any] = {
+                "generation": self._generation,
+                "object_count": sum(len(e.indexes) for e in self._prefixes.values()),
+            }
+            delta = self._changes_since(since) if since is not None else None
+            if delta is None:
+                body["storage_indexes"] = self._storage_indexes()
+            else:
+                body["since"] = since
+                body["added"], body["removed"] = delta
+            body["disk_used_bytes"] = self._disk_used_bytes()
+            if self.lease_duration is not None:
+                body["leases"] = lease_summary(
+                    (bucket for entry in self._prefixes.values() for bucket in entry.leases),
+                    self.lease_duration,
+                    warn_days=self.lease_warn_days,
+                )
+            return body
+
+
+def census_payload(
+    node_name: str,
+    shares_dir: Path,
+    index: CensusIndex | None = None,
+    since: int | None = None,
+) -> dict[str, Any]:
+    """The JSON body served at /census.
+
+    With an ``index`` the answer comes from the incrementally refreshed index
+    instead of a full walk of ``shares_dir``, carries its ``generation``, and
+    is a delta when ``since`` names a generation the index still remembers.
+    """
+    if index is not None:
+        index.refresh()
+        return {"node": node_name, **index.census(since)}
+    scan = scan_shares(shares_dir)
     return {
         "node": node_name,
-        "object_count": len(indexes),
-        "storage_indexes": indexes,
-        "disk_used_bytes": disk_used_bytes(shares_dir),
+        "object_count": len(scan.indexes),
+        "storage_indexes": scan.indexes,
+        "disk_used_bytes": scan.total_bytes,
     }
+
+
+# --- wire encodings -----------------------------------------------------------
+#
+# JSON carries each storage index as a 26-char base32 string (~30 bytes with
+# framing). Hubs that send ``Accept: application/x-redundanet-census`` get the
+# raw 16-byte indexes instead, sorted and optionally front-coded (each record
+# stores only the bytes that differ from the previous one), and either body
+# can be gzip/zstd-encoded per ``Accept-Encoding``. Older nodes and hubs keep
+# speaking plain JSON.
+
+CENSUS_BINARY_TYPE = "application/x-redundanet-census"
+_BINARY_MAGIC = b"RNC\x01"
+SI_BYTES = 16
+_SI_CHARS = 26
+_INDEX_SECTIONS = ("storage_indexes", "added", "removed")
+
+
+# Tahoe's lowercase base32 alphabet, mapped onto int()'s base-32 digits. A
+# 16-byte index is 26 chars; the last char carries 2 zero padding bits.
+_SI_RE = re.compile(r"[a-z2-7]{25}[aeimquy4]")
+_SI_TO_INT_DIGITS = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyz234567", "0123456789abcdefghijklmnopqrstuv"
+)
+
+
+def si_to_bytes(si: str) -> bytes:
+    """The raw 16 bytes behind a Tahoe base32 storage index (ValueError if it isn't one)."""
+    if not _SI_RE.fullmatch(si):
+        raise ValueError(f"not a storage index: {si!r}")
+    # int() parses base 32 in C — far cheaper than base64.b32decode per index.
+    return (int(si.translate(_SI_TO_INT_DIGITS), 32) >> 2).to_bytes(SI_BYTES, "big")
+
+
+def bytes_to_si(raw: bytes) -> str:
+    """The Tahoe base32 form of a raw storage index."""
+    return base64.b32encode(raw)[:_SI_CHARS].decode().lower()
+
+
+def index_key(si: str) -> bytes:
+    """16 uniformly random bytes standing for a storage index.
+
+    A Tahoe SI's own raw bytes; anything else (old or test payloads) is hashed
+    to the same width, so every index can live in fixed-width arrays.
+    """
+    try:
+        return si_to_bytes(si)
+    except ValueError:
+        return hashlib.blake2b(si.encode(), digest_size=SI_BYTES).digest()
+
+
+class PackedIndexes(Sequence[bytes]):
+    """Sorted raw storage indexes in one contiguous buffer (16 bytes each).
+
+    What a binary census decodes into: no per-object Python objects until an
+    item is actually read, and membership tests are a binary search.
+    """
+
+    def __init__(self, buffer: bytes = b"") -> None:
+        if len(buffer) % SI_BYTES:
+            raise ValueError("packed storage indexes must be a multiple of 16 bytes")
+        self.buffer = buffer
+
+    @classmethod
+    def from_strings(cls, indexes: Iterable[str]) -> PackedIndexes:
+        return cls(b"".join(sorted(si_to_bytes(si) for si in indexes)))
+
+    def __len__(self) -> int:
+        return len(self.buffer) // SI_BYTES
+
+    @overload
+    def __getitem__(self, i: int) -> bytes: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[bytes]: ...
+
+    def __getitem__(self, i: int | slice) -> bytes | Sequence[bytes]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.buffer[i * SI_BYTES : (i + 1) * SI_BYTES]
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer = self.buffer
+        return (buffer[i : i + SI_BYTES] for i in range(0, len(buffer), SI_BYTES))
+
+    def __contains__(self, raw: object) -> bool:
+        if not isinstance(raw, bytes) or len(raw) != SI_BYTES:
+            return False
+        i = bisect.bisect_left(self, raw)
+        return i < len(self) and self[i] == raw
+
+    def strings(self) -> list[str]:
+        return [bytes_to_si(raw) for raw in self]
+
+
+def _front_code(buffer: bytes) -> bytes:
+    out = bytearray()
+    prev = b""
+    for i in range(0, len(buffer), SI_BYTES):
+        record = buffer[i : i + SI_BYTES]
+        shared = 0
+        while shared < SI_BYTES - 1 and prev[shared : shared + 1] == record[shared : shared + 1]:
+            shared += 1
+        out.append(shared)
+        out += record[shared:]
+        prev = record
+    return bytes(out)
+
+
+def _front_decode(body: bytes, pos: int, count: int) -> tuple[bytes, int]:
+    out = bytearray()
+    prev = b""
+    for _ in range(count):
+        shared = body[pos]
+        end = pos + 1 + SI_BYTES - shared
+        record = prev[:shared] + body[pos + 1 : end]
+        if len(record) != SI_BYTES:
+            raise ValueError("truncated census body")
+        out += record
+        prev = record
+        pos = end
+    return bytes(out), pos
+
+
+def encode_census_binary(payload: dict[str, Any], front_coded: bool = False) -> bytes:
+    """A census payload in the binary format (ValueError if an index isn't a Tahoe SI).
+
+    Layout: magic, u32 header length, JSON header (every non-index field plus
+    the section names), then per section a u32 record count and the records.
+    """
+    sections = [key for key in _INDEX_SECTIONS if key in payload]
+    header = {key: value for key, value in payload.items() if key not in _INDEX_SECTIONS}
+    header["sections"] = sections
+    header["coding"] = "front" if front_coded else "plain"
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    parts = [_BINARY_MAGIC, struct.pack(">I", len(header_bytes)), header_bytes]
+    for key in sections:
+        packed = PackedIndexes.from_strings(payload[key])
+        parts.append(struct.pack(">I", len(packed)))
+        parts.append(_front_code(packed.buffer) if front_coded else packed.buffer)
+    return b"".join(parts)
+
+
+def decode_census_binary(body: bytes) -> dict[str, Any]:
+    """Inverse of :func:`encode_census_binary`; index sections become :class:`PackedIndexes`."""
+    if body[:4] != _BINARY_MAGIC:
+        raise ValueError("not a binary census body")
+    try:
+        (header_len,) = struct.unpack_from(">I", body, 4)
+        pos = 8 + header_len
+        payload: dict[str, Any] = json.loads(body[8:pos])
+        sections = payload.pop("sections")
+        front_coded = payload.pop("coding") == "front"
+        for key in sections:
+            (count,) = struct.unpack_from(">I", body, pos)
+            pos += 4
+            if front_coded:
+                buffer, pos = _front_decode(body, pos, count)
+            else:
+                buffer = body[pos : pos + count * SI_BYTES]
+                pos += count * SI_BYTES
+                if len(buffer) != count * SI_BYTES:
+                    raise ValueError("truncated census body")
+            payload[key] = PackedIndexes(buffer)
+    except (struct.error, IndexError, KeyError, TypeError) as e:
+        raise ValueError(f"malformed binary census body: {e}") from e
+    return payload
+
+
+def _media_params(header: str) -> dict[str, dict[str, str]]:
+    """Media types (or codings) in an Accept-style header, with their parameters."""
+    accepted: dict[str, dict[str, str]] = {}
+    for item in header.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        values = dict(p.partition("=")[::2] for p in params)
+        if values.get("q", "1").strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted[name.lower()] = values
+    return accepted
+
+
+def _coding(accept_encoding: str) -> str | None:
+    codings = _media_params(accept_encoding)
+    if "zstd" in codings and zstandard is not None:
+        return "zstd"
+    return "gzip" if "gzip" in codings else None
+
+
+def _compress(body: bytes, accept_encoding: str) -> tuple[bytes, str | None]:
+    coding = _coding(accept_encoding)
+    if coding == "zstd":
+        return zstandard.ZstdCompressor().compress(body), coding
+    if coding == "gzip":
+        return gzip.compress(body, compresslevel=6), coding
+    return body, None
+
+
+def census_variant(accept: str = "", accept_encoding: str = "") -> str:
+    """The encoding a /census request negotiates, e.g. ``front+zstd`` or ``json``.
+
+    Decided from the headers alone, so it names the response body (for a
+    given census) before anything is encoded.
+    """
+    binary = _media_params(accept).get(CENSUS_BINARY_TYPE)
+    media = "json" if binary is None else "front" if binary.get("coding") == "front" else "bin"
+    coding = _coding(accept_encoding)
+    return f"{media}+{coding}" if coding else media
+
+
+def encode_census_response(
+    payload: dict[str, Any], accept: str = "", accept_encoding: str = ""
+) -> tuple[bytes, dict[str, str]]:
+    """Body and headers for a /census response, negotiated from the request.
+
+    Binary when the client accepts :data:`CENSUS_BINARY_TYPE` (front-coded if
+    it asks for ``coding=front``) and every index is a real Tahoe SI; JSON
+    otherwise.
+    """
+    binary = _media_params(accept).get(CENSUS_BINARY_TYPE)
+    body: bytes | None = None
+    content_type = "application/json"
+    if binary is not None:
+        try:
+            body = encode_census_binary(payload, front_coded=binary.get("coding") == "front")
+            content_type = CENSUS_BINARY_TYPE
+        except ValueError:
+            body = None  # something that isn't a Tahoe SI: JSON can still carry it
+    if body is None:
+        body = json.dumps(payload).encode()
+    body, coding = _compress(body, accept_encoding)
+    headers = {"Content-Type": content_type, "Vary": "Accept, Accept-Encoding"}
+    if coding:
+        headers["Content-Encoding"] = coding
+    return body, headers
+
+
+def census_accept_headers() -> dict[str, str]:
+    """Request headers a hub sends to get the compact census when available."""
+    codings = "zstd, gzip" if zstandard is not None else "gzip"
+    return {
+        "Accept": f"{CENSUS_BINARY_TYPE};coding=front, application/json;q=0.5",
+        "Accept-Encoding": codings,
+    }
+
+
+def decode_census_response(
+    body: bytes, content_type: str = "", content_encoding: str = ""
+) -> dict[str, Any]:
+    """A /census response body back into a payload, whichever encoding it came in."""
+    coding = content_encoding.strip().lower()
+    if coding == "gzip":
+        body = gzip.decompress(body)
+    elif coding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd-encoded census but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    elif coding not in ("", "identity"):
+        raise ValueError(f"unsupported census encoding: {content_encoding}")
+    if content_type.split(";")[0].strip().lower() == CENSUS_BINARY_TYPE:
+        return decode_census_binary(body)
+    payload: dict[str, Any] = json.loads(body)
+    return payload
+
+
+# --- sketches -----------------------------------------------------------------
+#
+# On grids with tens of millions of objects even deltas are a lot for the hub
+# to hold. ``/census?sketch=1`` answers with a bounded summary instead:
+#
+# * a consistent sample: the storage indexes whose hash has ``level`` leading
+#   zero bits. Every node samples the same objects, so the hub can count exact
+#   holders for the sample and scale the replication fractions up;
+# * a HyperLogLog of all the node's indexes, which the hub merges into an
+#   estimate of the network's distinct object count.
+#
+# Storage indexes are already uniformly random, so their raw bytes serve as
+# the hash; anything that isn't a Tahoe SI is hashed first. The sample uses
+# the leading bytes and the HyperLogLog the trailing ones, keeping the two
+# independent.
+
+SKETCH_SAMPLE_SIZE = 4096  # most indexes a sketch samples (~1.5% error on fractions)
+HLL_PRECISION = 12  # 4096 registers: ~1.6% standard error on cardinality
+
+
+def in_sample(si: str, level: int) -> bool:
+    """Whether a storage index belongs to the consistent sample at ``level``."""
+    return level == 0 or int.from_bytes(index_key(si)[:8], "big") >> (64 - level) == 0
+
+
+def sample_level(count: int, max_sample: int = SKETCH_SAMPLE_SIZE) -> int:
+    """The smallest level whose expected sample of ``count`` indexes fits ``max_sample``."""
+    level = 0
+    while count > max_sample << level:
+        level += 1
+    return level
+
+
+class HyperLogLog:
+    """Cardinality sketch over storage indexes (mergeable by register max)."""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: bytes | None = None) -> None:
+        self.precision = precision
+        self.registers = bytearray(registers or bytes(1 << precision))
+        if len(self.registers) != 1 << precision:
+            raise ValueError("register count does not match precision")
+
+    def add(self, si: str) -> None:
+        value = int.from_bytes(index_key(si)[8:], "big")
+        bits = 64 - self.precision
+        slot = value >> bits
+        rank = bits - (value & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[slot]:
+            self.registers[slot] = rank
+
+    def merge(self, other: HyperLogLog) -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        raw = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small sets
+        return raw
+
+    def to_text(self) -> str:
+        return base64.b64encode(self.registers).decode()
+
+    @classmethod
+    def from_text(cls, text: str, precision: int = HLL_PRECISION) -> HyperLogLog:
+        return cls(precision, base64.b64decode(text))
+
+
+def census_sketch(indexes: Iterable[str], count: int) -> dict[str, Any]:
+    """The ``sketch`` section of a sketch-mode census: sample + HyperLogLog."""
+    level = sample_level(count)
+    hll = HyperLogLog()
+    sample: list[str] = []
+    for si in indexes:
+        hll.add(si)
+        if in_sample(si, level):
+            sample.append(si)
+    return {
+        "level": level,
+        "sample": sample,
+        "hll_precision": hll.precision,
+        "hll": hll.to_text(),
+    }
+
+
+# --- serving ------------------------------------------------------------------
+
+CENSUS_REFRESH_SECONDS = 30  # the hub polls once a minute
+_MAX_CACHED_RESPONSES = 32
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header names this ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    wanted = etag.removeprefix("W/")
+    return any(
+        tag.strip() == "*" or tag.strip().removeprefix("W/") == wanted
+        for tag in if_none_match.split(",")
+    )
+
+
+class CensusSnapshot:
+    """A node's census, refreshed in the background and kept ready to serve.
+
+    Requests never touch the disk: :meth:`refresh` (run by the census server's
+    refresher thread) brings the index up to date and fingerprints the full
+    payload, and each negotiated response is encoded once and reused until the
+    census changes. :attr:`etag` fingerprints the full payload (generation
+    included); each response's ETag adds the representation to it (encoding,
+    sketch, and ``since`` for a delta), so a 304 only ever stands in for the
+    very body the client holds. Sketches are built on first request from the
+    same payload.
+    """
+
+    def __init__(self, node_name: str, index: CensusIndex) -> None:
+        self.node_name = node_name
+        self.index = index
+        self._lock = threading.Lock()
+        self._payload: dict[str, Any] | None = None
+        self._etag = ""
+        self._journal_range = (0, -1)  # no delta until the first refresh
+        self._responses: dict[tuple[int | None, bool, str], tuple[bytes, dict[str, str]]] = {}
+
+    def refresh(self) -> bool:
+        """Catch the index up with the disk. Returns True if the census changed."""
+        self.index.refresh()
+        payload = {"node": self.node_name, **self.index.census()}
+        journal_range = self.index.journal_range
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha256(canonical).hexdigest()[:32]}"'
+        with self._lock:
+            self._journal_range = journal_range
+            if etag == self._etag:
+                return False
+            self._payload, self._etag, self._responses = payload, etag, {}
+            return True
+
+    @property
+    def etag(self) -> str:
+        """The census fingerprint every representation's ETag is derived from."""
+        with self._lock:
+            return self._etag
+
+    def _key(
+        self, since: int | None, accept: str, accept_encoding: str, sketch: bool
+    ) -> tuple[int | None, bool, str]:
+        """``(since if a delta, sketch, variant)``: what picks the response body.
+
+        Whether a delta exists is read from the journal range the last
+        refresh recorded; the journal itself is only walked to build one.
+        """
+        if self.etag == "":
+            self.refresh()  # asked before the refresher's first pass
+        with self._lock:
+            oldest, newest = self._journal_range
+        delta = not sketch and since is not None and oldest <= since <= newest
+        return since if delta else None, sketch, census_variant(accept, accept_encoding)
+
+    @staticmethod
+    def _representation_etag(etag: str, key: tuple[int | None, bool, str]) -> str:
+        since, sketch, variant = key
+        tag = etag.strip('"') + "." + variant
+        if sketch:
+            tag += ".sketch"
+        if since is not None:
+            tag += f".since{since}"
+        return f'"{tag}"'
+
+    def etag_for(
+        self,
+        since: int | None = None,
+        accept: str = "",
+        accept_encoding: str = "",
+        sketch: bool = False,
+    ) -> str:
+        """The ETag :meth:`response` would send for this request, without encoding it."""
+        key = self._key(since, accept, accept_encoding, sketch)
+        return self._representation_etag(self.etag, key)
+
+    def response(
+        self,
+        since: int | None = None,
+        accept: str = "",
+        accept_encoding: str = "",
+        sketch: bool = False,
+    ) -> tuple[bytes, dict[str, str]]:
+        """Body and headers (including the ETag) for a /census request."""
+        key = self._key(since, accept, accept_encoding, sketch)
+        delta = key[0] is not None
+        with self._lock:
+            cached = self._responses.get(key)
+            payload, etag = self._payload, self._etag
+        if cached is not None:
+            return cached
+        if delta or payload is None:
+            payload = {"node": self.node_name, **self.index.census(since)}
+        if sketch:
+            indexes = payload["storage_indexes"]  # never a delta in sketch mode
+            payload = {k: v for k, v in payload.items() if k != "storage_indexes"}
+            payload["sketch"] = census_sketch(indexes, len(indexes))
+        body, headers = encode_census_response(payload, accept, accept_encoding)
+        headers["ETag"] = self._representation_etag(etag, key)
+        with self._lock:
+            if self._etag == etag and len(self._responses) < _MAX_CACHED_RESPONSES:
+                self._responses[key] = (body, headers)
+        return body, headers
@@ -0,0 +1,119 @@
+"""Pre-encoded HTTP bodies for the hub's status server.
+
+A status snapshot changes once per collection but is read by every visitor,
+alerting hook and refresh in between. :class:`EncodedBody` compresses a body
+once — gzip always, brotli and zstd when their packages are installed — and
+tags every variant with a strong ETag, so answering a request is a header
+lookup: pick the client's preferred coding, or say 304 if it already has it.
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+from collections.abc import Callable
+
+try:  # optional: br is offered only when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # optional: zstd is offered only when the zstandard package is installed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+IDENTITY = "identity"
+# Bodies this small gain nothing from a content coding.
+MIN_COMPRESS_BYTES = 256
+# Server preference among codings the client weighs equally: smallest first.
+_PREFERENCE = ("br", "zstd", "gzip")
+
+
+def _encoders() -> dict[str, Callable[[bytes], bytes]]:
+    encoders: dict[str, Callable[[bytes], bytes]] = {
+        "gzip": lambda body: gzip.compress(body, compresslevel=9)
+    }
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=9, mode=brotli.MODE_TEXT)
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=10).compress
+    return encoders
+
+
+@functools.lru_cache(maxsize=256)
+def preferred_codings(accept_encoding: str) -> tuple[str, ...]:
+    """Codings an Accept-Encoding header allows, most preferred first.
+
+    Ordered by q-value, then by :data:`_PREFERENCE`; ``identity`` always
+    comes last as the fallback. Cached: clients send a handful of distinct
+    headers, so each is parsed once.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.lower()] = q
+    wildcard = weights.pop("*", None)
+    if wildcard is not None:
+        for coding in _PREFERENCE:
+            weights.setdefault(coding, wildcard)
+    ranked = sorted(
+        (coding for coding, q in weights.items() if q > 0 and coding in _PREFERENCE),
+        key=lambda coding: (-weights[coding], _PREFERENCE.index(coding)),
+    )
+    return (*ranked, IDENTITY)
+
+
+def _etag_list(header: str) -> set[str]:
+    """Entity tags in an If-None-Match header, compared weakly (``W/`` dropped)."""
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class EncodedBody:
+    """One immutable response body and its content-coded variants."""
+
+    def __init__(self, body: bytes, content_type: str) -> None:
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.variants: dict[str, tuple[bytes, str]] = {IDENTITY: (body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            for coding, encode in _encoders().items():
+                encoded = encode(body)
+                if len(encoded) < len(body):
+                    self.variants[coding] = (encoded, f'"{digest}-{coding}"')
+
+    @property
+    def body(self) -> bytes:
+        """The unencoded body."""
+        return self.variants[IDENTITY][0]
+
+    def negotiate(self, accept_encoding: str) -> tuple[str, bytes, str]:
+        """``(coding, body, etag)`` of the variant the client prefers."""
+        for coding in preferred_codings(accept_encoding):
+            variant = self.variants.get(coding)
+            if variant is not None:
+                return coding, *variant
+        return IDENTITY, *self.variants[IDENTITY]  # pragma: no cover - identity always matches
+
+    def not_modified(self, if_none_match: str, accept_encoding: str) -> bool:
+        """Whether an If-None-Match header names the variant :meth:`negotiate`
+        picks for ``accept_encoding``.
+
+        Only that variant's tag counts: a client holding the body in another
+        coding gets the new one, not a 304 relabelling what it has.
+        """
+        if not if_none_match:
+            return False
+        tags = _etag_list(if_none_match)
+        return "*" in tags or self.negotiate(accept_encoding)[2] in tags
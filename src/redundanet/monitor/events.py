@@ -0,0 +1,76 @@
+"""Server-sent events for the hub's status page.
+
+The collector runs in its own thread; viewers' ``/events`` streams live on
+the server's event loop. :class:`EventBroadcaster` bridges the two: the
+collector publishes an encoded event from any thread, and every open stream
+gets it from a small queue of its own. A viewer that falls a queue behind is
+dropped rather than buffered for — its browser reconnects and catches up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+QUEUE_SIZE = 16  # events a stream may fall behind before it is dropped
+HEARTBEAT = 15.0  # seconds of silence before a comment line keeps the stream open
+RETRY_MS = 5000  # reconnect delay suggested to browsers
+
+_HEARTBEAT = b": keep-alive\n\n"
+
+
+def sse_event(event: str, data: str, retry_ms: int | None = None) -> bytes:
+    """One event in the ``text/event-stream`` format."""
+    lines = [f"retry: {retry_ms}"] if retry_ms is not None else []
+    lines.append(f"event: {event}")
+    lines += [f"data: {line}" for line in data.split("\n")]
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(queue_size)
+        self.dropped = False
+
+
+class EventBroadcaster:
+    """Fans published events out to every open stream."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, heartbeat: float = HEARTBEAT) -> None:
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._subscribers: set[_Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: bytes) -> None:
+        """Queue ``event`` for every stream; callable from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has subscribed yet
+        loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: bytes) -> None:
+        for subscriber in self._subscribers:
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+
+    async def stream(self, first: bytes) -> AsyncGenerator[bytes, None]:
+        """``first``, then every published event (and heartbeats) until dropped."""
+        self._loop = asyncio.get_running_loop()
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            yield first
+            while not subscriber.dropped:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except TimeoutError:
+                    yield _HEARTBEAT
+        finally:
+            self._subscribers.discard(subscriber)
@@ -0,0 +1,813 @@
+"""Fixed-size uptime and latency history on the hub's persistent volume.
+
+One sample per collection — time, overall verdict, which nodes answered and
+their RTT — goes into a ring buffer of fixed-size records in one
+memory-mapped file, so appending is O(1) and never rereads the file. Node
+names are stored once in a small dictionary at the head of the file and each
+record refers to them by slot: two bitmaps (sampled, up) and an RTT array.
+
+The raw ring holds a week. Every sample is also counted into hourly and daily
+rollups (samples taken and answered, RTT count/min/sum, a log-bucket RTT
+histogram and loss per node), each a ring of its own whose newest bucket is
+updated in place; a 30- or 90-day uptime sums a few hundred buckets instead of
+rereading every sample. RTT and loss per sample go into a latency ring beside
+the raw one, so a node's series reads two u16 per record.
+
+Records are written in time order, so a window is found by binary search on
+the timestamps and only the records inside it are read.
+
+File layout (little-endian), shared by all the rings::
+
+    header      magic, max_nodes, capacity, node_count, written   (64 bytes)
+    names       max_nodes x NAME_BYTES, UTF-8, NUL-padded
+    records     capacity x record
+
+    raw record     ts i64, overall u8, sampled bits, up bits, rtt u16[max_nodes]
+    rollup record  bucket start i64, then per node: sampled, up, rtt count,
+                   rtt min, loss count u16[max_nodes] each; rtt sum, loss sum
+                   u32[max_nodes] each; histogram u16[max_nodes x 24]
+    latency record ts i64, rtt u16[max_nodes], loss u16[max_nodes]
+
+RTT, loss and their sums are in tenths (of a ms, of a percent).
+
+The older JSONL history (one JSON object per line) is imported when a store
+is first created next to it.
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import contextlib
+import itertools
+import json
+import math
+import mmap
+import struct
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, ClassVar, TypeVar
+
+HISTORY_CAPACITY = 7 * 24 * 60  # raw records: a week at one sample per minute
+HOURLY_CAPACITY = 14 * 24  # hourly buckets: two weeks
+DAILY_CAPACITY = 400  # daily buckets: over a year
+MAX_NODES = 64  # initial node slots; a file is rebuilt with twice as many when full
+NAME_BYTES = 64  # longer node names are truncated (manifests refuse them)
+
+# Windows up to RAW_WINDOW are counted from raw samples, up to HOURLY_WINDOW
+# from hourly buckets, longer ones from daily buckets.
+RAW_WINDOW = 24 * 3600
+HOURLY_WINDOW = 7 * 24 * 3600
+
+# RTT histogram bucket upper bounds in ms, a factor of sqrt(2) apart (0.7 ms to
+# ~2 s); the last bucket takes everything slower.
+RTT_BUCKET_BOUNDS_MS = tuple(0.5 * 2 ** (i / 2) for i in range(1, 24))
+HISTOGRAM_BUCKETS = len(RTT_BUCKET_BOUNDS_MS) + 1
+MAX_POINTS = 1000  # buckets in one latency series, at most
+
+_HEADER = struct.Struct("<8sIIIQ")  # magic, max_nodes, capacity, node_count, written
+_HEADER_SIZE = 64
+_RECORD_HEAD = struct.Struct("<qB")  # unix time, overall
+_U16 = struct.Struct("<H")
+_OVERALL = ("ok", "degraded", "down")
+_NO_RTT = 0xFFFF  # RTTs are stored in tenths of a millisecond, up to 6553.4 ms
+
+
+@dataclass
+class Sample:
+    """One collection, as recorded."""
+
+    ts: float  # unix time
+    overall: str
+    up: dict[str, bool] = field(default_factory=dict)  # nodes with a probe answer only
+    rtt_ms: dict[str, float] = field(default_factory=dict)
+    loss_pct: dict[str, float] = field(default_factory=dict)
+
+
+def _stored_name(name: str) -> str:
+    """``name`` as the name dictionary holds it: at most NAME_BYTES of UTF-8."""
+    return name.encode()[:NAME_BYTES].decode(errors="ignore")
+
+
+class _RingFile(abc.ABC):
+    """Fixed-size records in a ring, plus a node-name dictionary, in one mmap'd file.
+
+    Subclasses define the record layout; slots are appended to the dictionary
+    as new node names show up, and the whole file is rebuilt with twice the
+    slots when it runs out.
+    """
+
+    magic: ClassVar[bytes]
+
+    def __init__(self, path: Path, capacity: int, max_nodes: int = MAX_NODES) -> None:
+        self.path = path
+        if not path.exists() or path.stat().st_size < _HEADER_SIZE:
+            self._create(capacity, max_nodes)
+        self._open()
+
+    @classmethod
+    @abc.abstractmethod
+    def _record_size(cls, max_nodes: int) -> int:
+        """Bytes in one record of a file with ``max_nodes`` slots."""
+
+    @abc.abstractmethod
+    def _export(self) -> list[Any]:
+        """Every record, decoded, for rebuilding the file."""
+
+    @abc.abstractmethod
+    def _import(self, records: list[Any]) -> None:
+        """Write back what :meth:`_export` returned, after a rebuild."""
+
+    # --- file ---------------------------------------------------------------
+
+    def _create(self, capacity: int, max_nodes: int) -> None:
+        max_nodes = max(8, -(-max_nodes // 8) * 8)
+        size = _HEADER_SIZE + max_nodes * NAME_BYTES + capacity * self._record_size(max_nodes)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            header = _HEADER.pack(self.magic, max_nodes, capacity, 0, 0)
+            f.write(header.ljust(_HEADER_SIZE, b"\0"))
+            f.truncate(size)
+        tmp.replace(self.path)
+
+    def _open(self) -> None:
+        with self.path.open("r+b") as f:
+            self._map = mmap.mmap(f.fileno(), 0)
+        magic, max_nodes, capacity, node_count, written = _HEADER.unpack_from(self._map)
+        self.max_nodes: int = max_nodes
+        self.capacity: int = capacity
+        self._written: int = written
+        self._record_bytes: int = self._record_size(self.max_nodes)
+        self._records_at: int = _HEADER_SIZE + self.max_nodes * NAME_BYTES
+        expected = self._records_at + capacity * self._record_bytes
+        if magic != self.magic or len(self._map) != expected:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a history store")
+        self.names: list[str] = []
+        for slot in range(node_count):
+            offset = _HEADER_SIZE + slot * NAME_BYTES
+            raw = self._map[offset : offset + NAME_BYTES]
+            self.names.append(raw.rstrip(b"\0").decode(errors="replace"))
+        self._slots = {name: slot for slot, name in enumerate(self.names)}
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(
+            self._map, 0, self.magic, self.max_nodes, self.capacity, len(self.names), self._written
+        )
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find(name) is not None
+
+    def _find(self, name: str) -> int | None:
+        """The slot of node ``name``, if it has one."""
+        return self._slots.get(_stored_name(name))
+
+    def _slot(self, name: str) -> int:
+        """The slot of node ``name``, given one if it is new."""
+        name = _stored_name(name)
+        slot = self._slots.get(name)
+        if slot is not None:
+            return slot
+        if len(self.names) == self.max_nodes:
+            self._resize(self.max_nodes * 2)
+        slot = len(self.names)
+        offset = _HEADER_SIZE + slot * NAME_BYTES
+        self._map[offset : offset + NAME_BYTES] = name.encode().ljust(NAME_BYTES, b"\0")
+        self.names.append(name)
+        self._slots[name] = slot
+        self._write_header()
+        return slot
+
+    def _resize(self, max_nodes: int) -> None:
+        """Rebuild the file with more node slots (rare: the grid outgrew it)."""
+        records = self._export()
+        names = list(self.names)
+        self._map.close()
+        self._create(self.capacity, max_nodes)
+        self._open()
+        for name in names:
+            self._slot(name)
+        self._import(records)
+
+    # --- records ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    def _offset(self, index: int) -> int:
+        """File offset of the ``index``-th oldest record still held."""
+        first = self._written - len(self)
+        return self._records_at + ((first + index) % self.capacity) * self._record_bytes
+
+    def _next_offset(self) -> int:
+        """File offset for a new record (the oldest one's, once the ring is full)."""
+        offset = self._records_at + (self._written % self.capacity) * self._record_bytes
+        self._written += 1
+        return offset
+
+    def _ts(self, index: int) -> int:
+        ts: int = struct.unpack_from("<q", self._map, self._offset(index))[0]
+        return ts
+
+    def _first_at_or_after(self, ts: float) -> int:
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._ts(middle) < ts:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _range(self, start: float | None, end: float | None) -> range:
+        first = 0 if start is None else self._first_at_or_after(start)
+        stop = len(self) if end is None else self._first_at_or_after(end)
+        return range(first, stop)
+
+    def _percentages(self, sampled: list[int], answered: list[int]) -> dict[str, float]:
+        return {
+            name: round(100.0 * answered[slot] / sampled[slot], 1)
+            for slot, name in enumerate(self.names)
+            if sampled[slot]
+        }
+
+
+def _tenths(value: float) -> int:
+    """A non-negative value in tenths, as stored (below the _NO_RTT marker)."""
+    return min(max(round(value * 10), 0), _NO_RTT - 1)
+
+
+def _rtt_bucket(ms: float) -> int:
+    return bisect.bisect_right(RTT_BUCKET_BOUNDS_MS, ms)
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile of raw values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)), 1) - 1]
+
+
+def _histogram_percentile(histogram: list[int], fraction: float, floor: float) -> float | None:
+    """Percentile of an RTT histogram: the geometric middle of the bucket it
+    falls in, and never below the smallest RTT seen."""
+    total = sum(histogram)
+    if not total:
+        return None
+    running = itertools.accumulate(histogram)
+    bucket = next(i for i, seen in enumerate(running) if seen >= fraction * total)
+    bounds = RTT_BUCKET_BOUNDS_MS
+    low = bounds[bucket - 1] if bucket else bounds[0] / math.sqrt(2)
+    high = bounds[bucket] if bucket < len(bounds) else low * math.sqrt(2)
+    return max(math.sqrt(low * high), floor)
+
+
+@dataclass
+class LatencyStats:
+    """One node's RTT and loss over a stretch of time."""
+
+    rtt_count: int = 0
+    rtt_min: float | None = None  # ms
+    rtt_sum: float = 0.0  # ms
+    loss_count: int = 0
+    loss_sum: float = 0.0  # percent
+    histogram: list[int] = field(default_factory=lambda: [0] * HISTOGRAM_BUCKETS)
+    # Every RTT, while built from raw samples only: percentiles are then exact.
+    values: list[float] | None = field(default_factory=list)
+
+    def add(self, rtt_ms: float | None, loss_pct: float | None) -> None:
+        if rtt_ms is not None:
+            self.rtt_count += 1
+            self.rtt_min = rtt_ms if self.rtt_min is None else min(self.rtt_min, rtt_ms)
+            self.rtt_sum += rtt_ms
+            self.histogram[_rtt_bucket(rtt_ms)] += 1
+            if self.values is not None:
+                self.values.append(rtt_ms)
+        if loss_pct is not None:
+            self.loss_count += 1
+            self.loss_sum += loss_pct
+
+    def merge(self, other: LatencyStats) -> None:
+        self.rtt_count += other.rtt_count
+        if other.rtt_min is not None:
+            self.rtt_min = min(self.rtt_min or other.rtt_min, other.rtt_min)
+        self.rtt_sum += other.rtt_sum
+        self.loss_count += other.loss_count
+        self.loss_sum += other.loss_sum
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram, strict=True)]
+        if self.values is not None and other.values is not None:
+            self.values.extend(other.values)
+        else:
+            self.values = None
+
+    @property
+    def rtt_avg(self) -> float | None:
+        return self.rtt_sum / self.rtt_count if self.rtt_count else None
+
+    @property
+    def loss_avg(self) -> float | None:
+        return self.loss_sum / self.loss_count if self.loss_count else None
+
+    def percentile(self, fraction: float) -> float | None:
+        if self.values is not None:
+            return _percentile(self.values, fraction)
+        return _histogram_percentile(self.histogram, fraction, self.rtt_min or 0.0)
+
+
+# Per-node columns of a rollup record, in file order: five u16, two u32.
+_SAMPLED, _ANSWERED, _RTT_COUNT, _RTT_MIN, _LOSS_COUNT, _RTT_SUM, _LOSS_SUM = range(7)
+_ROLLUP_COLUMNS = 7
+
+
+class _Rollup(_RingFile):
+    """Per-node uptime counts and RTT/loss statistics, summed into time buckets.
+
+    Each record holds columns over the node slots: u16 counters (samples,
+    answered, RTT count, minimum RTT, loss count), u32 sums (RTT and loss, in
+    tenths) and a log-bucket RTT histogram that percentiles are estimated from.
+    """
+
+    magic = b"RNROLL\x00\x02"
+
+    def __init__(
+        self, path: Path, bucket_seconds: int, capacity: int, max_nodes: int = MAX_NODES
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        super().__init__(path, capacity, max_nodes)
+
+    @classmethod
+    def _record_size(cls, max_nodes: int) -> int:
+        return 8 + (5 * 2 + 2 * 4 + HISTOGRAM_BUCKETS * 2) * max_nodes
+
+    def _open(self) -> None:
+        super()._open()
+        n = self.max_nodes
+        self._format = struct.Struct(f"<q{5 * n}H{2 * n}I{HISTOGRAM_BUCKETS * n}H")
+
+    def _at(self, column: int, slot: int) -> int:
+        """Index of a node's value in an unpacked record (0 is the bucket start)."""
+        return 1 + column * self.max_nodes + slot
+
+    def _histogram_at(self, slot: int) -> int:
+        return 1 + _ROLLUP_COLUMNS * self.max_nodes + slot * HISTOGRAM_BUCKETS
+
+    def _record(self, index: int) -> list[int]:
+        return list(self._format.unpack_from(self._map, self._offset(index)))
+
+    def _empty(self, start: int) -> list[int]:
+        record = [0] * (1 + (_ROLLUP_COLUMNS + HISTOGRAM_BUCKETS) * self.max_nodes)
+        record[0] = start
+        for slot in range(self.max_nodes):
+            record[self._at(_RTT_MIN, slot)] = _NO_RTT
+        return record
+
+    def _counts(self, index: int) -> tuple[int, list[int], list[int]]:
+        """``(bucket start, samples, answered)`` — just the leading uptime columns."""
+        counts = struct.unpack_from(f"<q{2 * self.max_nodes}H", self._map, self._offset(index))
+        return counts[0], list(counts[1 : 1 + self.max_nodes]), list(counts[1 + self.max_nodes :])
+
+    def add(
+        self,
+        ts: float,
+        up: Mapping[str, bool],
+        rtt_ms: Mapping[str, float] | None = None,
+        loss_pct: Mapping[str, float] | None = None,
+    ) -> None:
+        """Count one sample into its bucket (the newest, or a new one)."""
+        rtt_ms, loss_pct = rtt_ms or {}, loss_pct or {}
+        for name in (*up, *rtt_ms, *loss_pct):
+            self._slot(name)  # may rebuild the file with more slots first
+        start = int(ts) // self.bucket_seconds * self.bucket_seconds
+        newest = self._ts(len(self) - 1) if len(self) else None
+        if newest is not None and newest > start:
+            return  # the clock went back: don't reopen a closed bucket
+        if newest == start:
+            offset = self._offset(len(self) - 1)
+            record = self._record(len(self) - 1)
+        else:
+            offset = self._next_offset()
+            record = self._empty(start)
+
+        def bump(at: int, by: int, limit: int = 0xFFFF) -> None:
+            record[at] = min(record[at] + by, limit)
+
+        for name, value in up.items():
+            slot = self._slot(name)
+            bump(self._at(_SAMPLED, slot), 1)
+            bump(self._at(_ANSWERED, slot), int(value))
+        for name, ms in rtt_ms.items():
+            slot, tenths = self._slot(name), _tenths(ms)
+            bump(self._at(_RTT_COUNT, slot), 1)
+            record[self._at(_RTT_MIN, slot)] = min(record[self._at(_RTT_MIN, slot)], tenths)
+            bump(self._at(_RTT_SUM, slot), tenths, 0xFFFFFFFF)
+            bump(self._histogram_at(slot) + _rtt_bucket(ms), 1)
+        for name, pct in loss_pct.items():
+            slot = self._slot(name)
+            bump(self._at(_LOSS_COUNT, slot), 1)
+            bump(self._at(_LOSS_SUM, slot), _tenths(pct), 0xFFFFFFFF)
+        self._format.pack_into(self._map, offset, *record)
+        self._write_header()
+
+    def uptime(self, start: float, end: float | None = None) -> dict[str, float]:
+        """Per-node uptime percentage over the buckets overlapping ``[start, end)``."""
+        sampled = [0] * self.max_nodes
+        answered = [0] * self.max_nodes
+        for index in self._range(start - self.bucket_seconds + 1, end):
+            _, bucket_sampled, bucket_answered = self._counts(index)
+            for slot in range(len(self.names)):
+                sampled[slot] += bucket_sampled[slot]
+                answered[slot] += bucket_answered[slot]
+        return self._percentages(sampled, answered)
+
+    def latency(self, name: str, start: float, end: float) -> Iterator[tuple[int, LatencyStats]]:
+        """``(bucket start, stats)`` of one node for the buckets starting in ``[start, end)``."""
+        slot = self._find(name)
+        if slot is None:
+            return
+        for index in self._range(start, end):
+            record = self._record(index)
+            rtt_min = record[self._at(_RTT_MIN, slot)]
+            histogram_at = self._histogram_at(slot)
+            yield (
+                record[0],
+                LatencyStats(
+                    rtt_count=record[self._at(_RTT_COUNT, slot)],
+                    rtt_min=None if rtt_min == _NO_RTT else rtt_min / 10,
+                    rtt_sum=record[self._at(_RTT_SUM, slot)] / 10,
+                    loss_count=record[self._at(_LOSS_COUNT, slot)],
+                    loss_sum=record[self._at(_LOSS_SUM, slot)] / 10,
+                    histogram=record[histogram_at : histogram_at + HISTOGRAM_BUCKETS],
+                    values=None,
+                ),
+            )
+
+    def _export(self) -> list[Any]:
+        records = []
+        for index in range(len(self)):
+            record = self._record(index)
+            per_node = {
+                name: (
+                    [record[self._at(column, slot)] for column in range(_ROLLUP_COLUMNS)],
+                    record[self._histogram_at(slot) : self._histogram_at(slot) + HISTOGRAM_BUCKETS],
+                )
+                for slot, name in enumerate(self.names)
+            }
+            records.append((record[0], per_node))
+        return records
+
+    def _import(self, records: list[Any]) -> None:
+        for start, per_node in records:
+            record = self._empty(start)
+            for name, (columns, histogram) in per_node.items():
+                slot = self._slot(name)
+                for column, value in enumerate(columns):
+                    record[self._at(column, slot)] = value
+                at = self._histogram_at(slot)
+                record[at : at + HISTOGRAM_BUCKETS] = histogram
+            self._format.pack_into(self._map, self._next_offset(), *record)
+        self._write_header()
+
+
+class _LatencySamples(_RingFile):
+    """Every sample's RTT and loss per node, in tenths (_NO_RTT: not measured)."""
+
+    magic = b"RNLAT\x00\x00\x01"
+
+    @classmethod
+    def _record_size(cls, max_nodes: int) -> int:
+        return 8 + 4 * max_nodes
+
+    def _open(self) -> None:
+        super()._open()
+        self._format = struct.Struct(f"<q{2 * self.max_nodes}H")
+
+    def add(self, ts: float, rtt_ms: Mapping[str, float], loss_pct: Mapping[str, float]) -> None:
+        # Slots first: a new name may rebuild the file with more of them.
+        rtt = [(self._slot(name), ms) for name, ms in rtt_ms.items()]
+        loss = [(self._slot(name), pct) for name, pct in loss_pct.items()]
+        record = [int(ts)] + [_NO_RTT] * (2 * self.max_nodes)
+        for slot, ms in rtt:
+            record[1 + slot] = _tenths(ms)
+        for slot, pct in loss:
+            record[1 + self.max_nodes + slot] = _tenths(pct)
+        self._format.pack_into(self._map, self._next_offset(), *record)
+        self._write_header()
+
+    def _values(self, index: int) -> tuple[int, tuple[int, ...]]:
+        record = self._format.unpack_from(self._map, self._offset(index))
+        return record[0], record[1:]
+
+    def stats(self, start: float, end: float | None = None) -> dict[str, LatencyStats]:
+        """Per-node stats over the samples in ``[start, end)``."""
+        stats = [LatencyStats() for _ in self.names]
+        n = self.max_nodes
+        for index in self._range(start, end):
+            _, values = self._values(index)
+            for slot, node in enumerate(stats):
+                rtt, loss = values[slot], values[n + slot]
+                node.add(
+                    None if rtt == _NO_RTT else rtt / 10, None if loss == _NO_RTT else loss / 10
+                )
+        return {name: stats[slot] for slot, name in enumerate(self.names)}
+
+    def latency(self, name: str, start: float, end: float) -> Iterator[tuple[int, LatencyStats]]:
+        """``(ts, stats of that one sample)`` of one node for samples in ``[start, end)``."""
+        slot = self._find(name)
+        if slot is None:
+            return
+        rtt_at, loss_at = 8 + 2 * slot, 8 + 2 * (self.max_nodes + slot)
+        for index in self._range(start, end):
+            offset = self._offset(index)
+            ts = self._ts(index)
+            (rtt,) = _U16.unpack_from(self._map, offset + rtt_at)
+            (loss,) = _U16.unpack_from(self._map, offset + loss_at)
+            stats = LatencyStats()
+            stats.add(None if rtt == _NO_RTT else rtt / 10, None if loss == _NO_RTT else loss / 10)
+            yield ts, stats
+
+    def _export(self) -> list[Any]:
+        records = []
+        for index in range(len(self)):
+            ts, values = self._values(index)
+            records.append(
+                (
+                    ts,
+                    {name: values[slot] for slot, name in enumerate(self.names)},
+                    {name: values[self.max_nodes + slot] for slot, name in enumerate(self.names)},
+                )
+            )
+        return records
+
+    def _import(self, records: list[Any]) -> None:
+        for ts, rtts, losses in records:
+            record = [ts] + [_NO_RTT] * (2 * self.max_nodes)
+            for name, value in rtts.items():
+                record[1 + self._slot(name)] = value
+            for name, value in losses.items():
+                record[1 + self.max_nodes + self._slot(name)] = value
+            self._format.pack_into(self._map, self._next_offset(), *record)
+        self._write_header()
+
+
+_R = TypeVar("_R", bound=_RingFile)
+
+# Series sources, finest first: (name, bucket seconds). Raw samples have no
+# fixed bucket; a series step is rounded up to a multiple of the others'.
+_RESOLUTIONS = (("sample", 1), ("hour", 3600), ("day", 86400))
+
+
+class HistoryStore(_RingFile):
+    """A ring buffer of :class:`Sample` records, with hourly and daily rollups.
+
+    Next to ``path`` live the rollups, ``<stem>.hourly<suffix>`` and
+    ``<stem>.daily<suffix>``, and the per-sample RTT/loss ring,
+    ``<stem>.latency<suffix>``. When one is missing, or in an older layout, it
+    is rebuilt from the raw samples still held (loss is not in those).
+    """
+
+    magic = b"RNHIST\x00\x01"
+
+    def __init__(
+        self, path: Path, capacity: int = HISTORY_CAPACITY, max_nodes: int = MAX_NODES
+    ) -> None:
+        super().__init__(path, capacity, max_nodes)
+        self.hourly, hourly_new = self._sidecar(
+            "hourly", lambda p: _Rollup(p, 3600, HOURLY_CAPACITY, self.max_nodes)
+        )
+        self.daily, daily_new = self._sidecar(
+            "daily", lambda p: _Rollup(p, 86400, DAILY_CAPACITY, self.max_nodes)
+        )
+        self.latency_samples, latency_new = self._sidecar(
+            "latency", lambda p: _LatencySamples(p, self.capacity, self.max_nodes)
+        )
+        if hourly_new or daily_new or latency_new:
+            for sample in self.samples():
+                if hourly_new:
+                    self.hourly.add(sample.ts, sample.up, sample.rtt_ms)
+                if daily_new:
+                    self.daily.add(sample.ts, sample.up, sample.rtt_ms)
+                if latency_new:
+                    self.latency_samples.add(sample.ts, sample.rtt_ms, {})
+
+    def _sidecar(self, kind: str, make: Callable[[Path], _R]) -> tuple[_R, bool]:
+        """A ring stored next to this one, and whether it was (re)created empty."""
+        path = self.path.with_name(f"{self.path.stem}.{kind}{self.path.suffix}")
+        if path.exists():
+            try:
+                return make(path), False
+            except ValueError:
+                path.unlink()  # an older layout: rebuilt below
+        return make(path), True
+
+    @classmethod
+    def open(cls, path: Path, legacy: Path | None = None) -> HistoryStore:
+        """The store at ``path``, importing the JSONL history at ``legacy`` if
+        the store is new. The imported file is renamed to ``*.migrated``."""
+        fresh = not path.exists()
+        store = cls(path)
+        if fresh and legacy is not None and legacy.exists():
+            for sample in _read_jsonl(legacy):
+                store.append(sample)
+            with contextlib.suppress(OSError):
+                legacy.rename(legacy.with_name(legacy.name + ".migrated"))
+        return store
+
+    def close(self) -> None:
+        super().close()
+        self.hourly.close()
+        self.daily.close()
+        self.latency_samples.close()
+
+    @classmethod
+    def _record_size(cls, max_nodes: int) -> int:
+        return _RECORD_HEAD.size + 2 * (max_nodes // 8) + 2 * max_nodes
+
+    def _export(self) -> list[Any]:
+        return list(self.samples())
+
+    def _import(self, records: list[Any]) -> None:
+        for sample in records:
+            self._append_raw(sample)
+
+    def append(self, sample: Sample) -> None:
+        """Record one sample, overwriting the oldest once the ring is full."""
+        self._append_raw(sample)
+        self.hourly.add(sample.ts, sample.up, sample.rtt_ms, sample.loss_pct)
+        self.daily.add(sample.ts, sample.up, sample.rtt_ms, sample.loss_pct)
+        self.latency_samples.add(sample.ts, sample.rtt_ms, sample.loss_pct)
+
+    def _append_raw(self, sample: Sample) -> None:
+        up = {self._slot(name): value for name, value in sample.up.items()}
+        rtt = {self._slot(name): value for name, value in sample.rtt_ms.items()}
+        seen_bits = up_bits = 0
+        for slot, value in up.items():
+            seen_bits |= 1 << slot
+            if value:
+                up_bits |= 1 << slot
+        rtts = [_NO_RTT] * self.max_nodes
+        for slot, ms in rtt.items():
+            rtts[slot] = _tenths(ms)
+
+        offset = self._next_offset()
+        overall = _OVERALL.index(sample.overall) if sample.overall in _OVERALL else 0xFF
+        _RECORD_HEAD.pack_into(self._map, offset, int(sample.ts), overall)
+        offset += _RECORD_HEAD.size
+        size = self.max_nodes // 8
+        self._map[offset : offset + size] = seen_bits.to_bytes(size, "little")
+        self._map[offset + size : offset + 2 * size] = up_bits.to_bytes(size, "little")
+        struct.pack_into(f"<{self.max_nodes}H", self._map, offset + 2 * size, *rtts)
+        self._write_header()
+
+    def _bits(self, index: int) -> tuple[int, int, int, int]:
+        """``(ts, overall code, sampled bits, up bits)`` of one record."""
+        offset = self._offset(index)
+        ts, overall = _RECORD_HEAD.unpack_from(self._map, offset)
+        offset += _RECORD_HEAD.size
+        size = self.max_nodes // 8
+        seen = int.from_bytes(self._map[offset : offset + size], "little")
+        up = int.from_bytes(self._map[offset + size : offset + 2 * size], "little")
+        return ts, overall, seen, up
+
+    def samples(self, start: float | None = None, end: float | None = None) -> Iterator[Sample]:
+        """Samples with ``start <= ts < end``, oldest first."""
+        rtt_format = struct.Struct(f"<{self.max_nodes}H")
+        rtt_at = _RECORD_HEAD.size + 2 * (self.max_nodes // 8)
+        for index in self._range(start, end):
+            ts, overall, seen, up = self._bits(index)
+            rtts = rtt_format.unpack_from(self._map, self._offset(index) + rtt_at)
+            sample = Sample(ts, _OVERALL[overall] if overall < len(_OVERALL) else "unknown")
+            for slot, name in enumerate(self.names):
+                if seen >> slot & 1:
+                    sample.up[name] = bool(up >> slot & 1)
+                if rtts[slot] != _NO_RTT:
+                    sample.rtt_ms[name] = rtts[slot] / 10
+            yield sample
+
+    def raw_uptime(self, start: float, end: float | None = None) -> dict[str, float]:
+        """Per-node uptime percentage over the raw samples in ``[start, end)``."""
+        sampled = [0] * len(self.names)
+        answered = [0] * len(self.names)
+        for index in self._range(start, end):
+            _, _, seen, up = self._bits(index)
+            while seen:
+                low = seen & -seen
+                slot = low.bit_length() - 1
+                sampled[slot] += 1
+                answered[slot] += bool(up & low)
+                seen ^= low
+        return self._percentages(sampled, answered)
+
+    @property
+    def newest(self) -> float | None:
+        """Time of the newest sample held, if any."""
+        return float(self._ts(len(self) - 1)) if len(self) else None
+
+    def uptime(self, start: float, now: float) -> dict[str, float]:
+        """Per-node uptime percentage since ``start``, from the coarsest
+        resolution that still fits the window: raw, hourly or daily."""
+        window = now - start
+        if window <= RAW_WINDOW:
+            return self.raw_uptime(start)
+        if window <= HOURLY_WINDOW:
+            return self.hourly.uptime(start)
+        return self.daily.uptime(start)
+
+    def rtt_percentiles(
+        self, start: float, end: float | None = None
+    ) -> dict[str, tuple[float | None, float | None]]:
+        """Per-node ``(p50, p95)`` RTT in ms over the samples in ``[start, end)``."""
+        return {
+            name: (_round(stats.percentile(0.5)), _round(stats.percentile(0.95)))
+            for name, stats in self.latency_samples.stats(start, end).items()
+            if stats.rtt_count
+        }
+
+    def _source(self, start: float) -> tuple[str, int, _LatencySamples | _Rollup]:
+        """The finest series source still holding ``start`` (else the coarsest)."""
+        sources: tuple[_LatencySamples | _Rollup, ...] = (
+            self.latency_samples,
+            self.hourly,
+            self.daily,
+        )
+        for (name, seconds), source in zip(_RESOLUTIONS, sources, strict=True):
+            if len(source) < source.capacity or source._ts(0) <= start:
+                return name, seconds, source
+        name, seconds = _RESOLUTIONS[-1]
+        return name, seconds, self.daily
+
+    def latency(
+        self, node: str, start: float, end: float, step: int | None = None
+    ) -> dict[str, Any]:
+        """One node's RTT and loss over ``[start, end)`` as columnar JSON.
+
+        Samples are grouped into ``step``-second buckets (aligned to the
+        epoch), each reported as sample count, min/avg/p95 RTT and mean loss;
+        empty buckets are left out. ``step`` is raised so there are at most
+        MAX_POINTS buckets, and rounded up to the resolution of the data it is
+        read from: raw samples (a week), hourly (two weeks) or daily
+        rollups, whichever is finest and still reaches back to ``start``. p95
+        is exact over raw samples and estimated from the RTT histogram over
+        rollups.
+        """
+        span = max(end - start, 1)
+        step = max(int(step or 0), math.ceil(span / MAX_POINTS), 1)
+        resolution, seconds, source = self._source(start)
+        step = -(-step // seconds) * seconds
+        buckets: dict[int, LatencyStats] = {}
+        for ts, stats in source.latency(node, start // seconds * seconds, end):
+            key = ts // step * step
+            if key in buckets:
+                buckets[key].merge(stats)
+            else:
+                buckets[key] = stats
+        series: dict[str, Any] = {
+            "node": node,
+            "from": int(start),
+            "to": int(end),
+            "step": step,
+            "resolution": resolution,
+            "ts": [],
+            "samples": [],
+            "min_ms": [],
+            "avg_ms": [],
+            "p95_ms": [],
+            "loss_pct": [],
+        }
+        for key, stats in buckets.items():
+            if not stats.rtt_count and not stats.loss_count:
+                continue
+            series["ts"].append(key)
+            series["samples"].append(stats.rtt_count)
+            series["min_ms"].append(_round(stats.rtt_min))
+            series["avg_ms"].append(_round(stats.rtt_avg))
+            series["p95_ms"].append(_round(stats.percentile(0.95)))
+            series["loss_pct"].append(_round(stats.loss_avg))
+        return series
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+def _read_jsonl(path: Path) -> Iterator[Sample]:
+    """Samples from the older JSONL history; unreadable lines are skipped."""
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return
+    for line in lines:
+        try:
+            raw = json.loads(line)
+            ts = datetime.fromisoformat(raw["ts"]).timestamp()
+        except (ValueError, KeyError, TypeError):
+            continue
+        up: Mapping[str, object] = raw.get("up") or {}
+        yield Sample(ts, str(raw.get("overall", "")), {str(k): bool(v) for k, v in up.items()})
@@ -0,0 +1,230 @@
+"""A small asyncio HTTP/1.1 server for the hub's status endpoints.
+
+The hub runs on a small VM next to tincd and the introducer, so the status
+server must stay cheap under a burst of page loads and must not let slow
+clients pin resources:
+
+- one event loop, no thread per connection;
+- HTTP/1.1 keep-alive (and pipelining), up to ``max_requests`` per connection;
+- at most ``max_connections`` open connections, beyond which new ones get an
+  immediate 503;
+- a deadline for each request head (``read_timeout``, ``keepalive_timeout``
+  while idle between requests), so a slow-loris client is dropped;
+- bounded write buffers, and a deadline for draining them, so a client that
+  does not read cannot make the server buffer without limit.
+
+Only GET and HEAD are served; bodies are whatever the handler returns, or a
+stream of chunks (for server-sent events) that ends the connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from redundanet.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_CONNECTIONS = 256
+MAX_REQUESTS_PER_CONNECTION = 1000
+MAX_HEAD_BYTES = 16 * 1024
+READ_TIMEOUT = 10.0  # to receive a whole request head
+KEEPALIVE_TIMEOUT = 30.0  # idle between requests on one connection
+WRITE_TIMEOUT = 30.0  # to drain a response to the client
+WRITE_BUFFER_HIGH = 64 * 1024  # bytes buffered per connection before writes wait
+
+SERVER_NAME = "redundanet-status"
+
+
+@dataclass
+class Request:
+    """One parsed request head."""
+
+    method: str
+    target: str
+    version: str
+    headers: dict[str, str]  # names lower-cased; repeated headers joined with ", "
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.target).path
+
+    @property
+    def query(self) -> str:
+        return urlsplit(self.target).query
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return "keep-alive" in connection
+        return "close" not in connection
+
+
+@dataclass
+class Response:
+    """A response; Content-Length and Connection are added on send.
+
+    A ``stream`` response (server-sent events) is sent chunk by chunk after the
+    head and ends the connection when the iterator does.
+    """
+
+    status: int
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+    stream: AsyncGenerator[bytes, None] | None = None
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: HTTPStatus) -> None:
+        super().__init__(status.phrase)
+        self.status = status
+
+
+def _parse_head(head: bytes) -> Request:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+    except ValueError as e:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST) from e
+    if version not in ("HTTP/1.0", "HTTP/1.1") or not target.startswith("/"):
+        raise _BadRequest(HTTPStatus.BAD_REQUEST)
+    headers: dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep or not name or name != name.strip():
+            raise _BadRequest(HTTPStatus.BAD_REQUEST)
+        key = name.lower()
+        headers[key] = f"{headers[key]}, {value.strip()}" if key in headers else value.strip()
+    return Request(method, target, version, headers)
+
+
+def _head_bytes(response: Response, keep_alive: bool) -> bytes:
+    status = HTTPStatus(response.status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}", f"Server: {SERVER_NAME}"]
+    lines += [f"{name}: {value}" for name, value in response.headers.items()]
+    # A 304 has no body to measure; a stream's length is where it closes.
+    if status is not HTTPStatus.NOT_MODIFIED and response.stream is None:
+        lines.append(f"Content-Length: {len(response.body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def error_response(status: HTTPStatus, message: str = "") -> Response:
+    """A short plain-text error response."""
+    body = f"{status.value} {message or status.phrase}\n".encode()
+    return Response(status.value, body, {"Content-Type": "text/plain; charset=utf-8"})
+
+
+class HTTPServer:
+    """Serves ``handler`` over HTTP/1.1 with the limits described above."""
+
+    def __init__(
+        self,
+        handler: Handler,
+        max_connections: int = MAX_CONNECTIONS,
+        max_requests: int = MAX_REQUESTS_PER_CONNECTION,
+        read_timeout: float = READ_TIMEOUT,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        write_timeout: float = WRITE_TIMEOUT,
+    ) -> None:
+        self.handler = handler
+        self.max_connections = max_connections
+        self.max_requests = max_requests
+        self.read_timeout = read_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.write_timeout = write_timeout
+        self.connections = 0
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self._connection, host, port, limit=MAX_HEAD_BYTES)
+
+    async def _send(
+        self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool, head_only: bool
+    ) -> None:
+        writer.write(_head_bytes(response, keep_alive))
+        if not head_only and response.body:
+            writer.write(response.body)
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+        if response.stream is not None:
+            async with contextlib.aclosing(response.stream) as chunks:
+                if head_only:
+                    return
+                async for chunk in chunks:
+                    writer.write(chunk)
+                    # A client that stops reading is dropped, not buffered for.
+                    await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        self.connections += 1
+        try:
+            if self.connections > self.max_connections:
+                busy = error_response(HTTPStatus.SERVICE_UNAVAILABLE, "too many connections")
+                busy.headers["Retry-After"] = "1"
+                await self._send(writer, busy, keep_alive=False, head_only=False)
+                return
+            await self._serve(reader, writer)
+        except (TimeoutError, ConnectionError):
+            pass  # the client went quiet or away; just drop it
+        finally:
+            self.connections -= 1
+            writer.close()
+            with contextlib.suppress(OSError, TimeoutError):
+                await asyncio.wait_for(writer.wait_closed(), self.write_timeout)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        for served in range(self.max_requests):
+            timeout = self.read_timeout if served == 0 else self.keepalive_timeout
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+            except asyncio.IncompleteReadError:
+                return  # closed between requests
+            except asyncio.LimitOverrunError:
+                too_large = error_response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+                await self._send(writer, too_large, keep_alive=False, head_only=False)
+                return
+            try:
+                request = _parse_head(head)
+            except _BadRequest as e:
+                await self._send(
+                    writer, error_response(e.status), keep_alive=False, head_only=False
+                )
+                return
+            if request.method not in ("GET", "HEAD"):
+                not_allowed = error_response(HTTPStatus.METHOD_NOT_ALLOWED)
+                not_allowed.headers["Allow"] = "GET, HEAD"
+                await self._send(writer, not_allowed, keep_alive=False, head_only=False)
+                return
+            if request.headers.get("content-length", "0") != "0" or "transfer-encoding" in (
+                request.headers
+            ):
+                # GET bodies are meaningless here and would desync the stream.
+                await self._send(
+                    writer,
+                    error_response(HTTPStatus.BAD_REQUEST),
+                    keep_alive=False,
+                    head_only=False,
+                )
+                return
+            try:
+                response = await self.handler(request)
+            except Exception:
+                logger.exception("Status request failed", path=request.path)
+                response = error_response(HTTPStatus.INTERNAL_SERVER_ERROR)
+            keep_alive = (
+                request.keep_alive and served + 1 < self.max_requests and response.stream is None
+            )
+            await self._send(writer, response, keep_alive, head_only=request.method == "HEAD")
+            if not keep_alive:
+                return
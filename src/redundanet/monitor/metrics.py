@@ -0,0 +1,164 @@
+"""Render the network status as Prometheus metrics (text exposition format 0.0.4).
+
+Rendered once per collection from the same :class:`NetworkStatus` as the page,
+so a scrape costs a memory copy — never a probe. Only the snapshot age is
+computed per scrape (:func:`snapshot_age_metric`).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections.abc import Iterable, Mapping
+
+from redundanet.monitor.status import NetworkStatus
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Collection-phase histogram bucket upper bounds, in seconds.
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_OVERALL_STATES = ("ok", "degraded", "down")
+
+
+class Histogram:
+    """Cumulative counts of observed durations, Prometheus-style."""
+
+    def __init__(self, buckets: Iterable[float] = PHASE_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is +Inf
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+def _label(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Family:
+    """One metric family's HELP/TYPE header and samples."""
+
+    def __init__(self, name: str, kind: str, help_text: str) -> None:
+        self.name = name
+        self.lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+    def add(self, value: float, suffix: str = "", **labels: object) -> None:
+        pairs = ",".join(f'{key}="{_label(v)}"' for key, v in labels.items())
+        selector = f"{{{pairs}}}" if pairs else ""
+        self.lines.append(f"{self.name}{suffix}{selector} {_number(value)}")
+
+
+def _histogram(family: _Family, histogram: Histogram, **labels: object) -> None:
+    running = 0
+    for bound, count in zip((*histogram.buckets, math.inf), histogram.counts, strict=True):
+        running += count
+        family.add(running, "_bucket", **labels, le=_number(bound))
+    family.add(histogram.total, "_sum", **labels)
+    family.add(running, "_count", **labels)
+
+
+def render_metrics(
+    status: NetworkStatus, phases: Mapping[str, Histogram], collected_at: float
+) -> str:
+    """The status and the collector's phase durations, as exposition text."""
+    families: list[_Family] = []
+
+    def family(name: str, kind: str, help_text: str) -> _Family:
+        families.append(_Family(f"redundanet_{name}", kind, help_text))
+        return families[-1]
+
+    overall = family("overall_status", "gauge", "1 for the network's current overall state.")
+    for state in _OVERALL_STATES:
+        overall.add(int(status.overall == state), state=state)
+
+    reachable = family("node_reachable", "gauge", "1 if the node answered its VPN probe.")
+    rtt = family("node_rtt_seconds", "gauge", "Round-trip time to the node over the VPN.")
+    loss = family("node_packet_loss_ratio", "gauge", "Share of probe echoes lost.")
+    uptime = family("node_uptime_ratio", "gauge", "Share of history samples the node was up.")
+    for node in sorted(status.nodes, key=lambda n: n.name):
+        if node.reachable is not None:  # unknown: its probe missed the deadline
+            reachable.add(int(node.reachable), node=node.name)
+        if node.rtt_ms is not None:
+            rtt.add(node.rtt_ms / 1000, node=node.name)
+        if node.loss_pct is not None:
+            loss.add(node.loss_pct / 100, node=node.name)
+        windows = {
+            "24h": node.uptime_24h,
+            "7d": node.uptime_7d,
+            "30d": node.uptime_30d,
+            "90d": node.uptime_90d,
+        }
+        for window, pct in windows.items():
+            if pct is not None:
+                uptime.add(pct / 100, node=node.name, window=window)
+
+    grid = status.grid
+    family("storage_servers_expected", "gauge", "Manifest nodes with the storage role.").add(
+        grid.storage_expected
+    )
+    if grid.storage_connected is not None:
+        family(
+            "storage_servers_connected", "gauge", "Storage servers announced to the introducer."
+        ).add(grid.storage_connected)
+
+    replication = status.replication
+    if replication is not None:
+        objects = family("census_objects", "gauge", "Objects in a storage server's census.")
+        used = family("census_disk_used_bytes", "gauge", "Share bytes on a storage server.")
+        for name, census in sorted(replication.per_server.items()):
+            objects.add(census.objects, server=name)
+            used.add(census.disk_used_bytes, server=name)
+        family("replication_objects", "gauge", "Objects across all censuses.").add(
+            replication.objects_total
+        )
+        family(
+            "replication_fully_replicated_objects", "gauge", "Objects on the target server count."
+        ).add(replication.fully_replicated)
+        family(
+            "replication_under_replicated_objects", "gauge", "Objects below the target count."
+        ).add(replication.under_replicated)
+        family("replication_census_complete", "gauge", "1 if every storage node reported.").add(
+            int(replication.complete)
+        )
+        family("replication_estimated", "gauge", "1 if counts are sketch estimates.").add(
+            int(replication.estimated)
+        )
+        if replication.impact is not None:
+            family(
+                "replication_at_risk_objects", "gauge", "Objects any one server failure loses."
+            ).add(replication.impact.at_risk)
+            family(
+                "replication_unreadable_objects", "gauge", "Objects on too few servers to read."
+            ).add(replication.impact.unreadable)
+
+    durations = family(
+        "collection_phase_duration_seconds", "histogram", "Time spent in each collection phase."
+    )
+    for phase, histogram in sorted(phases.items()):
+        _histogram(durations, histogram, phase=phase)
+    family("last_collection_timestamp_seconds", "gauge", "When the snapshot was collected.").add(
+        collected_at
+    )
+    return "".join("\n".join(f.lines) + "\n" for f in families)
+
+
+def snapshot_age_metric(age: float) -> str:
+    """The per-scrape snapshot age, appended to :func:`render_metrics`' text."""
+    age_family = _Family(
+        "redundanet_snapshot_age_seconds", "gauge", "Seconds since the snapshot was collected."
+    )
+    age_family.add(age)
+    return "\n".join(age_family.lines) + "\n"
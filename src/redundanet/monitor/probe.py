@@ -0,0 +1,308 @@
+"""Batched ICMP reachability probes for VPN peers.
+
+Forking ``ping`` once per node costs a process per peer per minute and gives a
+single noisy sample. :func:`probe` sends a few echo requests to every target
+from one unprivileged ICMP datagram socket and matches the replies by
+sequence number, so a whole node list is measured in about one timeout.
+
+Datagram ICMP sockets need the caller's group inside
+``net.ipv4.ping_group_range`` (Docker allows every group by default). Where
+they are not allowed the whole batch goes to one ``fping`` run instead, and
+without fping to ``ping`` subprocesses run side by side.
+
+Also runnable as ``python -m redundanet.monitor.probe --json IP...`` — the CLI
+uses that inside the tinc container, whose network namespace holds the VPN.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import re
+import socket
+import struct
+import subprocess
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Protocol
+
+PROBE_COUNT = 3  # echo requests per target
+PROBE_TIMEOUT = 2.0  # seconds a reply may take
+PROBE_INTERVAL = 0.2  # seconds between rounds (ping's unprivileged minimum)
+
+_ECHO_REQUEST = 8
+_ECHO_REPLY = 0
+_HEADER = struct.Struct(">BBHHH")  # type, code, checksum, identifier, sequence
+
+
+@dataclass
+class ProbeResult:
+    """Echo statistics for one target."""
+
+    target: str
+    sent: int = 0
+    rtts_ms: list[float] = field(default_factory=list)
+
+    @property
+    def received(self) -> int:
+        return len(self.rtts_ms)
+
+    @property
+    def reachable(self) -> bool:
+        return bool(self.rtts_ms)
+
+    @property
+    def min_ms(self) -> float | None:
+        return min(self.rtts_ms) if self.rtts_ms else None
+
+    @property
+    def avg_ms(self) -> float | None:
+        return sum(self.rtts_ms) / len(self.rtts_ms) if self.rtts_ms else None
+
+    @property
+    def loss_pct(self) -> float | None:
+        if not self.sent:
+            return None
+        return round(100.0 * (self.sent - self.received) / self.sent, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "min_ms": self.min_ms,
+            "avg_ms": self.avg_ms,
+            "loss_pct": self.loss_pct,
+        }
+
+
+class EchoSocket(Protocol):
+    """The slice of a datagram ICMP socket the prober uses."""
+
+    def sendto(self, data: bytes, address: tuple[str, int], /) -> int: ...
+
+    def recvfrom(self, bufsize: int, /) -> tuple[bytes, Any]: ...
+
+    def settimeout(self, value: float | None, /) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\0"
+    total: int = sum(struct.unpack(f">{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(sequence: int) -> bytes:
+    # The kernel replaces the identifier with the socket's own, so replies are
+    # matched by sequence number (unique within one batch) and source address.
+    payload = b"redundanet-probe"
+    header = _HEADER.pack(_ECHO_REQUEST, 0, 0, 0, sequence)
+    return _HEADER.pack(_ECHO_REQUEST, 0, _checksum(header + payload), 0, sequence) + payload
+
+
+def _echo_reply_sequence(packet: bytes) -> int | None:
+    if packet and packet[0] >> 4 == 4:  # BSD/macOS deliver the IP header too
+        packet = packet[(packet[0] & 0x0F) * 4 :]
+    if len(packet) < _HEADER.size:
+        return None
+    kind, _, _, _, sequence = _HEADER.unpack_from(packet)
+    return sequence if kind == _ECHO_REPLY else None
+
+
+def probe_socket(
+    sock: EchoSocket,
+    targets: Sequence[str],
+    count: int = PROBE_COUNT,
+    timeout: float = PROBE_TIMEOUT,
+    interval: float = PROBE_INTERVAL,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict[str, ProbeResult]:
+    """Ping every target ``count`` times over one ICMP datagram socket.
+
+    A round of requests goes out every ``interval`` seconds; replies are read
+    in between and until ``timeout`` after the last round. A reply later than
+    ``timeout`` after its request counts as lost.
+    """
+    results = {target: ProbeResult(target) for target in targets}
+    pending: dict[int, tuple[str, float]] = {}  # sequence -> (target, sent at)
+    sequence = 0
+
+    def receive_until(until: float) -> None:
+        while pending:
+            remaining = until - clock()
+            if remaining <= 0:
+                return
+            sock.settimeout(remaining)
+            try:
+                packet, address = sock.recvfrom(2048)
+            except (TimeoutError, BlockingIOError):
+                return
+            except OSError:
+                continue  # e.g. an ICMP error queued for an earlier request
+            received_at = clock()
+            reply_to = _echo_reply_sequence(packet)
+            if reply_to is None or pending.get(reply_to, ("",))[0] != address[0]:
+                continue  # duplicate, stray, or from someone else
+            target, sent_at = pending.pop(reply_to)
+            if received_at - sent_at <= timeout:
+                results[target].rtts_ms.append(round((received_at - sent_at) * 1000, 3))
+
+    for round_number in range(count):
+        round_start = clock()
+        for target in targets:
+            sequence = (sequence + 1) & 0xFFFF
+            results[target].sent += 1
+            try:
+                sock.sendto(_echo_request(sequence), (target, 0))
+            except OSError:
+                continue  # unroutable: counts as lost
+            pending[sequence] = (target, clock())
+        if round_number == count - 1:
+            receive_until(clock() + timeout)
+            break
+        next_round = round_start + interval
+        receive_until(next_round)
+        # Every reply may be in already; the rounds stay ``interval`` apart.
+        if (remaining := next_round - clock()) > 0:
+            sleep(remaining)
+    return results
+
+
+# fping -C prints per-target samples on stderr: "10.100.0.2 : 0.41 - 0.39"
+_FPING_LINE = re.compile(r"^(\S+)\s+:\s+(.*)$")
+
+
+def _probe_fping(
+    targets: Sequence[str],
+    count: int,
+    timeout: float,
+    interval: float,
+) -> dict[str, ProbeResult]:
+    """One ``fping`` run for the whole batch (FileNotFoundError without fping)."""
+    result = subprocess.run(
+        [
+            "fping",
+            "-q",
+            "-C",
+            str(count),
+            "-t",
+            str(int(timeout * 1000)),
+            "-p",
+            str(max(int(interval * 1000), 20)),
+            *targets,
+        ],
+        capture_output=True,
+        text=True,
+        timeout=count * interval + timeout + 5,
+    )
+    results = {target: ProbeResult(target) for target in targets}
+    for line in result.stderr.splitlines():
+        match = _FPING_LINE.match(line.strip())
+        if not match or match.group(1) not in results:
+            continue
+        samples = match.group(2).split()
+        entry = results[match.group(1)]
+        entry.sent = len(samples)
+        entry.rtts_ms = [float(s) for s in samples if s != "-"]
+    return results
+
+
+def _probe_ping(
+    targets: Sequence[str], count: int, timeout: float, interval: float
+) -> dict[str, ProbeResult]:
+    """Last resort: iputils ``ping`` per target, all running at once."""
+
+    def one(target: str) -> ProbeResult:
+        entry = ProbeResult(target, sent=count)
+        try:
+            result = subprocess.run(
+                [
+                    "ping",
+                    "-n",
+                    "-c",
+                    str(count),
+                    "-i",
+                    str(interval),
+                    "-W",
+                    str(max(int(timeout), 1)),
+                    target,
+                ],
+                capture_output=True,
+                text=True,
+                timeout=count * interval + timeout + 5,
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            return entry
+        for token in result.stdout.split():
+            if token.startswith("time="):
+                with contextlib.suppress(ValueError):
+                    entry.rtts_ms.append(float(token[5:]))
+        return entry
+
+    with ThreadPoolExecutor(max_workers=min(len(targets), 32)) as pool:
+        return {entry.target: entry for entry in pool.map(one, targets)}
+
+
+def open_echo_socket() -> socket.socket:
+    """An unprivileged ICMP datagram socket (PermissionError where not allowed)."""
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+
+
+def probe(
+    targets: Iterable[str],
+    count: int = PROBE_COUNT,
+    timeout: float = PROBE_TIMEOUT,
+    interval: float = PROBE_INTERVAL,
+) -> dict[str, ProbeResult]:
+    """Echo statistics for every target, measured as one batch.
+
+    Empty targets are reported unprobed (``sent == 0``).
+    """
+    targets = list(targets)
+    wanted = list(dict.fromkeys(t for t in targets if t))
+    results: dict[str, ProbeResult] = {}
+    if wanted:
+        try:
+            sock = open_echo_socket()
+        except OSError:
+            try:
+                results = _probe_fping(wanted, count, timeout, interval)
+            except (OSError, subprocess.SubprocessError):
+                results = _probe_ping(wanted, count, timeout, interval)
+        else:
+            try:
+                results = probe_socket(sock, wanted, count, timeout, interval)
+            finally:
+                sock.close()
+    for target in targets:
+        results.setdefault(target, ProbeResult(target))
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Batched ICMP probe of VPN peers.")
+    parser.add_argument("targets", nargs="*")
+    parser.add_argument("--count", "-c", type=int, default=PROBE_COUNT)
+    parser.add_argument("--timeout", "-W", type=float, default=PROBE_TIMEOUT)
+    parser.add_argument("--json", action="store_true", help="print one JSON object")
+    args = parser.parse_args(argv)
+
+    results = probe(args.targets, count=args.count, timeout=args.timeout)
+    if args.json:
+        print(json.dumps({target: r.to_dict() for target, r in results.items()}))
+        return
+    for r in results.values():
+        avg = "-" if r.avg_ms is None else f"{r.avg_ms:.2f}"
+        low = "-" if r.min_ms is None else f"{r.min_ms:.2f}"
+        print(f"{r.target}\t{r.received}/{r.sent}\tmin {low}\tavg {avg}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,19 @@
 Design notes: status colors (good/warning/serious/critical) are never used
 alone — every state ships an icon + word; values and labels stay in text
 tokens. Light and dark modes are both explicit. The node table doubles as the
-accessible/table view of the data.
+accessible/table view of the data. The page patches itself from the hub's
+/events stream (:func:`render_diff`) rather than reloading every minute.
 """
 
 from __future__ import annotations
 
-from redundanet.monitor.status import NetworkStatus
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from redundanet.monitor.status import NetworkStatus, NodeStatus
 
 _OVERALL = {
     "ok": ("●", "All systems operational", "good"),
@@ -66,6 +73,35 @@ code { font-size: 13px; }
 .wrap { overflow-x: auto; }
 """
 
+# Patches the page from /events (see render_diff) instead of reloading it. A
+# page that missed a patch — its state no longer matches — reloads once.
+_LIVE_JS = """
+(function () {
+  var main = document.querySelector("main");
+  if (!window.EventSource) { setTimeout(function () { location.reload(); }, 60000); return; }
+  var events = new EventSource("/events");
+  function set(id, html) { var el = document.getElementById(id); if (el) el.innerHTML = html; }
+  events.addEventListener("hello", function (e) {
+    if (e.data !== main.dataset.state) location.reload();
+  });
+  events.addEventListener("updated", function (e) { set("updated", e.data); });
+  events.addEventListener("diff", function (e) {
+    var diff = JSON.parse(e.data);
+    if (diff.reload || diff.from !== main.dataset.state) { location.reload(); return; }
+    if ("overall" in diff) set("overall", diff.overall);
+    if ("notes" in diff) set("notes", diff.notes);
+    if ("online" in diff) set("online", diff.online);
+    set("updated", diff.updated);
+    var rows = document.querySelectorAll("tr[data-pos]");
+    for (var i = 0; i < rows.length; i++) {
+      var html = (diff.nodes || {})[rows[i].dataset.pos];
+      if (html !== undefined) rows[i].querySelector("td.state").innerHTML = html;
+    }
+    main.dataset.state = diff.to;
+  });
+})();
+"""
+
 
 def _esc(value: object) -> str:
     return (
@@ -96,53 +132,218 @@ def _uptime_cell(pct: float | None) -> str:
     )
 
 
+def _pct_cell(pct: float | None) -> str:
+    if pct is None:
+        return '<span style="color:var(--text-2)">—</span>'
+    return f"{pct}%"
+
+
+def _rtt_cell(p50: float | None, p95: float | None) -> str:
+    if p50 is None or p95 is None:
+        return '<span style="color:var(--text-2)">—</span>'
+    return f"{p50:.0f} / {p95:.0f} ms"
+
+
+def _state_cell(node: NodeStatus, detail: bool = True) -> str:
+    """The VPN link cell; without ``detail`` (RTT, loss) it is the node's state key."""
+    if node.is_self:
+        state = '<span class="dot" style="background:var(--good)"></span>online (hub)'
+    elif node.reachable:
+        rtt = f" · {node.rtt_ms:.0f} ms" if node.rtt_ms is not None and detail else ""
+        if node.loss_pct and detail:
+            rtt += f" · {node.loss_pct:.0f}% loss"
+        state = f'<span class="dot" style="background:var(--good)"></span>online{rtt}'
+    elif node.reachable is None:  # its ping missed the collection deadline
+        state = '<span class="dot" style="background:var(--text-2)"></span>unknown'
+    else:
+        state = '<span class="dot" style="background:var(--critical)"></span>offline'
+        if node.probe_interval_s and node.probe_interval_s >= 120:  # backing off
+            state += f" · checked every {node.probe_interval_s / 60:.0f} min"
+    if node.flapping:
+        state += ' · <span style="color:var(--warning)">flapping</span>'
+    return state
+
+
+def _overall_pill(status: NetworkStatus) -> str:
+    icon, word, tone = _OVERALL.get(status.overall, ("?", status.overall, "warning"))
+    return f'<span style="color:var(--{tone})">{icon}</span> {_esc(word)}'
+
+
+def _notes_html(status: NetworkStatus) -> str:
+    if not status.notes:
+        return ""
+    items = "".join(f"<li>{_esc(note)}</li>" for note in status.notes)
+    return f'<div class="notes"><strong>Notes</strong><ul>{items}</ul></div>'
+
+
+def _online_value(status: NetworkStatus) -> str:
+    return f"{sum(1 for n in status.nodes if n.reachable)}/{len(status.nodes)}"
+
+
+def page_order(status: NetworkStatus) -> list[NodeStatus]:
+    """The nodes in the order the page lists them (by VPN IP)."""
+    return sorted(status.nodes, key=lambda n: n.vpn_ip)
+
+
+def live_state(status: NetworkStatus) -> dict[str, Any]:
+    """What the live page tracks: the verdict, the notes and each node's state.
+
+    Nodes are ``[name, state]`` in page order: rows are matched by position,
+    since a manifest may repeat a name. RTT and loss are left out, so a
+    collection that only moved numbers changes nothing here and pushes
+    nothing to viewers.
+    """
+    return {
+        "overall": status.overall,
+        "notes": list(status.notes),
+        "nodes": [[node.name, _state_cell(node, detail=False)] for node in page_order(status)],
+    }
+
+
+def state_tag(state: dict[str, Any]) -> str:
+    """A short fingerprint of a :func:`live_state`, stamped on the page."""
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def render_diff(
+    before: dict[str, Any] | None, status: NetworkStatus
+) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """The new live state, and the patch from ``before`` to it (None: no change).
+
+    The patch carries ready-to-insert HTML for what changed: the verdict pill,
+    the notes, the online tile and each changed node's link cell, keyed by its
+    row's position. If the nodes or their order changed, it asks the page to
+    reload instead. For a collection that changed nothing the server sends
+    only its time, as an ``updated`` event.
+    """
+    after = live_state(status)
+    if before is None or before == after:
+        return after, None
+    diff: dict[str, Any] = {"from": state_tag(before), "to": state_tag(after)}
+    if [name for name, _ in before["nodes"]] != [name for name, _ in after["nodes"]]:
+        diff["reload"] = True
+        return after, diff
+    diff["updated"] = status.generated_at
+    if before["overall"] != after["overall"]:
+        diff["overall"] = _overall_pill(status)
+    if before["notes"] != after["notes"]:
+        diff["notes"] = _notes_html(status)
+    changed = {
+        position: _state_cell(node)
+        for position, node in enumerate(page_order(status))
+        if before["nodes"][position] != after["nodes"][position]
+    }
+    if changed:
+        diff["nodes"] = changed
+        diff["online"] = _online_value(status)
+    return after, diff
+
+
 def _replication_value(status: NetworkStatus) -> str:
     replication = status.replication
     if replication is None:
         return "—"
+    about = "≈" if replication.estimated else ""  # sketch mode: sampled counts
     if not replication.complete:
         # With a census missing, per-object counts would be misleadingly low.
-        return f"?/{replication.objects_total}"
-    return f"{replication.fully_replicated}/{replication.objects_total}"
+        return f"?/{about}{replication.objects_total}"
+    return f"{about}{replication.fully_replicated}/{about}{replication.objects_total}"
 
 
-def render_html(status: NetworkStatus) -> str:
-    icon, word, tone = _OVERALL.get(status.overall, ("?", status.overall, "warning"))
-    online = sum(1 for n in status.nodes if n.reachable)
+# Rows in the "most critical nodes" ranking.
+CRITICAL_NODES_SHOWN = 5
+
+
+def _impact_html(status: NetworkStatus) -> str:
+    """The "most critical nodes" section: what each failure would make unreadable."""
+    impact = status.replication.impact if status.replication else None
+    if impact is None:
+        return ""
+    rows = [
+        (f"<code>{_esc(name)}</code>", lost)
+        for name, lost in impact.critical_nodes[:CRITICAL_NODES_SHOWN]
+        if lost
+    ]
+    rows += [
+        (f"<code>{_esc(a)}</code> + <code>{_esc(b)}</code>", lost)
+        for a, b, lost in impact.worst_pairs[:1]
+        if lost
+    ]
+    rows += [(f"region {_esc(region)}", lost) for region, lost in impact.regions.items() if lost]
+    partial = "" if status.replication and status.replication.complete else " (partial census)"
+    summary = (
+        f"{impact.at_risk} object(s) sit on exactly {impact.shares_needed} servers: "
+        f"losing any one of their holders makes them unreadable{partial}."
+    )
+    if not rows:
+        return f"<h1>Most critical nodes</h1><p>{summary} No single server failure loses data.</p>"
+    body = "".join(f"<tr><td>{what}</td><td>{lost}</td></tr>" for what, lost in rows)
+    return f"""<h1>Most critical nodes</h1>
+<p>{summary}</p>
+<div class="wrap"><table>
+<thead><tr><th>If offline</th><th>Objects unreadable</th></tr></thead>
+<tbody>{body}</tbody>
+</table></div>
+"""
+
+
+@dataclass
+class PageParts:
+    """The page cut around its node rows, so a view can pick which rows to show."""
+
+    head: str
+    nodes: list[NodeStatus]  # in page order
+    rows: list[str]  # one per node
+    tail: str
+
+
+_TABLE_OPEN = """<div class="wrap"><table>
+<thead><tr><th>Node</th><th>VPN link</th><th>Roles</th><th>Manifest</th><th>Stored</th><th>RTT p50/p95 (24h)</th><th>Uptime (24h)</th><th>7d</th><th>30d</th></tr></thead>
+<tbody>"""
+_TABLE_CLOSE = """</tbody>
+</table></div>
+"""
+
+
+def short_role(role: str) -> str:
+    """A role as the page shows it: ``storage``, ``vpn``, ``introducer``..."""
+    return role.removeprefix("tahoe_").replace("tinc_vpn", "vpn")
+
+
+def _node_row(node: NodeStatus, position: int, status: NetworkStatus) -> str:
+    replication = status.replication
+    stored = '<span style="color:var(--text-2)">—</span>'
+    if replication and node.name in replication.per_server:
+        census = replication.per_server[node.name]
+        stored = f"{census.objects} obj · {_esc(_human_bytes(census.disk_used_bytes))}"
+        if census.expiring_shares:
+            stored += (
+                ' · <span style="color:var(--warning)">'
+                f"{_esc(_human_bytes(census.expiring_bytes))} expiring</span>"
+            )
+    return (
+        f'<tr data-node="{_esc(node.name)}" data-pos="{position}">'
+        f"<td><code>{_esc(node.name)}</code></td>"
+        f'<td class="state">{_state_cell(node)}</td>'
+        f"<td>{_esc(', '.join(short_role(r) for r in node.roles))}</td>"
+        f"<td>{_esc(node.manifest_status)}</td>"
+        f"<td>{stored}</td>"
+        f"<td>{_rtt_cell(node.rtt_p50_ms, node.rtt_p95_ms)}</td>"
+        f"<td>{_uptime_cell(node.uptime_24h)}</td>"
+        f"<td>{_pct_cell(node.uptime_7d)}</td>"
+        f"<td>{_pct_cell(node.uptime_30d)}</td>"
+        "</tr>"
+    )
+
+
+def render_parts(status: NetworkStatus) -> PageParts:
+    """Render everything once; :func:`render_page` assembles views from it."""
     grid = status.grid
     connected = "—" if grid.storage_connected is None else str(grid.storage_connected)
     tolerance = grid.tolerable_failures
     tolerance_text = "—" if tolerance is None else str(tolerance)
-
-    replication = status.replication
-    rows = []
-    for node in sorted(status.nodes, key=lambda n: n.vpn_ip):
-        if node.is_self:
-            state = '<span class="dot" style="background:var(--good)"></span>online (hub)'
-        elif node.reachable:
-            rtt = f" · {node.rtt_ms:.0f} ms" if node.rtt_ms is not None else ""
-            state = f'<span class="dot" style="background:var(--good)"></span>online{rtt}'
-        else:
-            state = '<span class="dot" style="background:var(--critical)"></span>offline'
-        stored = '<span style="color:var(--text-2)">—</span>'
-        if replication and node.name in replication.per_server:
-            census = replication.per_server[node.name]
-            stored = f"{census.objects} obj · {_esc(_human_bytes(census.disk_used_bytes))}"
-        rows.append(
-            "<tr>"
-            f"<td><code>{_esc(node.name)}</code></td>"
-            f"<td>{state}</td>"
-            f"<td>{_esc(', '.join(r.removeprefix('tahoe_').replace('tinc_vpn', 'vpn') for r in node.roles))}</td>"
-            f"<td>{_esc(node.manifest_status)}</td>"
-            f"<td>{stored}</td>"
-            f"<td>{_uptime_cell(node.uptime_24h)}</td>"
-            "</tr>"
-        )
-
-    notes_html = ""
-    if status.notes:
-        items = "".join(f"<li>{_esc(note)}</li>" for note in status.notes)
-        notes_html = f'<div class="notes"><strong>Notes</strong><ul>{items}</ul></div>'
+    nodes = page_order(status)
 
     upload_state = (
         "unknown"
@@ -150,35 +351,60 @@ def render_html(status: NetworkStatus) -> str:
         else ("yes" if grid.uploads_possible else "NO — too few servers")
     )
 
-    return f"""<!doctype html>
+    head = f"""<!doctype html>
 <html lang="en"><head>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
-<meta http-equiv="refresh" content="60">
+<noscript><meta http-equiv="refresh" content="60"></noscript>
 <title>RedundaNet status</title>
 <style>{_CSS}</style>
-</head><body><main>
+</head><body><main data-state="{state_tag(live_state(status))}">
 <h1>RedundaNet network status</h1>
-<div class="sub">Distributed encrypted storage · updated {_esc(status.generated_at)} · refreshes every 60s</div>
-<span class="pill"><span style="color:var(--{tone})">{icon}</span> {_esc(word)}</span>
+<div class="sub">Distributed encrypted storage · updated <span id="updated">{_esc(status.generated_at)}</span> · live</div>
+<span class="pill" id="overall">{_overall_pill(status)}</span>
 <div class="tiles">
-  <div class="tile"><div class="v">{online}/{len(status.nodes)}</div><div class="l">nodes online</div></div>
+  <div class="tile"><div class="v" id="online">{_online_value(status)}</div><div class="l">nodes online</div></div>
   <div class="tile"><div class="v">{connected}/{grid.storage_expected}</div><div class="l">storage servers</div></div>
   <div class="tile"><div class="v">{grid.shares_needed}-of-{grid.shares_total}</div><div class="l">erasure coding</div></div>
   <div class="tile"><div class="v">{tolerance_text}</div><div class="l">server failures tolerated</div></div>
   <div class="tile"><div class="v">{_replication_value(status)}</div><div class="l">objects fully replicated</div></div>
 </div>
 <p>New uploads require {grid.shares_happy} distinct server(s) — currently possible: <strong>{_esc(upload_state)}</strong>.</p>
-{notes_html}
+<div id="notes">{_notes_html(status)}</div>
 <h1>Nodes</h1>
-<div class="wrap"><table>
-<thead><tr><th>Node</th><th>VPN link</th><th>Roles</th><th>Manifest</th><th>Stored</th><th>Uptime (24h)</th></tr></thead>
-<tbody>{"".join(rows)}</tbody>
-</table></div>
-<footer>
+"""
+    tail = f"""{_impact_html(status)}<footer>
   <a href="/status.json">status.json</a> ·
   <a href="https://github.com/adefilippo83/redundanet">source &amp; join</a> ·
   measured from the network hub
 </footer>
-</main></body></html>
+</main><script>{_LIVE_JS}</script></body></html>
 """
+    rows = [_node_row(node, position, status) for position, node in enumerate(nodes)]
+    return PageParts(head, nodes, rows, tail)
+
+
+def render_pager(
+    first: int, last: int, total: int, prev_href: str | None, next_href: str | None, about: str
+) -> str:
+    """The line above a filtered or paged node table: what is shown, and links."""
+    shown = f"{first}&ndash;{last} of {total}" if total else "no nodes"
+    links = [
+        f'<a href="{_esc(href)}">{label}</a>'
+        for label, href in (("&lsaquo; previous", prev_href), ("next &rsaquo;", next_href))
+        if href
+    ]
+    filtered = f' · {_esc(about)} · <a href="/">all nodes</a>' if about else ""
+    return (
+        f'<p class="sub">Showing {shown}{filtered}{" · " if links else ""}{" · ".join(links)}</p>\n'
+    )
+
+
+def render_page(parts: PageParts, positions: Iterable[int] | None = None, pager: str = "") -> str:
+    """The page with the rows at ``positions`` (all by default) under ``pager``."""
+    rows = parts.rows if positions is None else [parts.rows[i] for i in positions]
+    return parts.head + pager + _TABLE_OPEN + "".join(rows) + _TABLE_CLOSE + parts.tail
+
+
+def render_html(status: NetworkStatus) -> str:
+    return render_page(render_parts(status))
@@ -0,0 +1,291 @@
+"""Per-object replication counting over sorted, fixed-width index arrays.
+
+The hub holds every storage node's census between collections and counts how
+many nodes hold each object. With millions of objects a ``dict`` of holder
+counts costs gigabytes and seconds of CPU, so each node's indexes are kept as
+one sorted array of 16-byte keys (:class:`IndexArray`) and counted by sorting
+them together: equal keys end up adjacent, and each run's length is that
+object's holder count — no Python object per storage index.
+
+NumPy does the sorting when it is installed (the hub image ships it); without
+it the same arrays are merged with :func:`heapq.merge`, which is slower but
+keeps memory at the size of the arrays.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+from redundanet.monitor.census import SI_BYTES, PackedIndexes, index_key
+
+try:  # optional: vectorized counting when NumPy is installed
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment, unused-ignore]
+
+KEY_BYTES = SI_BYTES
+_KEY_DTYPE = f"S{KEY_BYTES}"
+
+
+def _keys_buffer(values: Iterable[Any]) -> bytes:
+    """Concatenated 16-byte keys for index values (raw bytes or SI strings)."""
+    if isinstance(values, PackedIndexes):
+        return values.buffer  # binary census: already raw
+    return b"".join(
+        value if isinstance(value, bytes) and len(value) == KEY_BYTES else index_key(str(value))
+        for value in values
+    )
+
+
+def _split(buffer: bytes) -> list[bytes]:
+    return [buffer[i : i + KEY_BYTES] for i in range(0, len(buffer), KEY_BYTES)]
+
+
+class IndexArray:
+    """One node's storage indexes as a sorted, duplicate-free array of 16-byte keys."""
+
+    __slots__ = ("_keys",)
+
+    def __init__(self, keys: Any = None) -> None:
+        # A NumPy "S16" array when NumPy is available, else the raw buffer.
+        if keys is None:
+            keys = np.empty(0, dtype=_KEY_DTYPE) if np is not None else b""
+        self._keys = keys
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> IndexArray:
+        """Keys for census values: SI strings, raw keys, or a :class:`PackedIndexes`."""
+        return cls(cls._sorted_unique(_keys_buffer(values)))
+
+    @staticmethod
+    def _sorted_unique(buffer: bytes) -> Any:
+        if np is None:
+            return b"".join(sorted(set(_split(buffer))))
+        keys = np.frombuffer(buffer, dtype=_KEY_DTYPE)
+        if len(keys) > 1 and not bool(np.all(keys[1:] > keys[:-1])):
+            keys = np.unique(keys)  # binary censuses arrive sorted and skip this
+        return keys
+
+    def __len__(self) -> int:
+        return len(self._keys) // (1 if np is not None else KEY_BYTES)
+
+    def __iter__(self) -> Iterator[bytes]:
+        if np is not None:
+            return iter(_split(self._keys.tobytes()))
+        return iter(_split(self._keys))
+
+    def __contains__(self, value: object) -> bool:
+        key = value if isinstance(value, bytes) else index_key(str(value))
+        if np is not None:
+            i = int(np.searchsorted(self._keys, key))
+            return i < len(self._keys) and bytes(self._keys[i]).ljust(KEY_BYTES, b"\0") == key
+        keys = _split(self._keys)
+        i = bisect.bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def apply(self, added: Iterable[Any], removed: Iterable[Any]) -> IndexArray:
+        """A new array with ``removed`` taken out and ``added`` merged in."""
+        add = self._sorted_unique(_keys_buffer(added))
+        drop = self._sorted_unique(_keys_buffer(removed))
+        if np is None:
+            keys = set(_split(self._keys))
+            keys.difference_update(_split(drop))
+            keys.update(_split(add))
+            return IndexArray(b"".join(sorted(keys)))
+        keys = self._keys
+        if len(drop) and len(keys):
+            at = np.searchsorted(keys, drop)
+            hit = at < len(keys)
+            hit[hit] = keys[at[hit]] == drop[hit]
+            keys = np.delete(keys, at[hit])
+        if len(add):
+            at = np.searchsorted(keys, add)
+            present = at < len(keys)
+            present[present] = keys[at[present]] == add[present]
+            keys = np.insert(keys, at[~present], add[~present])
+        return IndexArray(keys)
+
+
+def _sort_numpy(arrays: Sequence[IndexArray]) -> tuple[Any, Any]:
+    """Order of the arrays' concatenated keys, and which sorted keys start a new run.
+
+    Sorts the keys' 64-bit halves rather than the 16-byte strings.
+    """
+    words = [a._keys.view(">u8").reshape(-1, 2) for a in arrays if len(a)]
+    if not words:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    high = np.concatenate([w[:, 0] for w in words]).astype(np.uint64)
+    low = np.concatenate([w[:, 1] for w in words]).astype(np.uint64)
+    # Each array is sorted, so this is a merge of presorted runs (timsort).
+    order = np.argsort(high, kind="stable")
+    sorted_high, sorted_low = high[order], low[order]
+    same = sorted_high[1:] == sorted_high[:-1]
+    if bool(np.any(same & (sorted_low[1:] != sorted_low[:-1]))):
+        # Distinct keys sharing their first 8 bytes (never for real SIs): order fully.
+        order = np.lexsort((low, high))
+        sorted_high, sorted_low = high[order], low[order]
+        same = (sorted_high[1:] == sorted_high[:-1]) & (sorted_low[1:] == sorted_low[:-1])
+    else:
+        same &= sorted_low[1:] == sorted_low[:-1]
+    return order, np.concatenate(([True], ~same))
+
+
+def _counts_merge(arrays: Sequence[IndexArray]) -> Iterator[int]:
+    merged = heapq.merge(*(iter(a) for a in arrays))
+    return (sum(1 for _ in run) for _, run in itertools.groupby(merged))
+
+
+def replication_counts(arrays: Sequence[IndexArray], target: int) -> tuple[int, int]:
+    """``(objects, objects held by at least target arrays)`` across the arrays."""
+    if np is not None:
+        _, starts = _sort_numpy(arrays)
+        counts = np.diff(np.append(np.flatnonzero(starts), len(starts)))
+        return len(counts), int(np.count_nonzero(counts >= target))
+    objects = fully = 0
+    for count in _counts_merge(arrays):
+        objects += 1
+        fully += count >= target
+    return objects, fully
+
+
+# --- node-loss impact ------------------------------------------------------
+
+
+def _placement_numpy(arrays: Sequence[IndexArray]) -> tuple[list[Any], Any]:
+    """Per array, the object numbers it holds; and each object's holder count."""
+    sizes = [len(a) for a in arrays]
+    if not sum(sizes):
+        return [np.empty(0, dtype=np.int64) for _ in arrays], np.empty(0, dtype=np.int64)
+    order, starts = _sort_numpy(arrays)
+    objects = np.empty(len(order), dtype=np.int64)
+    objects[order] = np.cumsum(starts) - 1
+    bounds = np.cumsum([0, *sizes])
+    held = [objects[bounds[i] : bounds[i + 1]] for i in range(len(arrays))]
+    return held, np.bincount(objects)
+
+
+def _placement_merge(arrays: Sequence[IndexArray]) -> tuple[list[list[int]], list[int]]:
+    held: list[list[int]] = [[] for _ in arrays]
+    counts: list[int] = []
+    tagged = [zip(a, itertools.repeat(i)) for i, a in enumerate(arrays)]
+    for number, (_, run) in enumerate(
+        itertools.groupby(heapq.merge(*tagged), key=lambda item: item[0])
+    ):
+        holders = [i for _, i in run]
+        for i in holders:
+            held[i].append(number)
+        counts.append(len(holders))
+    return held, counts
+
+
+def _bitset(bits: Iterable[int], width: int) -> int:
+    """An int with the given bit numbers set (bit 0 = least significant)."""
+    if np is not None:
+        mask = np.zeros(width, dtype=bool)
+        mask[np.asarray(bits, dtype=np.int64)] = True
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+    buffer = bytearray((width + 7) // 8)
+    for bit in bits:
+        buffer[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class PlacementMatrix:
+    """Which server holds which object, as one bitset per server.
+
+    Answers "how many objects become unreadable if these servers go offline":
+    an object is lost once fewer than ``shares_needed`` of its holders remain.
+    Objects are numbered by their slack (holders beyond ``shares_needed``), so
+    the objects one more failure can hurt sit in a contiguous low range of
+    every bitset; a failure set of ``f`` servers only reads the first ``f``
+    slack levels, and the counts are popcounts of ANDed ints.
+
+    Each holder counts as one share. A server holding several shares of an
+    object makes it more robust than this says, so losses err high.
+    """
+
+    def __init__(self, holdings: Mapping[str, IndexArray], shares_needed: int) -> None:
+        self.servers = list(holdings)
+        self.shares_needed = shares_needed
+        arrays = list(holdings.values())
+        if np is not None:
+            held, counts = _placement_numpy(arrays)
+            slack = counts - shares_needed
+            rank = np.empty(len(slack), dtype=np.int64)
+            rank[np.argsort(slack, kind="stable")] = np.arange(len(slack))
+            held = [rank[ids] for ids in held]
+            levels = np.bincount(slack[slack >= 0]).tolist() if len(slack) else []
+            self.unreadable = int(np.count_nonzero(slack < 0))
+        else:
+            held, counts = _placement_merge(arrays)
+            slacks = [count - shares_needed for count in counts]
+            order = sorted(range(len(slacks)), key=slacks.__getitem__)
+            rank_of = [0] * len(slacks)
+            for position, number in enumerate(order):
+                rank_of[number] = position
+            held = [[rank_of[number] for number in ids] for ids in held]
+            levels = [0] * (max(slacks, default=-1) + 1)
+            for value in slacks:
+                if value >= 0:
+                    levels[value] += 1
+            self.unreadable = sum(1 for value in slacks if value < 0)
+        self.objects = len(counts)
+        # Bit range [start, start + size) of each slack level, 0 upwards.
+        self._levels: list[tuple[int, int]] = []
+        start = self.unreadable
+        for size in levels:
+            self._levels.append((start, size))
+            start += size
+        self._bits = {
+            name: _bitset(ids, self.objects) for name, ids in zip(self.servers, held, strict=True)
+        }
+
+    def _level(self, name: str, level: int) -> int:
+        start, size = self._levels[level]
+        return (self._bits[name] >> start) & ((1 << size) - 1)
+
+    @property
+    def at_risk(self) -> int:
+        """Objects held by exactly ``shares_needed`` servers: any failure loses them."""
+        return self._levels[0][1] if self._levels else 0
+
+    def lost(self, servers: Iterable[str]) -> int:
+        """Objects that become unreadable if all of ``servers`` go offline."""
+        failed = [name for name in dict.fromkeys(servers) if name in self._bits]
+        total = 0
+        for level in range(min(len(failed), len(self._levels))):
+            # Lost at this slack level: held by more than ``level`` failed servers.
+            at_least = [(1 << self._levels[level][1]) - 1] + [0] * (level + 1)
+            for name in failed:
+                bits = self._level(name, level)
+                for held in range(level + 1, 0, -1):
+                    at_least[held] |= at_least[held - 1] & bits
+            total += at_least[level + 1].bit_count()
+        return total
+
+    def single_losses(self) -> dict[str, int]:
+        """Objects lost per server failing alone."""
+        if not self._levels:
+            return dict.fromkeys(self.servers, 0)
+        return {name: self._level(name, 0).bit_count() for name in self.servers}
+
+    def pair_losses(self) -> list[tuple[str, str, int]]:
+        """Objects lost per pair of servers failing together, worst first."""
+        if not self._levels:
+            return [(a, b, 0) for a, b in itertools.combinations(self.servers, 2)]
+        first = {name: self._level(name, 0) for name in self.servers}
+        second = (
+            {name: self._level(name, 1) for name in self.servers}
+            if len(self._levels) > 1
+            else dict.fromkeys(self.servers, 0)
+        )
+        pairs = [
+            (a, b, (first[a] | first[b]).bit_count() + (second[a] & second[b]).bit_count())
+            for a, b in itertools.combinations(self.servers, 2)
+        ]
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
@@ -0,0 +1,174 @@
+"""Per-node probe scheduling for the hub's status collector.
+
+The collector runs every ``tick`` seconds, and each run only probes the nodes
+that are due:
+
+- healthy nodes every ``base_interval``;
+- nodes that stay unreachable with exponential backoff (``base_interval``,
+  twice that, ... up to ``max_backoff``), so a node that is down for days no
+  longer costs a probe timeout every minute;
+- ``inactive`` manifest nodes every ``max_backoff``;
+- flapping nodes (``flap_transitions`` state changes within ``flap_window``)
+  every tick, so their page state follows them closely.
+
+A node that is not probed keeps its last measured state, so every collection
+still has a verdict for every node and uptime samples stay one per node per
+sample — a node in backoff keeps counting as down, not as unsampled.
+
+Census fetches are staggered: after its first fetch each storage node is
+fetched once per ``base_interval``, at a fixed offset derived from its name,
+instead of all nodes at the top of every interval. In between, the census the
+hub holds stands in. Nodes in backoff are not fetched at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from redundanet.monitor.status import NodeStatus
+
+BASE_INTERVAL = 60.0
+TICKS_PER_INTERVAL = 4  # collector runs per base interval; flapping nodes are probed each
+MAX_BACKOFF = 30 * 60.0
+FLAP_WINDOW = 15 * 60.0
+FLAP_TRANSITIONS = 3
+
+
+@dataclass
+class _NodeState:
+    reachable: bool | None = None  # last measured
+    rtt_ms: float | None = None
+    loss_pct: float | None = None
+    failures: int = 0  # consecutive unreachable probes
+    next_probe_at: float = 0.0
+    next_census_at: float = 0.0
+    storage: bool = False  # has a census to fetch
+    transitions: deque[float] = field(default_factory=deque)
+
+
+@dataclass
+class ProbePlan:
+    """What one collection probes and fetches."""
+
+    probe: set[str] = field(default_factory=set)
+    census: set[str] = field(default_factory=set)  # fetch now
+    census_held: set[str] = field(default_factory=set)  # between fetches: the held one stands in
+
+
+class ProbeScheduler:
+    """Per-node probe state, kept across collections."""
+
+    def __init__(
+        self,
+        base_interval: float = BASE_INTERVAL,
+        ticks_per_interval: int = TICKS_PER_INTERVAL,
+        max_backoff: float = MAX_BACKOFF,
+        flap_window: float = FLAP_WINDOW,
+        flap_transitions: int = FLAP_TRANSITIONS,
+    ) -> None:
+        self.base_interval = base_interval
+        self.tick = base_interval / ticks_per_interval
+        self.max_backoff = max_backoff
+        self.flap_window = flap_window
+        self.flap_transitions = flap_transitions
+        self._nodes: dict[str, _NodeState] = {}
+
+    def _state(self, name: str) -> _NodeState:
+        state = self._nodes.get(name)
+        if state is None:
+            state = self._nodes[name] = _NodeState()
+        return state
+
+    def _census_offset(self, name: str) -> float:
+        digest = hashlib.blake2b(name.encode(), digest_size=4).digest()
+        return int.from_bytes(digest, "big") / 2**32 * self.base_interval
+
+    def flapping(self, name: str) -> bool:
+        state = self._nodes.get(name)
+        return state is not None and len(state.transitions) >= self.flap_transitions
+
+    def interval(self, node: NodeStatus) -> float:
+        """Seconds between probes of the node, as things stand."""
+        state = self._state(node.name)
+        if node.manifest_status == "inactive":
+            return self.max_backoff
+        if self.flapping(node.name):
+            return self.tick
+        if state.failures > 1:
+            doublings = min(state.failures - 1, 32)
+            return min(self.base_interval * (1 << doublings), self.max_backoff)
+        return self.base_interval
+
+    def plan(self, nodes: Iterable[NodeStatus], now: float) -> ProbePlan:
+        """The nodes to probe and fetch at ``now``."""
+        plan = ProbePlan()
+        slack = self.tick / 2  # runs drift a little; don't miss a slot by milliseconds
+        for node in nodes:
+            state = self._state(node.name)
+            if now + slack >= state.next_probe_at:
+                plan.probe.add(node.name)
+            state.storage = "tahoe_storage" in node.roles
+            if not state.storage:
+                continue
+            if self._census_paused(node.name, state):
+                continue  # in backoff: its census would only time out
+            if now + slack >= state.next_census_at:
+                plan.census.add(node.name)
+            else:
+                plan.census_held.add(node.name)
+        return plan
+
+    def _census_paused(self, name: str, state: _NodeState) -> bool:
+        return state.failures > 1 and not self.flapping(name)
+
+    def due(self, now: float) -> bool:
+        """Whether a run at ``now`` would probe or fetch anything for the nodes
+        planned so far (a node new to the manifest is always due)."""
+        slack = self.tick / 2
+        for name, state in self._nodes.items():
+            if now + slack >= state.next_probe_at:
+                return True
+            if (
+                state.storage
+                and not self._census_paused(name, state)
+                and now + slack >= state.next_census_at
+            ):
+                return True
+        return False
+
+    def carry(self, node: NodeStatus) -> None:
+        """Give an unprobed node its last measured state."""
+        state = self._state(node.name)
+        node.reachable = state.reachable
+        node.rtt_ms = state.rtt_ms
+        node.loss_pct = state.loss_pct
+
+    def record(self, node: NodeStatus, now: float) -> None:
+        """Take in a probe's outcome and schedule the node's next probe."""
+        state = self._state(node.name)
+        if node.reachable is None:  # missed the deadline: try again next run
+            return
+        if state.reachable is not None and node.reachable != state.reachable:
+            state.transitions.append(now)
+        while state.transitions and state.transitions[0] < now - self.flap_window:
+            state.transitions.popleft()
+        state.reachable, state.rtt_ms, state.loss_pct = node.reachable, node.rtt_ms, node.loss_pct
+        state.failures = 0 if node.reachable else state.failures + 1
+        state.next_probe_at = now + self.interval(node)
+
+    def census_fetched(self, name: str, now: float) -> None:
+        """Schedule the node's next census fetch at its offset in the next interval."""
+        offset = self._census_offset(name)
+        periods = (now - offset) // self.base_interval + 1
+        next_at = offset + periods * self.base_interval
+        if next_at - now < self.base_interval / 2:
+            next_at += self.base_interval  # its slot is close: keep the gap near an interval
+        self._state(name).next_census_at = next_at
+
+    def retain(self, names: set[str]) -> None:
+        """Forget nodes that left the manifest."""
+        for name in set(self._nodes) - names:
+            del self._nodes[name]
@@ -3,23 +3,61 @@
 Pure logic: every external input (manifest, pings, introducer counts, clock)
 is passed in, so the whole model is unit-testable. The status server wires in
 the real sources (docker/entrypoints/status_server.py).
+
+The probes themselves (pings, census fetches) are the slow part: they run
+concurrently on a small thread pool under one deadline per collection, and a
+probe that has not answered by then is reported as unknown instead of holding
+up the snapshot.
 """
 
 from __future__ import annotations
 
-import json
-from collections.abc import Callable
+import contextlib
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime, timedelta
-from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+
+from redundanet.monitor.census import HyperLogLog, in_sample
+from redundanet.monitor.history import HistoryStore, Sample
+from redundanet.monitor.probe import ProbeResult
+from redundanet.monitor.replication import IndexArray, PlacementMatrix, replication_counts
+
+if TYPE_CHECKING:
+    from redundanet.monitor.schedule import ProbePlan, ProbeScheduler
 
 # A pinger takes a VPN IP and returns the RTT in milliseconds, or None.
 Pinger = Callable[[str], "float | None"]
-# A census fetcher takes a VPN IP and returns the node's /census payload, or None.
-CensusFetcher = Callable[[str], "dict[str, Any] | None"]
+# A batch prober measures every VPN IP at once (see monitor.probe.probe).
+BatchProber = Callable[[list[str]], Mapping[str, ProbeResult]]
+
+
+class CensusFetcher(Protocol):
+    """Takes a VPN IP and returns the node's /census payload, or None.
+
+    ``since`` asks for a delta against a census generation the caller already
+    holds; it is only passed to nodes that reported a generation before.
+    """
+
+    def __call__(self, vpn_ip: str, since: int | None = None) -> dict[str, Any] | None: ...
+
+
+# A sketch fetcher takes a VPN IP and returns the node's /census?sketch=1
+# payload (sample + HyperLogLog instead of every storage index), or None.
+SketchFetcher = Callable[[str], "dict[str, Any] | None"]
+
 
 STALE_SYNC_SECONDS = 3600
+# Probes run on up to this many threads at once, and one collection waits for
+# them at most this long in total — well inside the status server's interval.
+PROBE_WORKERS = 32
+COLLECT_DEADLINE_SECONDS = 30.0
+# Server pairs whose joint failure loses the most objects, as reported.
+IMPACT_TOP_PAIRS = 5
+
+_T = TypeVar("_T")
 
 
 @dataclass
@@ -31,9 +69,20 @@ class NodeStatus:
     roles: list[str]
     manifest_status: str
     is_self: bool = False
-    reachable: bool = False
+    reachable: bool | None = False  # None = its ping missed the collection deadline
     rtt_ms: float | None = None
+    loss_pct: float | None = None  # from batch probes: share of echo requests lost
     uptime_24h: float | None = None  # percent, from history samples
+    uptime_7d: float | None = None  # from hourly rollups
+    uptime_30d: float | None = None  # from daily rollups
+    uptime_90d: float | None = None
+    rtt_p50_ms: float | None = None  # over the last 24h of history samples
+    rtt_p95_ms: float | None = None
+    region: str | None = None
+    # Under adaptive scheduling: seconds between this node's probes, and
+    # whether its state keeps changing (then it is probed every collector run).
+    probe_interval_s: float | None = None
+    flapping: bool = False
 
 
 @dataclass
@@ -67,6 +116,52 @@ class ServerCensus:
 
     objects: int
     disk_used_bytes: int
+    # From the census's lease section; None when the node doesn't report leases.
+    expiring_shares: int | None = None
+    expiring_bytes: int = 0
+    expiring_within_days: int = 0
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any], objects: int) -> ServerCensus:
+        leases = payload.get("leases") or {}
+        return cls(
+            objects=int(payload.get("object_count", objects)),
+            disk_used_bytes=int(payload.get("disk_used_bytes", 0)),
+            expiring_shares=int(leases["expiring_shares"]) if leases else None,
+            expiring_bytes=int(leases.get("expiring_bytes", 0)),
+            expiring_within_days=int(leases.get("expiring_within_days", 0)),
+        )
+
+
+@dataclass
+class FailureImpact:
+    """Objects that would become unreadable if storage servers went offline.
+
+    Computed from where the censuses say each object actually is, unlike
+    ``GridStatus.tolerable_failures`` which assumes even placement. Only
+    servers that reported a census are considered.
+    """
+
+    shares_needed: int
+    unreadable: int  # already held by fewer than shares_needed servers
+    at_risk: int  # held by exactly shares_needed servers: any one failure loses them
+    critical_nodes: list[tuple[str, int]]  # (server, objects lost), most critical first
+    worst_pairs: list[tuple[str, str, int]]  # top IMPACT_TOP_PAIRS pairs failing together
+    regions: dict[str, int] = field(default_factory=dict)  # region -> objects lost
+
+    @classmethod
+    def from_placement(
+        cls, placement: PlacementMatrix, regions: Mapping[str, list[str]]
+    ) -> FailureImpact:
+        singles = placement.single_losses()
+        return cls(
+            shares_needed=placement.shares_needed,
+            unreadable=placement.unreadable,
+            at_risk=placement.at_risk,
+            critical_nodes=sorted(singles.items(), key=lambda item: (-item[1], item[0])),
+            worst_pairs=placement.pair_losses()[:IMPACT_TOP_PAIRS],
+            regions={region: placement.lost(names) for region, names in sorted(regions.items())},
+        )
 
 
 @dataclass
@@ -77,6 +172,10 @@ class ReplicationStatus:
     are only authoritative when every storage node reported (``complete``);
     with a node missing, an object may look under-replicated merely because
     its holder didn't answer.
+
+    In sketch mode (``estimated``) the object total comes from merged
+    HyperLogLogs and the replicated counts are scaled up from a consistent
+    sample of objects, so all three are estimates.
     """
 
     objects_total: int
@@ -85,6 +184,41 @@ class ReplicationStatus:
     under_replicated: int
     complete: bool
     per_server: dict[str, ServerCensus] = field(default_factory=dict)
+    estimated: bool = False
+    impact: FailureImpact | None = None  # exact censuses only
+
+
+@dataclass
+class CollectorTimings:
+    """Where one collection spent its time, in seconds.
+
+    ``phases`` are sequential steps of the collector; ``nodes`` holds per-node
+    probe and census-fetch times, which overlap each other and the ``census``
+    and ``probe`` phases (those are the collector waiting on them).
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    nodes: dict[str, dict[str, float]] = field(default_factory=dict)
+    total: float = 0.0
+    interval: float | None = None  # the collector's period, when it has one
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the duration of the enclosed block to ``phases[name]``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = round(self.phases.get(name, 0.0) + elapsed, 4)
+
+    @property
+    def overran(self) -> bool:
+        return self.interval is not None and self.total > self.interval
+
+    def slowest(self, count: int = 3) -> list[tuple[str, float]]:
+        """The slowest phases, slowest first."""
+        return sorted(self.phases.items(), key=lambda item: -item[1])[:count]
 
 
 @dataclass
@@ -100,6 +234,7 @@ class NetworkStatus:
     manifest_synced_at: str | None
     replication: ReplicationStatus | None = None
     notes: list[str] = field(default_factory=list)
+    collector: CollectorTimings | None = None
 
     def to_dict(self) -> dict[str, Any]:
         data = asdict(self)
@@ -111,111 +246,547 @@ class NetworkStatus:
                 name: asdict(census)
                 for name, census in self.replication.per_server.items()  # type: ignore[union-attr]
             }
+        if self.collector is not None:
+            data["collector"]["overran"] = self.collector.overran
         return data
 
+    def summary_dict(self) -> dict[str, Any]:
+        """The verdict and counts without per-node detail, for frequent pollers."""
+        data = self.to_dict()
+        replication = data.get("replication")
+        if replication:
+            replication.pop("per_server", None)
+            if replication.get("impact"):
+                replication["impact"] = {
+                    key: replication["impact"][key] for key in ("at_risk", "unreadable")
+                }
+        return {
+            "network_name": self.network_name,
+            "overall": self.overall,
+            "generated_at": self.generated_at,
+            "nodes": {
+                "total": len(self.nodes),
+                "online": sum(1 for n in self.nodes if n.reachable),
+                "offline": sum(1 for n in self.nodes if n.reachable is False),
+                "unknown": sum(1 for n in self.nodes if n.reachable is None),
+            },
+            "grid": data["grid"],
+            "replication": replication,
+            "notes": len(self.notes),
+            "manifest_synced_at": self.manifest_synced_at,
+        }
+
+
+@dataclass
+class _HeldCensus:
+    generation: int | None
+    indexes: IndexArray
+    summary: ServerCensus | None = None
+
+
+class CensusCache:
+    """Each storage node's storage indexes, kept across collections.
+
+    Holding the last census per node lets the collector ask for
+    ``/census?since=<generation>`` and apply only what was added and removed.
+    A node that never reported a generation (or whose delta does not line up
+    with what is held) is fetched in full.
+
+    It also keeps the last replication counts and failure impact, with the
+    census generations they were counted from: a collection whose censuses
+    did not move reuses them instead of recounting every object. In sketch
+    mode it keeps each node's last sketch instead, to stand in between fetches.
+    """
+
+    def __init__(self) -> None:
+        self._held: dict[str, _HeldCensus] = {}
+        self._sketches: dict[str, tuple[dict[str, Any], ServerCensus]] = {}
+        self._counted: tuple[Any, tuple[int, int, FailureImpact]] | None = None
+
+    def generation(self, name: str) -> int | None:
+        held = self._held.get(name)
+        return held.generation if held else None
+
+    def apply(self, name: str, payload: dict[str, Any]) -> IndexArray | None:
+        """Merge a full or delta payload; returns the node's indexes, or None
+        if the payload is a delta against a generation this cache doesn't hold."""
+        raw_generation = payload.get("generation")
+        generation = int(raw_generation) if raw_generation is not None else None
+        if "storage_indexes" in payload:
+            indexes = IndexArray.from_values(payload.get("storage_indexes") or [])
+            self._held[name] = _HeldCensus(generation, indexes)
+            return indexes
+        held = self._held.get(name)
+        if held is None or held.generation is None or payload.get("since") != held.generation:
+            return None
+        held.indexes = held.indexes.apply(payload.get("added") or [], payload.get("removed") or [])
+        held.generation = generation
+        return held.indexes
+
+    def remember(self, name: str, summary: ServerCensus) -> None:
+        """Keep the totals of the census just applied, to stand in for it later."""
+        self._held[name].summary = summary
+
+    def held(self, name: str) -> tuple[IndexArray, ServerCensus] | None:
+        """The node's last census and its totals, if a whole one is held."""
+        held = self._held.get(name)
+        if held is None or held.summary is None:
+            return None
+        return held.indexes, held.summary
+
+    def remember_sketch(self, name: str, sketch: dict[str, Any], summary: ServerCensus) -> None:
+        self._sketches[name] = (sketch, summary)
+
+    def held_sketch(self, name: str) -> tuple[dict[str, Any], ServerCensus] | None:
+        """The node's last census sketch and its totals, if one is held."""
+        return self._sketches.get(name)
+
+    def retain(self, names: set[str]) -> None:
+        """Forget nodes that are no longer storage nodes in the manifest."""
+        for name in set(self._held) - names:
+            del self._held[name]
+        for name in set(self._sketches) - names:
+            del self._sketches[name]
+
+    def generations(self, names: Iterable[str]) -> tuple[tuple[str, int], ...] | None:
+        """The held generation of each node, or None if one has none to go by."""
+        key = []
+        for name in sorted(names):
+            generation = self.generation(name)
+            if generation is None:
+                return None
+            key.append((name, generation))
+        return tuple(key)
+
+    def counted(self, key: Any) -> tuple[int, int, FailureImpact] | None:
+        """The counts last remembered under ``key`` (never for a None key)."""
+        if key is None or self._counted is None or self._counted[0] != key:
+            return None
+        return self._counted[1]
+
+    def remember_counted(self, key: Any, counts: tuple[int, int, FailureImpact]) -> None:
+        self._counted = (key, counts) if key is not None else None
+
+
+class _Probes:
+    """One collection's probes, run concurrently and awaited against one deadline.
+
+    With ``workers <= 1`` each probe runs inline as it is submitted (handy in
+    tests); a probe submitted once the deadline has passed is then not run.
+    Probes still running at the deadline are abandoned, not interrupted: their
+    threads finish in the background and the results are dropped.
+    """
+
+    def __init__(self, workers: int = 1, deadline: float | None = None) -> None:
+        self._deadline = None if deadline is None else time.monotonic() + deadline
+        # node -> what -> seconds, for probes submitted with a ``timing`` label.
+        self.timings: dict[str, dict[str, float]] = {}
+        self._pool = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+            if workers > 1
+            else None
+        )
+
+    def _remaining(self) -> float | None:
+        if self._deadline is None:
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    def submit(
+        self, fn: Callable[..., _T], *args: Any, timing: tuple[str, str] | None = None
+    ) -> Future[_T]:
+        """Run ``fn(*args)``; with ``timing=(node, what)`` its duration is recorded."""
+        if timing is not None:
+            fn = self._timed(fn, *timing)
+        if self._pool is not None:
+            return self._pool.submit(fn, *args)
+        future: Future[_T] = Future()
+        if self._remaining() != 0.0:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future  # never run: reads as late
+
+    def _timed(self, fn: Callable[..., _T], node: str, what: str) -> Callable[..., _T]:
+        def run(*args: Any) -> _T:
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = round(time.perf_counter() - start, 4)
+                self.timings.setdefault(node, {})[what] = elapsed
+
+        return run
+
+    def wait(self, future: Future[_T]) -> tuple[bool, _T | None]:
+        """``(True, result)``, or ``(False, None)`` if the deadline came first."""
+        try:
+            return True, future.result(timeout=self._remaining())
+        except TimeoutError:
+            return False, None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_payload(
+    vpn_ip: str, fetch_census: CensusFetcher, since: int | None
+) -> dict[str, Any] | None:
+    """One node's census payload, as a delta against ``since`` when possible.
+
+    Runs on a probe thread, so it only fetches: the cache is updated by the
+    collecting thread, and a late answer never touches it.
+    """
+    if since is None:
+        return fetch_census(vpn_ip)
+    payload = fetch_census(vpn_ip, since)
+    if payload and "storage_indexes" not in payload and payload.get("since") != since:
+        # The delta does not line up with what we hold; start over in full.
+        payload = fetch_census(vpn_ip)
+    return payload
+
 
 def _collect_replication(
     nodes: list[NodeStatus],
     grid: GridStatus,
     fetch_census: CensusFetcher,
     notes: list[str],
+    cache: CensusCache | None = None,
+    probes: _Probes | None = None,
+    plan: ProbePlan | None = None,
 ) -> ReplicationStatus | None:
-    """Aggregate the storage nodes' share censuses into replication counts."""
+    """Aggregate the storage nodes' share censuses into replication counts.
+
+    With a ``plan`` only its ``census`` nodes are fetched; for ``census_held``
+    ones the census already held stands in, and the rest (or a node with no
+    census held) count as missing.
+    """
     storage_nodes = [n for n in nodes if "tahoe_storage" in n.roles]
     if not storage_nodes:
         return None
+    cache = cache if cache is not None else CensusCache()
+    cache.retain({n.name for n in storage_nodes})
+    probes = probes if probes is not None else _Probes()
 
-    holders: dict[str, int] = {}
+    held: dict[str, IndexArray] = {}
     per_server: dict[str, ServerCensus] = {}
     missing: list[str] = []
+    late: list[str] = []
+    fetching: list[NodeStatus] = []
     for node in storage_nodes:
-        payload = fetch_census(node.vpn_ip)
-        if not payload:
+        standing_in = cache.held(node.name)
+        if plan is None or node.name in plan.census:
+            fetching.append(node)
+        elif node.name in plan.census_held and standing_in is not None:
+            held[node.name], per_server[node.name] = standing_in
+        else:
             missing.append(node.name)
-            continue
-        indexes = payload.get("storage_indexes") or []
-        per_server[node.name] = ServerCensus(
-            objects=int(payload.get("object_count", len(indexes))),
-            disk_used_bytes=int(payload.get("disk_used_bytes", 0)),
+    futures = [
+        probes.submit(
+            _fetch_payload,
+            node.vpn_ip,
+            fetch_census,
+            cache.generation(node.name),
+            timing=(node.name, "census"),
         )
-        for storage_index in indexes:
-            holders[str(storage_index)] = holders.get(str(storage_index), 0) + 1
+        for node in fetching
+    ]
+    for node, future in zip(fetching, futures, strict=True):
+        finished, payload = probes.wait(future)
+        if not finished:
+            late.append(node.name)
+            continue
+        indexes = cache.apply(node.name, payload) if payload else None
+        if payload is None or indexes is None:
+            missing.append(node.name)
+            continue
+        per_server[node.name] = ServerCensus.from_payload(payload, len(indexes))
+        cache.remember(node.name, per_server[node.name])
+        held[node.name] = indexes
 
     for name in missing:
         notes.append(f"share census unavailable from {name}")
+    for name in late:
+        notes.append(f"share census from {name} missed the collection deadline")
     if not per_server:
         return None
 
     target = min(grid.shares_total, len(storage_nodes))
-    fully = sum(1 for count in holders.values() if count >= target)
+    regions: dict[str, list[str]] = {}
+    for node in storage_nodes:
+        if node.region and node.name in held:
+            regions.setdefault(node.region, []).append(node.name)
+    generations = cache.generations(held)
+    key = None
+    if generations is not None:
+        key = (generations, target, grid.shares_needed, sorted(regions.items()))
+    counts = cache.counted(key)
+    if counts is None:
+        objects, fully = replication_counts(list(held.values()), target)
+        impact = FailureImpact.from_placement(PlacementMatrix(held, grid.shares_needed), regions)
+        counts = (objects, fully, impact)
+        cache.remember_counted(key, counts)
+    objects, fully, impact = counts
     return ReplicationStatus(
-        objects_total=len(holders),
+        objects_total=objects,
         target_copies=target,
         fully_replicated=fully,
-        under_replicated=len(holders) - fully,
-        complete=not missing,
+        under_replicated=objects - fully,
+        complete=not missing and not late,
         per_server=per_server,
+        impact=impact,
+    )
+
+
+def _collect_replication_sketch(
+    nodes: list[NodeStatus],
+    grid: GridStatus,
+    fetch_sketch: SketchFetcher,
+    notes: list[str],
+    cache: CensusCache | None = None,
+    probes: _Probes | None = None,
+    plan: ProbePlan | None = None,
+) -> ReplicationStatus | None:
+    """Estimate replication from the storage nodes' census sketches.
+
+    Each node samples the objects whose hash has ``level`` leading zero bits;
+    re-filtering every sample to the highest level any node used leaves the
+    same objects sampled everywhere, whose holders are then counted exactly.
+    Memory is bounded by the sample size per node, whatever the grid holds.
+
+    As with full censuses, a ``plan`` fetches only its ``census`` nodes; for
+    ``census_held`` ones the sketch held in ``cache`` stands in, and the rest
+    (or a node with no sketch held) count as missing.
+    """
+    storage_nodes = [n for n in nodes if "tahoe_storage" in n.roles]
+    if not storage_nodes:
+        return None
+    cache = cache if cache is not None else CensusCache()
+    cache.retain({n.name for n in storage_nodes})
+    probes = probes if probes is not None else _Probes()
+
+    sketches: dict[str, dict[str, Any]] = {}
+    per_server: dict[str, ServerCensus] = {}
+    missing: list[str] = []
+    late: list[str] = []
+    fetching: list[NodeStatus] = []
+    for node in storage_nodes:
+        standing_in = cache.held_sketch(node.name)
+        if plan is None or node.name in plan.census:
+            fetching.append(node)
+        elif node.name in plan.census_held and standing_in is not None:
+            sketches[node.name], per_server[node.name] = standing_in
+        else:
+            missing.append(node.name)
+    futures = [
+        probes.submit(fetch_sketch, node.vpn_ip, timing=(node.name, "census")) for node in fetching
+    ]
+    for node, future in zip(fetching, futures, strict=True):
+        finished, payload = probes.wait(future)
+        if not finished:
+            late.append(node.name)
+            continue
+        sketch = (payload or {}).get("sketch")
+        if not payload or not sketch:
+            missing.append(node.name)
+            continue
+        sketches[node.name] = sketch
+        per_server[node.name] = ServerCensus.from_payload(payload, 0)
+        cache.remember_sketch(node.name, sketch, per_server[node.name])
+
+    for name in missing:
+        notes.append(f"share census unavailable from {name}")
+    for name in late:
+        notes.append(f"share census from {name} missed the collection deadline")
+    if not per_server:
+        return None
+
+    level = max(int(sketch.get("level", 0)) for sketch in sketches.values())
+    holders: dict[str, int] = {}
+    union: HyperLogLog | None = None
+    for sketch in sketches.values():
+        for si in sketch.get("sample") or []:
+            if in_sample(str(si), level):
+                holders[str(si)] = holders.get(str(si), 0) + 1
+        hll = HyperLogLog.from_text(
+            str(sketch.get("hll", "")), int(sketch.get("hll_precision", 12))
+        )
+        if union is None:
+            union = hll
+        else:
+            union.merge(hll)
+
+    target = min(grid.shares_total, len(storage_nodes))
+    objects_total = round(union.estimate()) if union is not None else 0
+    sampled_fully = sum(1 for count in holders.values() if count >= target)
+    fully = round(objects_total * sampled_fully / len(holders)) if holders else 0
+    return ReplicationStatus(
+        objects_total=objects_total,
+        target_copies=target,
+        fully_replicated=fully,
+        under_replicated=objects_total - fully,
+        complete=not missing and not late,
+        per_server=per_server,
+        estimated=True,
     )
 
 
 def collect_status(
     manifest: dict[str, Any],
     self_name: str,
-    ping: Pinger,
+    ping: Pinger | None,
     storage_connected: int | None,
     furl_present: bool,
     manifest_synced_at: datetime | None,
     now: datetime | None = None,
     fetch_census: CensusFetcher | None = None,
+    census_cache: CensusCache | None = None,
+    fetch_sketch: SketchFetcher | None = None,
+    deadline: float | None = COLLECT_DEADLINE_SECONDS,
+    workers: int = PROBE_WORKERS,
+    probe_batch: BatchProber | None = None,
+    timings: CollectorTimings | None = None,
+    scheduler: ProbeScheduler | None = None,
 ) -> NetworkStatus:
-    """Build the status model from the raw inputs."""
+    """Build the status model from the raw inputs.
+
+    Pass the same ``census_cache`` to every collection to fetch censuses as
+    deltas; without one each collection fetches them in full. With
+    ``fetch_sketch`` replication is estimated from census sketches instead,
+    at bounded memory per node, for grids too large for exact censuses.
+
+    Pings and census fetches run on up to ``workers`` threads and are waited
+    for at most ``deadline`` seconds in all (``None``: no limit); a node whose
+    ping is still out is reported with ``reachable=None``, a late census as
+    missing. With ``probe_batch`` every node is measured in one batch (RTT
+    averaged over a few echoes, plus loss) instead of a ``ping`` per node;
+    one of the two must be given.
+
+    The time spent fetching censuses, waiting for probes and per node goes
+    into ``timings`` (a fresh :class:`CollectorTimings` if not given), which
+    is attached to the result as ``collector``.
+
+    With a ``scheduler`` (kept across collections) only the nodes it has due
+    are probed and fetched; the others keep their last measured state and
+    held census.
+    """
+    if ping is None and probe_batch is None:
+        raise ValueError("collect_status needs ping or probe_batch")
     now = now or datetime.now(UTC)
+    timings = timings if timings is not None else CollectorTimings()
     network = manifest.get("network", {}) or {}
     tahoe = network.get("tahoe", {}) or {}
     notes: list[str] = []
-
-    nodes: list[NodeStatus] = []
-    for raw in manifest.get("nodes", []) or []:
-        name = str(raw.get("name", "?"))
-        vpn_ip = str(raw.get("vpn_ip") or raw.get("internal_ip") or "")
-        is_self = name == self_name
-        rtt = None if is_self else ping(vpn_ip)
-        nodes.append(
-            NodeStatus(
+    probes = _Probes(workers, deadline)
+    try:
+        nodes: list[NodeStatus] = []
+        for raw in manifest.get("nodes", []) or []:
+            name = str(raw.get("name", "?"))
+            vpn_ip = str(raw.get("vpn_ip") or raw.get("internal_ip") or "")
+            is_self = name == self_name
+            node = NodeStatus(
                 name=name,
                 vpn_ip=vpn_ip,
                 roles=[str(r) for r in raw.get("roles", []) or []],
                 manifest_status=str(raw.get("status", "unknown")),
                 is_self=is_self,
-                reachable=True if is_self else rtt is not None,
-                rtt_ms=rtt,
+                reachable=is_self,
+                region=str(raw["region"]) if raw.get("region") else None,
             )
+            nodes.append(node)
+        others = [n for n in nodes if not n.is_self]
+        plan: ProbePlan | None = None
+        probed = others
+        if scheduler is not None:
+            scheduler.retain({n.name for n in others})
+            plan = scheduler.plan(others, now.timestamp())
+            probed = [n for n in others if n.name in plan.probe]
+            for node in others:
+                if node.name not in plan.probe:
+                    scheduler.carry(node)
+        batch: Future[Mapping[str, ProbeResult]] | None = None
+        if probe_batch is not None:
+            batch = probes.submit(probe_batch, [n.vpn_ip for n in probed])
+        pings = (
+            [(n, probes.submit(ping, n.vpn_ip, timing=(n.name, "ping"))) for n in probed]
+            if batch is None and ping is not None
+            else []
         )
 
-    grid = GridStatus(
-        shares_needed=int(tahoe.get("shares_needed", 3)),
-        shares_happy=int(tahoe.get("shares_happy", 7)),
-        shares_total=int(tahoe.get("shares_total", 10)),
-        storage_expected=sum(1 for n in nodes if "tahoe_storage" in n.roles),
-        storage_connected=storage_connected,
-    )
+        grid = GridStatus(
+            shares_needed=int(tahoe.get("shares_needed", 3)),
+            shares_happy=int(tahoe.get("shares_happy", 7)),
+            shares_total=int(tahoe.get("shares_total", 10)),
+            storage_expected=sum(1 for n in nodes if "tahoe_storage" in n.roles),
+            storage_connected=storage_connected,
+        )
+
+        # Census fetches go out while the pings are still in flight.
+        replication: ReplicationStatus | None = None
+        with timings.phase("census"):
+            if fetch_sketch is not None:
+                replication = _collect_replication_sketch(
+                    nodes, grid, fetch_sketch, notes, census_cache, probes, plan
+                )
+            elif fetch_census is not None:
+                replication = _collect_replication(
+                    nodes, grid, fetch_census, notes, census_cache, probes, plan
+                )
+
+        with timings.phase("probe"):
+            for node, future in pings:
+                finished, rtt = probes.wait(future)
+                node.reachable = rtt is not None if finished else None
+                node.rtt_ms = rtt
+            if batch is not None:
+                outcome = probes.wait(batch)
+                measured, results = outcome
+                for node in probed:
+                    result = results.get(node.vpn_ip) if results is not None else None
+                    node.reachable = (result is not None and result.reachable) if measured else None
+                    node.rtt_ms = result.avg_ms if result else None
+                    node.loss_pct = result.loss_pct if result else None
+        if scheduler is not None and plan is not None:
+            for node in probed:
+                scheduler.record(node, now.timestamp())
+            for name in plan.census:
+                scheduler.census_fetched(name, now.timestamp())
+            for node in others:
+                node.probe_interval_s = scheduler.interval(node)
+                node.flapping = scheduler.flapping(node.name)
+    finally:
+        probes.close()
+        # Abandoned probes may still be finishing: copy what has been recorded.
+        for name, measured_times in list(probes.timings.items()):
+            timings.nodes.setdefault(name, {}).update(dict(measured_times))
 
     # --- overall verdict -------------------------------------------------
     overall = "ok"
 
-    replication: ReplicationStatus | None = None
-    if fetch_census is not None:
-        replication = _collect_replication(nodes, grid, fetch_census, notes)
-        if replication is not None and replication.complete and replication.under_replicated:
-            notes.append(
-                f"{replication.under_replicated} object(s) stored on fewer than "
-                f"{replication.target_copies} servers — re-upload or repair them"
-            )
-            overall = "degraded"
-
-    unreachable = [n for n in nodes if not n.reachable and n.manifest_status != "inactive"]
+    if replication is not None and replication.complete and replication.under_replicated:
+        about = "about " if replication.estimated else ""
+        notes.append(
+            f"{about}{replication.under_replicated} object(s) stored on fewer than "
+            f"{replication.target_copies} servers — re-upload or repair them"
+        )
+        overall = "degraded"
+    if replication is not None:
+        for name, census in sorted(replication.per_server.items()):
+            if census.expiring_shares:
+                notes.append(
+                    f"{census.expiring_shares} share(s) on {name} reach the lease limit within "
+                    f"{census.expiring_within_days} days and will be garbage-collected "
+                    "unless renewed ('redundanet storage renew')"
+                )
+
+    unreachable = [n for n in nodes if n.reachable is False and n.manifest_status != "inactive"]
     for node in unreachable:
         notes.append(f"node {node.name} is unreachable over the VPN")
+    for node in nodes:
+        if node.reachable is None and node.manifest_status != "inactive":
+            notes.append(f"node {node.name} did not answer before the collection deadline")
 
     sync_stale = manifest_synced_at is None or (now - manifest_synced_at) > timedelta(
         seconds=STALE_SYNC_SECONDS
@@ -258,52 +829,38 @@ def collect_status(
         ),
         replication=replication,
         notes=notes,
+        collector=timings,
     )
 
 
 # --- history (uptime samples on the persistent volume) ----------------------
 
-MAX_HISTORY_LINES = 4000  # ~2.7 days at one sample/minute
 
-
-def append_sample(history_path: Path, status: NetworkStatus) -> None:
-    """Append a compact sample; rewrite the file when it grows too large."""
-    sample = {
-        "ts": status.generated_at,
-        "overall": status.overall,
-        "up": {n.name: n.reachable for n in status.nodes},
-    }
-    history_path.parent.mkdir(parents=True, exist_ok=True)
-    with history_path.open("a") as f:
-        f.write(json.dumps(sample) + "\n")
-
-    try:
-        lines = history_path.read_text().splitlines()
-    except OSError:
-        return
-    if len(lines) > MAX_HISTORY_LINES:
-        history_path.write_text("\n".join(lines[-MAX_HISTORY_LINES // 2 :]) + "\n")
+def append_sample(history: HistoryStore, status: NetworkStatus) -> None:
+    """Record one collection in the history ring buffer."""
+    history.append(
+        Sample(
+            ts=datetime.fromisoformat(status.generated_at).timestamp(),
+            overall=status.overall,
+            # Nodes whose probe missed the deadline are unknown, neither up nor down.
+            up={n.name: n.reachable for n in status.nodes if n.reachable is not None},
+            rtt_ms={n.name: n.rtt_ms for n in status.nodes if n.rtt_ms is not None},
+            loss_pct={n.name: n.loss_pct for n in status.nodes if n.loss_pct is not None},
+        )
+    )
 
 
 def uptime_stats(
-    history_path: Path, window: timedelta, now: datetime | None = None
+    history: HistoryStore, window: timedelta, now: datetime | None = None
 ) -> dict[str, float]:
     """Per-node uptime percentage over the window, from history samples."""
     now = now or datetime.now(UTC)
-    cutoff = now - window
-    seen: dict[str, list[bool]] = {}
-    try:
-        lines = history_path.read_text().splitlines()
-    except OSError:
-        return {}
-    for line in lines:
-        try:
-            sample = json.loads(line)
-            ts = datetime.fromisoformat(sample["ts"])
-        except (ValueError, KeyError):
-            continue
-        if ts < cutoff:
-            continue
-        for name, up in (sample.get("up") or {}).items():
-            seen.setdefault(name, []).append(bool(up))
-    return {name: round(100.0 * sum(ups) / len(ups), 1) for name, ups in seen.items() if ups}
+    return history.uptime((now - window).timestamp(), now.timestamp())
+
+
+def rtt_percentiles(
+    history: HistoryStore, window: timedelta, now: datetime | None = None
+) -> dict[str, tuple[float | None, float | None]]:
+    """Per-node ``(p50, p95)`` RTT in ms over the window, from history samples."""
+    now = now or datetime.now(UTC)
+    return history.rtt_percentiles((now - window).timestamp(), now.timestamp())
@@ -0,0 +1,185 @@
+"""Filtered and paged views of one status snapshot.
+
+Large networks make the full page and JSON heavy, so the status server also
+serves slices of them: ``?role=``, ``?state=`` (online, offline, unknown),
+``?region=`` and ``?page=``. :class:`NodeIndex` is built once per snapshot
+with the node positions for every filter value; a view intersects those lists
+and joins rows and JSON fragments that were rendered with the snapshot, so no
+request renders a node.
+"""
+
+from __future__ import annotations
+
+import json
+import urllib.parse
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from redundanet.monitor.render import PageParts, render_page, render_pager, short_role
+from redundanet.monitor.status import NetworkStatus, NodeStatus
+
+PAGE_SIZE = 100
+STATES = ("online", "offline", "unknown")
+FILTERS = ("role", "state", "region")
+
+
+def node_state(node: NodeStatus) -> str:
+    """``online``, ``offline`` or ``unknown`` (its probe missed the deadline)."""
+    if node.is_self or node.reachable:
+        return "online"
+    return "unknown" if node.reachable is None else "offline"
+
+
+@dataclass(frozen=True)
+class NodeQuery:
+    """The filters and page of one request; unset filters match every node."""
+
+    role: str | None = None
+    state: str | None = None
+    region: str | None = None
+    page: int = 1
+
+    @classmethod
+    def parse(cls, query: str) -> NodeQuery:
+        """From a query string; raises ValueError for a bad state or page.
+
+        Other parameters are ignored, so cache-busting suffixes still work.
+        """
+        params = {k: v[-1] for k, v in urllib.parse.parse_qs(query).items()}
+        state = params.get("state", "").lower() or None
+        if state is not None and state not in STATES:
+            raise ValueError(f"state must be one of {', '.join(STATES)}")
+        try:
+            page = int(params.get("page", "1"))
+        except ValueError as e:
+            raise ValueError("page must be a number") from e
+        if page < 1:
+            raise ValueError("page must be 1 or more")
+        role = params.get("role", "").lower() or None
+        return cls(
+            role=role and short_role(role),
+            state=state,
+            region=params.get("region") or None,
+            page=page,
+        )
+
+    @property
+    def filters(self) -> dict[str, str]:
+        values = {"role": self.role, "state": self.state, "region": self.region}
+        return {key: value for key, value in values.items() if value is not None}
+
+    def href(self, page: int) -> str:
+        """A link to another page of the same filters."""
+        params = {**self.filters, **({"page": str(page)} if page > 1 else {})}
+        return "/?" + urllib.parse.urlencode(params) if params else "/"
+
+
+class NodeIndex:
+    """Node positions per role, state and region, for one snapshot's nodes."""
+
+    def __init__(self, nodes: Sequence[NodeStatus]) -> None:
+        self.size = len(nodes)
+        self._by: dict[str, dict[str, list[int]]] = {key: {} for key in FILTERS}
+        for position, node in enumerate(nodes):
+            for role in {short_role(r) for r in node.roles}:
+                self._by["role"].setdefault(role, []).append(position)
+            self._by["state"].setdefault(node_state(node), []).append(position)
+            if node.region:
+                self._by["region"].setdefault(node.region, []).append(position)
+
+    def check(self, query: NodeQuery) -> None:
+        """Raise ValueError unless every role and region ``query`` names has nodes.
+
+        Values no node has would only ever select nothing; refusing them keeps
+        made-up ones from being rendered, compressed and cached per request.
+        """
+        for key in ("role", "region"):
+            value = query.filters.get(key)
+            if value is not None and value not in self._by[key]:
+                raise ValueError(f"no node has {key} {value!r}")
+
+    def select(self, query: NodeQuery) -> list[int]:
+        """Positions of the nodes matching every filter of ``query``, in order."""
+        lists = [self._by[key].get(value, []) for key, value in query.filters.items()]
+        if not lists:
+            return list(range(self.size))
+        smallest, *others = sorted(lists, key=len)
+        if not others:
+            return smallest
+        keep = set.intersection(*(set(positions) for positions in others))
+        return [position for position in smallest if position in keep]
+
+
+@dataclass
+class NodePage:
+    """One page of a query's matching nodes."""
+
+    positions: list[int]
+    matching: int
+    number: int
+    pages: int
+
+    @property
+    def first(self) -> int:
+        return (self.number - 1) * PAGE_SIZE + 1 if self.positions else 0
+
+
+class StatusViews:
+    """One snapshot's page and JSON, cut up for filtered and paged views."""
+
+    def __init__(self, status: NetworkStatus, parts: PageParts) -> None:
+        self.parts = parts
+        self.index = NodeIndex(parts.nodes)
+        data = status.to_dict()
+        # The JSON lists nodes in status order and the page in its own: match
+        # them by position, not name (a manifest may repeat a name).
+        nodes_json = dict(zip(map(id, status.nodes), data.pop("nodes"), strict=True))
+        self._node_json = [
+            json.dumps(nodes_json[id(node)], separators=(",", ":")) for node in parts.nodes
+        ]
+        self._base = data  # everything but the nodes
+
+    @staticmethod
+    def _slice(matching: list[int], number: int) -> NodePage | None:
+        pages = max(1, -(-len(matching) // PAGE_SIZE))
+        if number > pages:
+            return None
+        start = (number - 1) * PAGE_SIZE
+        return NodePage(matching[start : start + PAGE_SIZE], len(matching), number, pages)
+
+    def page(self, query: NodeQuery) -> NodePage | None:
+        """The query's page of matching nodes; None past the last page."""
+        return self._slice(self.index.select(query), query.page)
+
+    def first_page(self) -> NodePage:
+        """Page 1 of every node, which always exists: the default view."""
+        return self._slice(list(range(self.index.size)), 1)  # type: ignore[return-value]
+
+    def html(self, query: NodeQuery, page: NodePage) -> str:
+        """The page with only ``page``'s rows, under a line saying what is shown."""
+        about = ", ".join(f"{key} {value}" for key, value in query.filters.items())
+        pager = ""
+        if about or page.pages > 1:
+            pager = render_pager(
+                page.first,
+                page.first + len(page.positions) - 1,
+                page.matching,
+                query.href(page.number - 1) if page.number > 1 else None,
+                query.href(page.number + 1) if page.number < page.pages else None,
+                about,
+            )
+        return render_page(self.parts, page.positions, pager)
+
+    def json(self, query: NodeQuery, page: NodePage) -> bytes:
+        """The status with only ``page``'s nodes, plus where the page sits."""
+        about: dict[str, Any] = {
+            "filters": query.filters,
+            "page": page.number,
+            "pages": page.pages,
+            "per_page": PAGE_SIZE,
+            "matching": page.matching,
+        }
+        head = json.dumps({**self._base, "view": about}, separators=(",", ":"))
+        nodes = ",".join(self._node_json[i] for i in page.positions)
+        return f'{head[:-1]},"nodes":[{nodes}]}}'.encode()
@@ -5,8 +5,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-import yaml
-
+from redundanet.utils import yaml_io
 from redundanet.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -40,14 +39,13 @@ def read_yaml(path: Path | str) -> dict[str, Any]:
 
     Raises:
         FileNotFoundError: If file doesn't exist
-        yaml.YAMLError: If YAML parsing fails
+        yaml_io.YAMLError: If YAML parsing fails
     """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"YAML file not found: {path}")
 
-    with path.open() as f:
-        data = yaml.safe_load(f)
+    data = yaml_io.load_file(path)
 
     return data if isinstance(data, dict) else {}
 
@@ -63,8 +61,7 @@ def write_yaml(path: Path | str, data: dict[str, Any], mode: int = 0o644) -> Non
     path = Path(path)
     ensure_dir(path.parent)
 
-    with path.open("w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    yaml_io.dump_file(path, data)
 
     path.chmod(mode)
     logger.debug("Wrote YAML file", path=str(path))
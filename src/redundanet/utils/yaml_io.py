@@ -0,0 +1,53 @@
+"""YAML loading and dumping, through libyaml when PyYAML was built with it.
+
+PyYAML's pure-Python ``safe_load`` and ``dump`` dominate manifest handling on
+large networks. The C ``CSafeLoader``/``CSafeDumper`` are an order of magnitude
+faster; this module uses them when present and the pure-Python classes
+otherwise. The dump options are fixed here so both paths write byte-identical
+output (``allow_unicode`` stays off: the two emitters escape non-BMP
+characters differently when it is on).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Any
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+
+    LIBYAML = True
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment]
+
+    LIBYAML = False
+
+YAMLError = yaml.YAMLError
+
+# How every RedundaNet file is written: block style, keys in insertion order.
+DUMP_OPTIONS: dict[str, Any] = {"default_flow_style": False, "sort_keys": False}
+
+
+def load(stream: str | bytes | IO[str] | IO[bytes]) -> Any:
+    """Parse one YAML document (``None`` for an empty one)."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump(data: Any, stream: IO[str] | None = None) -> str | None:
+    """Serialize ``data``; returns the text when no stream is given."""
+    return yaml.dump(data, stream, Dumper=SafeDumper, **DUMP_OPTIONS)
+
+
+def load_file(path: Path | str) -> Any:
+    """Parse a YAML file."""
+    with Path(path).open("rb") as f:
+        return load(f)
+
+
+def dump_file(path: Path | str, data: Any) -> None:
+    """Write ``data`` to a YAML file, replacing it."""
+    with Path(path).open("w") as f:
+        dump(data, f)
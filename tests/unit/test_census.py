@@ -2,12 +2,44 @@
 
 from __future__ import annotations
 
+import json
+import os
+import struct
+import time
 from datetime import UTC, datetime
 from pathlib import Path
 
-from redundanet.monitor.census import census_payload, disk_used_bytes, list_storage_indexes
+import pytest
+
+from redundanet.monitor import census
+from redundanet.monitor import status as status_module
+from redundanet.monitor.census import (
+    CENSUS_BINARY_TYPE,
+    CensusIndex,
+    CensusSnapshot,
+    HyperLogLog,
+    PackedIndexes,
+    bytes_to_si,
+    census_accept_headers,
+    census_payload,
+    census_sketch,
+    decode_census_binary,
+    decode_census_response,
+    disk_used_bytes,
+    encode_census_binary,
+    encode_census_response,
+    etag_matches,
+    in_sample,
+    lease_summary,
+    list_storage_indexes,
+    parse_lease_duration,
+    read_share_lease,
+    sample_level,
+    scan_shares,
+    si_to_bytes,
+)
 from redundanet.monitor.render import render_html
-from redundanet.monitor.status import collect_status
+from redundanet.monitor.status import CensusCache, collect_status
 
 NOW = datetime(2026, 8, 10, 12, 0, 0, tzinfo=UTC)
 
@@ -35,6 +67,27 @@ class TestCensus:
         (shares / "cc" / "ccempty").mkdir(parents=True)  # SI dir without share files
         assert list_storage_indexes(shares) == ["aaindex1"]
 
+    def test_single_pass_scan_totals(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0, 1], "bbindex2": [0]})
+        (shares / "incoming" / "cc" / "ccindex3").mkdir(parents=True)
+        (shares / "incoming" / "cc" / "ccindex3" / "0").write_bytes(b"p" * 50)
+        (shares / "stray").write_bytes(b"s" * 7)
+        scan = scan_shares(shares)
+        assert scan.indexes == ["aaindex1", "bbindex2"]
+        assert scan.share_bytes == 300
+        assert scan.other_bytes == 57
+        assert disk_used_bytes(shares) == scan.total_bytes == 357
+
+    def test_parallel_scan_matches_serial(self, tmp_path: Path):
+        shares = make_shares(
+            tmp_path,
+            {f"{p}{q}index{n}": [0, n % 3] for p in "abcd" for q in "wxyz" for n in range(3)},
+        )
+        serial = scan_shares(shares, workers=1)
+        assert scan_shares(shares, workers=8) == serial
+        assert len(serial.indexes) == 48
+        assert serial.indexes == sorted(serial.indexes)
+
     def test_missing_dir_is_empty(self, tmp_path: Path):
         assert list_storage_indexes(tmp_path / "nope") == []
         assert census_payload("n1", tmp_path / "nope") == {
@@ -45,6 +98,386 @@ class TestCensus:
         }
 
 
+def settle(shares: Path) -> None:
+    """Age every prefix dir's mtime past the settle window so it is trusted."""
+    for prefix in shares.iterdir():
+        os.utime(prefix, ns=(1_000_000_000, 1_000_000_000))
+
+
+class TestCensusIndex:
+    def test_matches_full_walk(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0, 1], "bbindex2": [0], "bbindex3": [2]})
+        index = CensusIndex(shares)
+        assert index.refresh()
+        assert index.storage_indexes() == list_storage_indexes(shares)
+        assert index.disk_used_bytes() == disk_used_bytes(shares)
+        indexed = census_payload("n1", shares, index)
+        assert indexed.pop("generation") == index.generation
+        assert indexed == census_payload("n1", shares)
+
+    def test_only_changed_prefixes_rescanned(self, tmp_path: Path, monkeypatch):
+        shares = make_shares(tmp_path, {"aaindex1": [0], "bbindex2": [0]})
+        settle(shares)
+        index = CensusIndex(shares)
+        index.refresh()
+
+        scanned: list[str] = []
+        real_scan = census._scan_prefix
+
+        def tracking_scan(prefix: Path, mtime_ns: int, leases: bool = False):
+            scanned.append(prefix.name)
+            return real_scan(prefix, mtime_ns, leases)
+
+        monkeypatch.setattr(census, "_scan_prefix", tracking_scan)
+        assert not index.refresh()
+        assert scanned == []
+
+        (shares / "bb" / "bbindex9").mkdir()
+        (shares / "bb" / "bbindex9" / "0").write_bytes(b"y" * 10)
+        assert index.refresh()
+        assert scanned == ["bb"]
+        assert index.storage_indexes() == ["aaindex1", "bbindex2", "bbindex9"]
+        assert index.disk_used_bytes() == 210
+
+    def test_empty_si_dir_rechecked_until_populated(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        (shares / "aa" / "aaindex2").mkdir()
+        settle(shares)
+        index = CensusIndex(shares)
+        index.refresh()
+        assert index.storage_indexes() == ["aaindex1"]
+
+        # Moving a share into an existing SI dir leaves the prefix mtime alone.
+        (shares / "aa" / "aaindex2" / "0").write_bytes(b"z")
+        settle(shares)
+        assert index.refresh()
+        assert index.storage_indexes() == ["aaindex1", "aaindex2"]
+
+    def test_removed_prefix_dropped(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0], "bbindex2": [0]})
+        index = CensusIndex(shares)
+        index.refresh()
+        for path in (shares / "bb" / "bbindex2").iterdir():
+            path.unlink()
+        (shares / "bb" / "bbindex2").rmdir()
+        (shares / "bb").rmdir()
+        assert index.refresh()
+        assert index.storage_indexes() == ["aaindex1"]
+
+    def test_survives_restart(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0], "bbindex2": [0, 1]})
+        settle(shares)
+        index_path = tmp_path / "census-index.json"
+        CensusIndex(shares, index_path).refresh()
+        assert index_path.exists()
+
+        reloaded = CensusIndex(shares, index_path)
+        # Served from disk before any refresh — no walk needed after a restart.
+        assert reloaded.storage_indexes() == ["aaindex1", "bbindex2"]
+        assert reloaded.disk_used_bytes() == 300
+        assert not reloaded.refresh()
+
+    @pytest.mark.parametrize("content", ["not json", '{"version": 999, "prefixes": {}}', "[]"])
+    def test_unusable_index_file_rebuilt(self, tmp_path: Path, content: str):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        index_path = tmp_path / "census-index.json"
+        index_path.write_text(content)
+        index = CensusIndex(shares, index_path)
+        assert index.storage_indexes() == []
+        index.refresh()
+        assert index.storage_indexes() == ["aaindex1"]
+
+    def test_missing_shares_dir(self, tmp_path: Path):
+        index = CensusIndex(tmp_path / "nope")
+        assert not index.refresh()
+        assert index.storage_indexes() == []
+
+
+def add_share(shares: Path, si: str) -> None:
+    (shares / si[:2] / si).mkdir(parents=True)
+    (shares / si[:2] / si / "0").write_bytes(b"x" * 100)
+
+
+def remove_share(shares: Path, si: str) -> None:
+    (shares / si[:2] / si / "0").unlink()
+    (shares / si[:2] / si).rmdir()
+
+
+class TestCensusDelta:
+    def test_delta_since_generation(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0], "bbindex2": [0]})
+        index = CensusIndex(shares)
+        index.refresh()
+        base = index.generation
+
+        add_share(shares, "ccindex3")
+        remove_share(shares, "aaindex1")
+        index.refresh()
+        assert index.generation > base
+
+        body = census_payload("n1", shares, index, since=base)
+        assert body["since"] == base
+        assert body["added"] == ["ccindex3"]
+        assert body["removed"] == ["aaindex1"]
+        assert body["object_count"] == 2
+        assert "storage_indexes" not in body
+
+    def test_up_to_date_delta_is_empty(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        index = CensusIndex(shares)
+        index.refresh()
+        body = census_payload("n1", shares, index, since=index.generation)
+        assert (body["added"], body["removed"]) == ([], [])
+
+    def test_changes_cancel_across_generations(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        index = CensusIndex(shares)
+        index.refresh()
+        base = index.generation
+        add_share(shares, "bbindex2")
+        index.refresh()
+        remove_share(shares, "bbindex2")
+        index.refresh()
+        assert index.changes_since(base) == ([], [])
+
+    def test_unknown_or_pruned_generation_gets_full_census(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(census, "CENSUS_JOURNAL_LENGTH", 1)
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        index = CensusIndex(shares)
+        index.refresh()
+        base = index.generation
+        add_share(shares, "bbindex2")
+        index.refresh()
+        add_share(shares, "ccindex3")
+        index.refresh()
+
+        for since in (base, index.generation + 1, 12345):
+            body = census_payload("n1", shares, index, since=since)
+            assert body["storage_indexes"] == ["aaindex1", "bbindex2", "ccindex3"]
+            assert "added" not in body
+
+    def test_generation_and_journal_survive_restart(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        index_path = tmp_path / "census-index.json"
+        index = CensusIndex(shares, index_path)
+        index.refresh()
+        base = index.generation
+        add_share(shares, "bbindex2")
+        index.refresh()
+
+        reloaded = CensusIndex(shares, index_path)
+        assert reloaded.generation == index.generation
+        assert reloaded.changes_since(base) == (["bbindex2"], [])
+
+    def test_rebuilt_index_never_reuses_a_generation(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        first = CensusIndex(shares)
+        first.refresh()
+        time.sleep(0.01)  # generations are seeded from the millisecond clock
+        rebuilt = CensusIndex(shares)
+        rebuilt.refresh()
+        assert rebuilt.changes_since(first.generation - 1) is None
+
+
+def real_sis(count: int) -> list[str]:
+    """Random Tahoe storage indexes, in raw-byte order (how packed censuses sort)."""
+    return [bytes_to_si(raw) for raw in sorted(os.urandom(16) for _ in range(count))]
+
+
+class TestCensusEncoding:
+    def test_storage_index_round_trip(self):
+        si = "2p3vjfvxbmjuvvoqq3qnbnihku"
+        raw = si_to_bytes(si)
+        assert len(raw) == 16
+        assert bytes_to_si(raw) == si
+
+    @pytest.mark.parametrize(
+        "bad",
+        [
+            "si1",
+            "2p3vjfvxbmjuvvoqq3qnbnihk1",
+            "2p3vjfvxbmjuvvoqq3qnbnihkv",
+            "2P3VJFVXBMJUVVOQQ3QNBNIHKU",
+        ],
+    )
+    def test_non_storage_index_rejected(self, bad: str):
+        with pytest.raises(ValueError):
+            si_to_bytes(bad)
+
+    def test_packed_indexes_are_sorted_and_searchable(self):
+        sis = real_sis(50)
+        packed = PackedIndexes.from_strings(sorted(sis))
+        assert len(packed) == 50
+        assert len(packed.buffer) == 800
+        assert packed.strings() == sis
+        assert si_to_bytes(sis[17]) in packed
+        assert b"\x00" * 16 not in packed
+
+    @pytest.mark.parametrize("front_coded", [False, True])
+    def test_binary_round_trip(self, front_coded: bool):
+        sis = real_sis(200)
+        body = {"node": "n1", "generation": 7, "object_count": 200, "storage_indexes": sis}
+        encoded = encode_census_binary({**body, "disk_used_bytes": 5}, front_coded)
+        decoded = decode_census_binary(encoded)
+        assert decoded["storage_indexes"].strings() == sis
+        assert decoded["generation"] == 7
+        assert decoded["disk_used_bytes"] == 5
+        assert len(encoded) < 200 * 17 + 200
+
+    def test_binary_delta_round_trip(self):
+        added, removed = real_sis(3), real_sis(2)
+        decoded = decode_census_binary(
+            encode_census_binary({"since": 4, "added": added, "removed": removed}, True)
+        )
+        assert decoded["since"] == 4
+        assert decoded["added"].strings() == added
+        assert decoded["removed"].strings() == removed
+
+    def test_truncated_binary_rejected(self):
+        encoded = encode_census_binary({"storage_indexes": real_sis(4)})
+        with pytest.raises(ValueError):
+            decode_census_binary(encoded[:-5])
+
+    def test_negotiates_binary_and_gzip(self):
+        sis = real_sis(100)
+        payload = {"node": "n1", "object_count": 100, "storage_indexes": sis}
+        headers = census_accept_headers()
+        body, response_headers = encode_census_response(
+            payload, headers["Accept"], headers["Accept-Encoding"]
+        )
+        assert response_headers["Content-Type"] == CENSUS_BINARY_TYPE
+        assert response_headers["Content-Encoding"] in ("gzip", "zstd")
+        decoded = decode_census_response(
+            body, response_headers["Content-Type"], response_headers["Content-Encoding"]
+        )
+        assert decoded["storage_indexes"].strings() == sis
+        assert len(body) < len(json.dumps(payload)) * 0.7
+
+    def test_old_clients_get_plain_json(self):
+        payload = {"node": "n1", "storage_indexes": real_sis(3)}
+        body, headers = encode_census_response(payload)
+        assert headers["Content-Type"] == "application/json"
+        assert "Content-Encoding" not in headers
+        assert json.loads(body) == payload
+
+    def test_non_tahoe_indexes_fall_back_to_json(self):
+        payload = {"node": "n1", "storage_indexes": ["aaindex1"]}
+        body, headers = encode_census_response(payload, CENSUS_BINARY_TYPE, "gzip")
+        assert headers["Content-Type"] == "application/json"
+        assert decode_census_response(body, headers["Content-Type"], "gzip") == payload
+
+    def test_binary_and_json_nodes_agree_on_replication(self):
+        sis = real_sis(3)
+        binary = decode_census_binary(
+            encode_census_binary({"object_count": 3, "storage_indexes": sis})
+        )
+        status = collect(
+            censuses({"10.100.0.10": binary, "10.100.0.11": payload(sis)}),
+        )
+        assert status.replication.objects_total == 3
+        assert status.replication.fully_replicated == 3
+
+
+class TestCensusSnapshot:
+    def test_etag_tracks_census_content(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        assert snapshot.refresh()
+        etag = snapshot.etag
+        assert etag.startswith('"')
+        assert not snapshot.refresh()
+        assert snapshot.etag == etag
+
+        add_share(shares, "bbindex2")
+        assert snapshot.refresh()
+        assert snapshot.etag != etag
+
+    def test_responses_encoded_once_per_variant(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        snapshot.refresh()
+        body, headers = snapshot.response()
+        assert snapshot.response()[0] is body
+        assert headers["ETag"] == snapshot.etag_for()
+        assert json.loads(body)["storage_indexes"] == ["aaindex1"]
+        gzipped, gzip_headers = snapshot.response(accept_encoding="gzip")
+        assert gzip_headers["Content-Encoding"] == "gzip"
+        assert gzipped is not body
+
+    def test_each_representation_has_its_own_etag(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        snapshot.refresh()
+        base = snapshot.index.generation
+        add_share(shares, "bbindex2")
+        snapshot.refresh()
+        requests = [
+            {},
+            {"accept_encoding": "gzip"},
+            {"accept": f"{CENSUS_BINARY_TYPE};coding=front"},
+            {"sketch": True},
+            {"since": base},
+            {"since": base, "accept_encoding": "gzip"},
+        ]
+        etags = [snapshot.response(**request)[1]["ETag"] for request in requests]
+        assert len(set(etags)) == len(etags)
+        assert etags == [snapshot.etag_for(**request) for request in requests]
+        assert all(etag.startswith(snapshot.etag[:-1]) for etag in etags)
+        # A generation too old for a delta gets the full census, and its tag.
+        assert snapshot.etag_for(since=1) == etags[0]
+
+    def test_only_building_a_delta_walks_the_journal(self, tmp_path: Path, monkeypatch):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        snapshot.refresh()
+        base = snapshot.index.generation
+        add_share(shares, "bbindex2")
+        snapshot.refresh()
+        walks: list[int] = []
+        walk = snapshot.index._changes_since
+        monkeypatch.setattr(
+            snapshot.index, "_changes_since", lambda since: walks.append(since) or walk(since)
+        )
+        etag = snapshot.etag_for(since=base)
+        assert snapshot.response(since=base)[1]["ETag"] == etag
+        assert snapshot.response(since=base)[1]["ETag"] == snapshot.etag_for(since=base)
+        assert walks == [base]  # once, to build the body; checks and the cache never walk
+        assert snapshot.etag_for(since=1) == snapshot.etag_for()  # older than the journal
+
+    def test_delta_response(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        snapshot.refresh()
+        base = snapshot.index.generation
+        add_share(shares, "bbindex2")
+        snapshot.refresh()
+        body = json.loads(snapshot.response(since=base)[0])
+        assert body["added"] == ["bbindex2"]
+        assert json.loads(snapshot.response(since=1)[0])["storage_indexes"] == [
+            "aaindex1",
+            "bbindex2",
+        ]
+
+    def test_first_request_before_refresher(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        assert json.loads(snapshot.response()[0])["object_count"] == 1
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"x", "abc"', True),
+            ("*", True),
+            ('"x"', False),
+            ("", False),
+        ],
+    )
+    def test_etag_matching(self, header: str, expected: bool):
+        assert etag_matches(header, '"abc"') is expected
+
+
 def manifest() -> dict:
     return {
         "network": {
@@ -65,7 +498,7 @@ def manifest() -> dict:
 
 
 def censuses(mapping: dict[str, dict | None]):
-    def fetch(vpn_ip: str) -> dict | None:
+    def fetch(vpn_ip: str, since: int | None = None) -> dict | None:
         return mapping.get(vpn_ip)
 
     return fetch
@@ -185,6 +618,104 @@ class TestReplication:
         assert "2/2" in html
         assert "2 obj · 2.0 KB" in html
 
+    def test_deltas_applied_across_collections(self):
+        cache = CensusCache()
+        requests: list[tuple[str, int | None]] = []
+        responses = {
+            "10.100.0.10": [
+                {**payload(["si1", "si2"]), "generation": 5},
+                {"object_count": 1, "generation": 6, "since": 5, "added": [], "removed": ["si2"]},
+            ],
+            "10.100.0.11": [
+                {**payload(["si1", "si2"]), "generation": 9},
+                {"object_count": 2, "generation": 9, "since": 9, "added": [], "removed": []},
+            ],
+        }
+
+        def fetch(vpn_ip: str, since: int | None = None) -> dict | None:
+            requests.append((vpn_ip, since))
+            return responses[vpn_ip].pop(0)
+
+        first = collect_status(
+            manifest(), "hub", lambda _ip: 5.0, 2, True, NOW, NOW, fetch, census_cache=cache
+        )
+        assert first.replication.fully_replicated == 2
+        second = collect_status(
+            manifest(), "hub", lambda _ip: 5.0, 2, True, NOW, NOW, fetch, census_cache=cache
+        )
+        assert requests == [
+            ("10.100.0.10", None),
+            ("10.100.0.11", None),
+            ("10.100.0.10", 5),
+            ("10.100.0.11", 9),
+        ]
+        assert second.replication.objects_total == 2
+        assert second.replication.under_replicated == 1  # si2 now only on n2
+        assert second.replication.per_server["n1"].objects == 1
+
+    def test_unmoved_generations_reuse_the_counts(self, monkeypatch):
+        cache = CensusCache()
+        generations = {"10.100.0.10": 5, "10.100.0.11": 9}
+
+        def fetch(vpn_ip: str, since: int | None = None) -> dict | None:
+            generation = generations[vpn_ip]
+            if since == generation:
+                return {"object_count": 1, "generation": generation, "since": since}
+            return {**payload(["si1"]), "generation": generation}
+
+        def collect_again():
+            return collect_status(
+                manifest(), "hub", lambda _ip: 5.0, 2, True, NOW, NOW, fetch, census_cache=cache
+            )
+
+        first = collect_again()
+        monkeypatch.setattr(
+            status_module, "replication_counts", lambda *_: pytest.fail("recounted")
+        )
+        second = collect_again()
+        assert second.replication.impact is first.replication.impact
+        assert second.replication.fully_replicated == first.replication.fully_replicated
+
+        monkeypatch.undo()
+        generations["10.100.0.11"] = 10  # a census moved: counted again
+        assert collect_again().replication.impact is not first.replication.impact
+
+    def test_mismatched_delta_falls_back_to_full_fetch(self):
+        cache = CensusCache()
+        cache.apply("n1", {**payload(["si1"]), "generation": 5})
+        cache.apply("n2", {**payload(["si1"]), "generation": 5})
+        calls: list[int | None] = []
+
+        def fetch(vpn_ip: str, since: int | None = None) -> dict | None:
+            calls.append(since)
+            if since is not None:
+                return {"generation": 8, "since": 7, "added": ["bogus"], "removed": []}
+            return {**payload(["si1", "si3"]), "generation": 8}
+
+        status = collect_status(
+            manifest(), "hub", lambda _ip: 5.0, 2, True, NOW, NOW, fetch, census_cache=cache
+        )
+        assert calls == [5, None, 5, None]
+        assert status.replication.objects_total == 2
+        assert status.replication.fully_replicated == 2
+
+    def test_unreachable_node_keeps_cached_census(self):
+        cache = CensusCache()
+        cache.apply("n1", {**payload(["si1"]), "generation": 5})
+        status = collect_status(
+            manifest(),
+            "hub",
+            lambda _ip: 5.0,
+            2,
+            True,
+            NOW,
+            NOW,
+            censuses({"10.100.0.11": payload(["si1"])}),
+            census_cache=cache,
+        )
+        assert not status.replication.complete
+        assert cache.generation("n1") == 5
+
     def test_partial_census_shows_unknown_not_alarm(self):
         status = collect(
             censuses(
@@ -195,3 +726,222 @@ class TestReplication:
             )
         )
         assert "?/1" in render_html(status)
+
+    def test_failure_impact_ranks_critical_nodes(self):
+        # shares_needed is 1: si2 and si3 live only on n1, si1 on both.
+        nodes = manifest()
+        nodes["nodes"][1]["region"] = "eu"
+        nodes["nodes"][2]["region"] = "eu"
+        status = collect_status(
+            nodes,
+            "hub",
+            lambda _ip: 5.0,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            fetch_census=censuses(
+                {
+                    "10.100.0.10": payload(["si1", "si2", "si3"]),
+                    "10.100.0.11": payload(["si1"]),
+                }
+            ),
+        )
+        impact = status.replication.impact
+        assert impact is not None
+        assert impact.critical_nodes == [("n1", 2), ("n2", 0)]
+        assert impact.worst_pairs == [("n1", "n2", 3)]
+        assert impact.regions == {"eu": 3}
+        assert (impact.at_risk, impact.unreadable) == (2, 0)
+        assert status.to_dict()["replication"]["impact"]["critical_nodes"][0] == ("n1", 2)
+        html = render_html(status)
+        assert "Most critical nodes" in html and "region eu" in html
+
+
+class TestSketch:
+    def test_sample_level_bounds_sample(self):
+        assert sample_level(100, max_sample=4096) == 0
+        assert sample_level(4097, max_sample=4096) == 1
+        assert sample_level(10_000_000, max_sample=4096) == 12
+
+    def test_samples_are_consistent_across_levels(self):
+        sis = real_sis(2000)
+        level3 = {si for si in sis if in_sample(si, 3)}
+        level5 = {si for si in sis if in_sample(si, 5)}
+        assert level5 <= level3
+        assert 2000 / 8 * 0.7 < len(level3) < 2000 / 8 * 1.3
+
+    def test_hyperloglog_estimates_and_merges(self):
+        sis = real_sis(20_000)
+        left, right = HyperLogLog(), HyperLogLog()
+        for si in sis[:12_000]:
+            left.add(si)
+        for si in sis[8_000:]:
+            right.add(si)
+        assert abs(left.estimate() - 12_000) < 12_000 * 0.05
+        restored = HyperLogLog.from_text(right.to_text())
+        left.merge(restored)
+        assert abs(left.estimate() - 20_000) < 20_000 * 0.05
+
+    def test_small_sets_are_nearly_exact(self):
+        hll = HyperLogLog()
+        for si in ["si1", "si2", "si3"]:
+            hll.add(si)
+        assert round(hll.estimate()) == 3
+
+    def test_estimated_replication(self):
+        sis = real_sis(40_000)
+        # n1 holds everything, n2 misses every fourth object: 25% under-replicated.
+        # (Strided, not a prefix: the sample is keyed on the leading SI bits.)
+        partial = [si for i, si in enumerate(sis) if i % 4]
+        n1 = {"object_count": 40_000, "sketch": census_sketch(sis, 40_000)}
+        n2 = {"object_count": 30_000, "sketch": census_sketch(partial, 30_000)}
+        assert n1["sketch"]["level"] == 4
+        assert len(n1["sketch"]["sample"]) < 4096
+
+        sketches = {"10.100.0.10": n1, "10.100.0.11": n2}
+        status = collect_status(
+            manifest(),
+            "hub",
+            lambda _ip: 5.0,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            fetch_sketch=sketches.get,
+        )
+        replication = status.replication
+        assert replication.estimated
+        assert abs(replication.objects_total - 40_000) < 40_000 * 0.05
+        assert abs(replication.under_replicated - 10_000) < 40_000 * 0.05
+        assert status.to_dict()["replication"]["estimated"] is True
+        assert any(note.startswith("about ") for note in status.notes)
+        assert "≈" in render_html(status)
+
+    def test_sketch_served_by_snapshot(self, tmp_path: Path):
+        shares = make_shares(tmp_path, {"aaindex1": [0], "bbindex2": [0]})
+        snapshot = CensusSnapshot("n1", CensusIndex(shares))
+        snapshot.refresh()
+        body = json.loads(snapshot.response(sketch=True)[0])
+        assert "storage_indexes" not in body
+        assert body["object_count"] == 2
+        assert body["sketch"]["sample"] == ["aaindex1", "bbindex2"]
+        # The full payload the snapshot holds is untouched.
+        assert json.loads(snapshot.response()[0])["storage_indexes"] == ["aaindex1", "bbindex2"]
+
+
+DAY = 86400
+RENEWAL = 31 * DAY  # Tahoe stores expiration = renewal + 31 days
+
+
+def immutable_share(path: Path, renewed: list[int], data: bytes = b"d" * 1000) -> None:
+    """A v1 immutable share container with leases renewed at the given times."""
+    leases = b"".join(
+        struct.pack(">L32s32sL", 0, b"r" * 32, b"c" * 32, t + RENEWAL) for t in renewed
+    )
+    path.write_bytes(struct.pack(">LLL", 1, len(data), len(renewed)) + data + leases)
+
+
+def mutable_share(path: Path, renewed: list[int], extra: list[int]) -> None:
+    """A mutable container: up to four lease slots, more at the extra lease offset."""
+    data = b"m" * 500
+    slots = [
+        struct.pack(">LL32s32s20s", 0, t + RENEWAL, b"r" * 32, b"c" * 32, b"n" * 20)
+        for t in renewed
+    ]
+    slots += [b"\0" * 92] * (4 - len(slots))
+    extra_offset = 100 + 4 * 92 + len(data)
+    header = struct.pack(
+        ">32s20s32sQQ",
+        b"Tahoe mutable container v1\n\x75\x09\x44\x03\x8e",
+        b"w" * 20,
+        b"e" * 32,
+        len(data),
+        extra_offset,
+    )
+    tail = struct.pack(">L", len(extra)) + b"".join(
+        struct.pack(">LL32s32s20s", 0, t + RENEWAL, b"r" * 32, b"c" * 32, b"n" * 20) for t in extra
+    )
+    path.write_bytes(header + b"".join(slots) + data + tail)
+
+
+class TestLeases:
+    def test_reads_newest_immutable_lease(self, tmp_path: Path):
+        share = tmp_path / "0"
+        immutable_share(share, [1_000_000, 5_000_000, 3_000_000])
+        assert read_share_lease(str(share)) == (share.stat().st_size, 5_000_000)
+
+    def test_reads_mutable_slots_and_extra_leases(self, tmp_path: Path):
+        share = tmp_path / "0"
+        mutable_share(share, [2_000_000], extra=[])
+        assert read_share_lease(str(share))[1] == 2_000_000
+        mutable_share(share, [2_000_000, 1_000_000, 1_500_000, 900_000], extra=[7_000_000])
+        assert read_share_lease(str(share)) == (share.stat().st_size, 7_000_000)
+
+    def test_foreign_or_leaseless_file_has_no_lease(self, tmp_path: Path):
+        (tmp_path / "junk").write_bytes(b"x" * 100)
+        (tmp_path / "tiny").write_bytes(b"x")
+        immutable_share(tmp_path / "bare", [])
+        assert read_share_lease(str(tmp_path / "junk")) == (100, None)
+        assert read_share_lease(str(tmp_path / "tiny")) == (1, None)
+        assert read_share_lease(str(tmp_path / "bare"))[1] is None
+
+    def test_parse_lease_duration(self):
+        assert parse_lease_duration("90 days") == 90 * DAY
+        assert parse_lease_duration("1 day") == DAY
+        assert parse_lease_duration("2 months") == 62 * DAY
+        assert parse_lease_duration("1year") == 365 * DAY
+        assert parse_lease_duration("3600") == 3600
+        with pytest.raises(ValueError):
+            parse_lease_duration("soon")
+
+    def test_summary_histogram_and_expiring(self):
+        now = 1000 * DAY
+        buckets = [
+            [1000, 2, 200],  # renewed today
+            [990, 1, 100],  # 10 days old
+            [920, 3, 300],  # 80 days: expires within 14 days
+            [900, 1, 50],  # 100 days: overdue, not yet collected
+            [-1, 4, 40],  # no readable lease
+        ]
+        summary = lease_summary(buckets, 90 * DAY, now=now, warn_days=14)
+        assert [b["shares"] for b in summary["age_histogram"]] == [2, 1, 0, 3, 1]
+        assert summary["age_histogram"][-1]["max_age_days"] is None
+        assert (summary["expiring_shares"], summary["expiring_bytes"]) == (4, 350)
+        assert (summary["unleased_shares"], summary["unleased_bytes"]) == (4, 40)
+        assert summary["lease_duration_days"] == 90
+
+    def test_index_reports_leases(self, tmp_path: Path):
+        now = time.time()
+        shares = tmp_path / "shares"
+        for si, renewed in (("aaindex1", now - 85 * DAY), ("bbindex2", now - DAY)):
+            (shares / si[:2] / si).mkdir(parents=True)
+            immutable_share(shares / si[:2] / si / "0", [int(renewed)])
+        index_path = tmp_path / "index.json"
+        index = CensusIndex(shares, index_path, lease_duration=90 * DAY)
+        index.refresh()
+        leases = index.census()["leases"]
+        assert leases["expiring_shares"] == 1
+        assert leases["expiring_bytes"] == (shares / "aa" / "aaindex1" / "0").stat().st_size
+        assert sum(b["shares"] for b in leases["age_histogram"]) == 2
+
+        # Restored from disk; an index built without lease reading is not reused.
+        assert CensusIndex(shares, index_path, lease_duration=90 * DAY).census() == index.census()
+        assert CensusIndex(shares, index_path).census()["object_count"] == 0
+        assert "leases" not in CensusIndex(shares).census()
+
+    def test_expiring_shares_noted_on_hub(self):
+        leases = {"expiring_shares": 3, "expiring_bytes": 3 * 1024**2, "expiring_within_days": 14}
+        status = collect(
+            censuses(
+                {
+                    "10.100.0.10": {**payload(["si1"]), "leases": leases},
+                    "10.100.0.11": payload(["si1"]),
+                }
+            )
+        )
+        census_n1 = status.replication.per_server["n1"]
+        assert census_n1.expiring_shares == 3
+        assert status.replication.per_server["n2"].expiring_shares is None
+        assert any("3 share(s) on n1" in note for note in status.notes)
+        assert "3.0 MB expiring" in render_html(status)
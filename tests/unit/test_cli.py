@@ -1,6 +1,7 @@
 """Unit tests for the CLI commands (real assertions against real behavior)."""
 
 import copy
+import json
 from pathlib import Path
 
 import pytest
@@ -8,7 +9,11 @@ import yaml
 from typer.testing import CliRunner
 
 from redundanet import __version__
+from redundanet.cli import network as network_cli
 from redundanet.cli.main import app
+from redundanet.core.config import AppSettings
+from redundanet.core.manifest import Manifest
+from redundanet.utils.process import CommandResult
 
 runner = CliRunner()
 
@@ -63,6 +68,17 @@ class TestValidateCommand:
         assert result.exit_code == 1
         assert "Validation failed" in result.output
 
+    def test_schema_errors_are_all_listed(self, sample_manifest_data: dict, tmp_path: Path):
+        data = copy.deepcopy(sample_manifest_data)
+        data["nodes"][0]["status"] = "paused"
+        data["nodes"][1]["ports"] = {"tinc": "655"}
+        path = tmp_path / "bad.yaml"
+        path.write_text(yaml.dump(data))
+        result = runner.invoke(app, ["validate", str(path)])
+        assert result.exit_code == 1
+        assert "nodes[0].status" in result.output
+        assert "nodes[1].ports.tinc" in result.output
+
     def test_missing_file_fails(self, tmp_path: Path):
         result = runner.invoke(app, ["validate", str(tmp_path / "nope.yaml")])
         assert result.exit_code == 1
@@ -244,3 +260,51 @@ class TestSubcommandHelp:
         assert result.exit_code == 0
         for command in ("upload", "download", "status", "renew"):
             assert command in result.output
+
+
+class FakeDeployment:
+    """Scripted stand-in for Deployment.exec, recording each invocation."""
+
+    def __init__(self, results: list[CommandResult]) -> None:
+        self.results = results
+        self.calls: list[tuple[str, list[str]]] = []
+
+    def exec(self, service: str, args: list[str], **kwargs) -> CommandResult:
+        self.calls.append((service, args))
+        return self.results.pop(0)
+
+
+class TestNetworkPeers:
+    def invoke(self, monkeypatch, sample_manifest_file: Path, deployment: FakeDeployment):
+        settings = AppSettings(node_name="node1")
+        monkeypatch.setattr(network_cli, "_deployment", lambda: (deployment, settings))
+        monkeypatch.setattr(
+            network_cli, "_load_manifest", lambda _s: Manifest.from_file(sample_manifest_file)
+        )
+        return runner.invoke(app, ["network", "peers"])
+
+    def test_peers_probed_in_one_batch(self, monkeypatch, sample_manifest_file: Path):
+        manifest = Manifest.from_file(sample_manifest_file)
+        peer = next(n for n in manifest.nodes if n.name != "node1")
+        target = peer.vpn_ip or peer.internal_ip
+        stats = {target: {"rtts_ms": [2.0, 4.0], "min_ms": 2.0, "avg_ms": 3.0, "loss_pct": 33.3}}
+        deployment = FakeDeployment([CommandResult(0, json.dumps(stats), "", "probe")])
+
+        result = self.invoke(monkeypatch, sample_manifest_file, deployment)
+        assert result.exit_code == 0
+        assert len(deployment.calls) == 1
+        assert deployment.calls[0][1][:4] == ["python", "-m", "redundanet.monitor.probe", "--json"]
+        assert "online" in result.output
+        assert "2.0/3.0 ms" in result.output
+        assert "33%" in result.output
+
+    def test_old_image_falls_back_to_ping(self, monkeypatch, sample_manifest_file: Path):
+        peers = [n for n in Manifest.from_file(sample_manifest_file).nodes if n.name != "node1"]
+        deployment = FakeDeployment(
+            [CommandResult(1, "", "No module named redundanet.monitor.probe", "probe")]
+            + [CommandResult(0, "", "", "ping") for _ in peers]
+        )
+        result = self.invoke(monkeypatch, sample_manifest_file, deployment)
+        assert result.exit_code == 0
+        assert [args[0] for _, args in deployment.calls[1:]] == ["ping"] * len(peers)
+        assert "online" in result.output
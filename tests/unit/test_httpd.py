@@ -0,0 +1,148 @@
+"""Unit tests for the status server's asyncio HTTP/1.1 front end."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from redundanet.monitor.httpd import HTTPServer, Request, Response
+
+
+async def echo(request: Request) -> Response:
+    return Response(200, request.target.encode(), {"Content-Type": "text/plain"})
+
+
+async def read_response(reader: asyncio.StreamReader) -> tuple[str, dict[str, str], bytes]:
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status, *lines = head.strip().split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines)}
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, headers, body
+
+
+def with_server(test: Callable[[int], Awaitable[None]], **limits: float) -> None:
+    """Run ``test(port)`` against a server on an ephemeral port."""
+
+    async def main() -> None:
+        server = await HTTPServer(echo, **limits).start("127.0.0.1", 0)
+        async with server:
+            await test(server.sockets[0].getsockname()[1])
+
+    asyncio.run(main())
+
+
+class TestHTTPServer:
+    def test_keep_alive_and_pipelining(self):
+        async def test(port: int) -> None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /a HTTP/1.1\r\nHost: x\r\n\r\nGET /b HTTP/1.1\r\nHost: x\r\n\r\n")
+            for target in (b"/a", b"/b"):
+                status, headers, body = await read_response(reader)
+                assert status == "HTTP/1.1 200 OK"
+                assert headers["connection"] == "keep-alive"
+                assert body == target
+            writer.write(b"GET /c HTTP/1.1\r\nConnection: close\r\n\r\n")
+            _, headers, body = await read_response(reader)
+            assert (headers["connection"], body) == ("close", b"/c")
+            assert await reader.read() == b""  # the server closed it
+            writer.close()
+
+        with_server(test)
+
+    def test_http10_closes_unless_asked(self):
+        async def test(port: int) -> None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.0\r\n\r\n")
+            _, headers, _ = await read_response(reader)
+            assert headers["connection"] == "close"
+            writer.close()
+
+        with_server(test)
+
+    def test_head_has_no_body(self):
+        async def test(port: int) -> None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"HEAD /abc HTTP/1.1\r\n\r\nGET /x HTTP/1.1\r\n\r\n")
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"Content-Length: 4" in head
+            _, _, body = await read_response(reader)  # the next response follows directly
+            assert body == b"/x"
+            writer.close()
+
+        with_server(test)
+
+    def test_connection_cap(self):
+        async def test(port: int) -> None:
+            first = await asyncio.open_connection("127.0.0.1", port)
+            await asyncio.sleep(0.05)  # let the server accept it
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, headers, _ = await read_response(reader)
+            assert status.startswith("HTTP/1.1 503")
+            assert headers["retry-after"] == "1"
+            for _, w in (first, (reader, writer)):
+                w.close()
+
+        with_server(test, max_connections=1)
+
+    def test_slow_clients_are_dropped(self):
+        async def test(port: int) -> None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.1\r\nHost:")  # ...and never finishes
+            assert await asyncio.wait_for(reader.read(), 2) == b""
+            writer.close()
+
+        with_server(test, read_timeout=0.1)
+
+    def test_bad_requests(self):
+        async def test(port: int) -> None:
+            for raw, status in (
+                (b"nonsense\r\n\r\n", "400"),
+                (b"POST / HTTP/1.1\r\nContent-Length: 0\r\n\r\n", "405"),
+                (b"GET / HTTP/1.1\r\nX: " + b"a" * 20_000 + b"\r\n\r\n", "431"),
+            ):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(raw)
+                line, _, _ = await read_response(reader)
+                assert line.split(" ")[1] == status
+                writer.close()
+
+        with_server(test)
+
+    def test_handler_failure_is_a_500(self):
+        async def test(port: int) -> None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.1\r\n\r\n")
+            status, _, _ = await read_response(reader)
+            assert status == "HTTP/1.1 500 Internal Server Error"
+            writer.close()
+
+        async def broken(request: Request) -> Response:
+            raise RuntimeError("boom")
+
+        async def main() -> None:
+            server = await HTTPServer(broken).start("127.0.0.1", 0)
+            async with server:
+                await test(server.sockets[0].getsockname()[1])
+
+        asyncio.run(main())
+
+    def test_streams_end_the_connection(self):
+        async def chunks():
+            yield b"one\n"
+            yield b"two\n"
+
+        async def streaming(request: Request) -> Response:
+            return Response(200, headers={"Content-Type": "text/event-stream"}, stream=chunks())
+
+        async def main() -> None:
+            server = await HTTPServer(streaming).start("127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /events HTTP/1.1\r\n\r\n")
+                head = await reader.readuntil(b"\r\n\r\n")
+                assert b"Content-Length" not in head and b"Connection: close" in head
+                assert await reader.read() == b"one\ntwo\n"
+                writer.close()
+
+        asyncio.run(main())
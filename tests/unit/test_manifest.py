@@ -1,12 +1,15 @@
 """Unit tests for manifest module."""
 
+import os
+import time
 from pathlib import Path
 
 import pytest
 import yaml
 
+from redundanet.core.config import NodeConfig, NodeRole
 from redundanet.core.exceptions import ManifestError, ValidationError
-from redundanet.core.manifest import Manifest, locate_manifest
+from redundanet.core.manifest import Manifest, ManifestCache, locate_manifest
 
 
 class TestLocateManifest:
@@ -341,3 +344,200 @@ class TestManifest:
         assert result.errors == []
         assert any("no write-redundancy headroom" in w for w in result.warnings)
         assert not any("Not enough storage nodes" in w for w in result.warnings)
+
+
+def big_manifest(count: int) -> Manifest:
+    """A valid manifest of ``count`` nodes across three regions."""
+    return Manifest.from_dict(
+        {
+            "network": {
+                "name": "big",
+                "version": "1.0.0",
+                "domain": "big.local",
+                "vpn_network": "10.100.0.0/16",
+            },
+            "nodes": [
+                {
+                    "name": f"node{i}",
+                    "internal_ip": f"192.168.{i // 250}.{i % 250 + 1}",
+                    "vpn_ip": f"10.100.{i // 250}.{i % 250 + 1}",
+                    "gpg_key_id": f"{i:040X}",
+                    "region": ("eu", "us", "ap")[i % 3],
+                    "roles": ["tahoe_introducer"] if i == 0 else ["tinc_vpn", "tahoe_storage"],
+                }
+                for i in range(count)
+            ],
+        }
+    )
+
+
+class TestManifestIndexes:
+    def test_lookups(self, manifest_file: Path):
+        manifest = Manifest.from_file(manifest_file)
+        node1 = manifest.get_node("node1")
+        assert manifest.get_node_by_ip("10.100.0.1") is node1
+        assert manifest.get_node_by_ip("192.168.1.10") is node1
+        assert manifest.get_node_by_ip("10.9.9.9") is None
+        assert manifest.get_node_by_key_id("abcd1234 abcd1234abcd1234abcd1234abcd1234") is node1
+        assert manifest.get_node_by_key_id("FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF") is None
+        assert manifest.get_nodes_by_region("nowhere") == []
+
+    def test_add_and_remove_keep_indexes_consistent(self, manifest_file: Path):
+        manifest = Manifest.from_file(manifest_file)
+        node = NodeConfig(
+            name="node3",
+            internal_ip="10.100.0.3",
+            gpg_key_id="C" * 40,
+            region="eu",
+            roles=[NodeRole.TAHOE_STORAGE],
+        )
+        manifest.add_node(node)
+        assert manifest.get_node("node3") is node
+        assert manifest.get_node_by_ip("10.100.0.3") is node
+        assert manifest.get_node_by_key_id("c" * 40) is node
+        assert manifest.get_nodes_by_region("eu") == [node]
+        assert [n.name for n in manifest.get_storage_nodes()] == ["node1", "node2", "node3"]
+        with pytest.raises(ManifestError):
+            manifest.add_node(node)
+
+        assert manifest.remove_node("node1")
+        assert not manifest.remove_node("node1")
+        assert manifest.get_node("node1") is None
+        assert manifest.get_node_by_ip("10.100.0.1") is None
+        assert manifest.get_introducers() == []
+        assert [n.name for n in manifest.get_storage_nodes()] == ["node2", "node3"]
+        assert [n.name for n in manifest.nodes] == ["node2", "node3"]
+
+    def test_duplicate_names_are_removed_one_at_a_time(self, valid_manifest_data: dict):
+        valid_manifest_data["nodes"].append(dict(valid_manifest_data["nodes"][0]))
+        manifest = Manifest.from_dict(valid_manifest_data)
+        first, duplicate = manifest.nodes[0], manifest.nodes[2]
+        assert manifest.get_node("node1") is first
+        manifest.remove_node("node1")
+        assert manifest.get_node("node1") is duplicate
+        assert manifest.nodes[1] is duplicate
+
+    def test_assigning_nodes_or_reindexing_rebuilds(self, manifest_file: Path):
+        manifest = Manifest.from_file(manifest_file)
+        node2 = manifest.get_node("node2")
+        assert node2 is not None
+        manifest.nodes = [node2]
+        assert manifest.get_node("node1") is None
+        node2.region = "ap"
+        manifest.reindex()
+        assert manifest.get_nodes_by_region("ap") == [node2]
+
+
+@pytest.fixture(scope="module")
+def manifest() -> Manifest:
+    """A shared 10,000-node manifest; tests that change nodes build their own."""
+    return big_manifest(TestManifestScaling.COUNT)
+
+
+class TestManifestScaling:
+    """10,000 nodes: every lookup is indexed and validation is one linear pass."""
+
+    COUNT = 10_000
+
+    def test_lookups_at_scale(self, manifest: Manifest):
+        start = time.perf_counter()
+        for i in range(self.COUNT):
+            ip = f"10.100.{i // 250}.{i % 250 + 1}"
+            assert manifest.get_node(f"node{i}") is manifest.get_node_by_ip(ip)
+            assert manifest.get_node_by_key_id(f"{i:040X}") is not None
+        # Linear scans would be ~10^8 comparisons here; indexed lookups are ~10^4.
+        assert time.perf_counter() - start < 2
+        assert len(manifest.get_storage_nodes()) == self.COUNT - 1
+        assert len(manifest.get_nodes_by_region("eu")) == -(-self.COUNT // 3)
+
+    def test_validation_at_scale(self, manifest: Manifest):
+        start = time.perf_counter()
+        result = manifest.validate_detailed()
+        assert time.perf_counter() - start < 1
+        assert result.errors == []
+
+    def test_validation_finds_duplicates_at_scale(self):
+        manifest = big_manifest(self.COUNT)
+        clone = manifest.nodes[-1].model_copy()
+        manifest.nodes[0].name = clone.name
+        manifest.reindex()
+        manifest.add_node(clone.model_copy(update={"name": "late"}))
+        errors = manifest.validate_detailed().errors
+        assert any(f"Duplicate node names: ['{clone.name}']" == e for e in errors)
+        assert any(str(clone.vpn_ip) in e for e in errors if e.startswith("Duplicate IP"))
+
+    def test_add_and_remove_at_scale(self):
+        manifest = big_manifest(self.COUNT)
+        for i in range(0, self.COUNT, 2):
+            assert manifest.remove_node(f"node{i}")
+        assert len(manifest.nodes) == self.COUNT // 2
+        assert manifest.get_node_by_ip("10.100.0.1") is None
+        assert (
+            len(manifest.get_nodes_by_region("eu"))
+            + len(manifest.get_nodes_by_region("us"))
+            + len(manifest.get_nodes_by_region("ap"))
+            == self.COUNT // 2
+        )
+        assert manifest.get_introducers() == []
+
+
+class TestManifestCache:
+    """Tests for the parsed-manifest cache of long-running processes."""
+
+    @staticmethod
+    def age(path: Path, seconds: int = 60) -> None:
+        """Backdate the file's mtime past the settle window."""
+        mtime = path.stat().st_mtime - seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_unchanged_file_is_parsed_once(self, manifest_file: Path):
+        cache = ManifestCache()
+        self.age(manifest_file)
+        first = cache.load_dict(manifest_file)
+        for _ in range(5):
+            assert cache.load_dict(manifest_file) is first
+        assert cache.parses == 1
+        assert first["network"]["name"] == "test-network"
+
+    def test_change_is_picked_up(self, manifest_file: Path):
+        cache = ManifestCache()
+        self.age(manifest_file)
+        cache.load_dict(manifest_file)
+        manifest_file.write_text(manifest_file.read_text().replace("test-network", "new-network!"))
+        assert cache.load_dict(manifest_file)["network"]["name"] == "new-network!"
+        assert cache.parses == 2
+
+    def test_same_size_and_mtime_rewrite_within_the_settle_window(self, manifest_file: Path):
+        cache = ManifestCache()
+        stat = manifest_file.stat()
+        cache.load_dict(manifest_file)
+        manifest_file.write_text(manifest_file.read_text().replace("test-network", "tset-network"))
+        os.utime(manifest_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # same tick, same size
+        assert cache.load_dict(manifest_file)["network"]["name"] == "tset-network"
+
+    def test_touch_without_change_is_not_reparsed(self, manifest_file: Path):
+        cache = ManifestCache()
+        self.age(manifest_file, 120)
+        cache.load_dict(manifest_file)
+        self.age(manifest_file, -60)  # a checkout rewrote it, same content
+        cache.load_dict(manifest_file)
+        assert cache.parses == 1
+
+    def test_manifest_objects_are_shared(self, manifest_file: Path):
+        cache = ManifestCache()
+        self.age(manifest_file)
+        manifest = cache.load(manifest_file)
+        assert cache.load(manifest_file) is manifest
+        assert len(manifest.nodes) == 2 and cache.parses == 1
+
+    def test_errors(self, tmp_path: Path):
+        cache = ManifestCache()
+        with pytest.raises(ManifestError):
+            cache.load_dict(tmp_path / "missing.yaml")
+        bad = tmp_path / "bad.yaml"
+        bad.write_text("nodes: [unclosed")
+        with pytest.raises(ManifestError):
+            cache.load_dict(bad)
+        empty = tmp_path / "empty.yaml"
+        empty.write_text("")
+        assert cache.load_dict(empty) == {}
@@ -1,12 +1,29 @@
-"""Unit tests for the hub status monitor (model, history, renderer)."""
+"""Unit tests for the hub status monitor (model, history, renderer, encoding)."""
 
 from __future__ import annotations
 
+import gzip
+import json
+import threading
+import time
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from redundanet.monitor.render import render_html
+import pytest
+
+from redundanet.monitor.encoding import EncodedBody, preferred_codings
+from redundanet.monitor.history import MAX_POINTS, NAME_BYTES, HistoryStore, Sample, _RingFile
+from redundanet.monitor.metrics import Histogram, render_metrics, snapshot_age_metric
+from redundanet.monitor.probe import ProbeResult
+from redundanet.monitor.render import (
+    live_state,
+    render_diff,
+    render_html,
+    render_parts,
+    state_tag,
+)
 from redundanet.monitor.status import append_sample, collect_status, uptime_stats
+from redundanet.monitor.views import PAGE_SIZE, NodeQuery, StatusViews
 
 NOW = datetime(2026, 8, 10, 12, 0, 0, tzinfo=UTC)
 
@@ -177,9 +194,179 @@ class TestVerdict:
         assert len(pinged) == 2
 
 
+def many_nodes(count: int) -> list[dict]:
+    return [{"name": "hub", "vpn_ip": "10.100.0.1", "roles": ["tinc_vpn"], "status": "active"}] + [
+        {
+            "name": f"n{i}",
+            "vpn_ip": f"10.100.1.{i}",
+            "roles": ["tinc_vpn", "tahoe_storage"],
+            "status": "active",
+        }
+        for i in range(count)
+    ]
+
+
+class TestFanOut:
+    def test_probes_run_concurrently(self):
+        def slow_ping(_ip: str) -> float:
+            time.sleep(0.2)
+            return 5.0
+
+        start = time.monotonic()
+        status = collect_status(
+            manifest(many_nodes(20)),
+            "hub",
+            slow_ping,
+            storage_connected=20,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        assert time.monotonic() - start < 2.0  # serially this takes 4 s
+        assert all(n.reachable for n in status.nodes)
+
+    def test_late_ping_is_unknown_not_offline(self):
+        release = threading.Event()
+
+        def hanging_ping(ip: str) -> float | None:
+            if ip == "10.100.0.11":
+                release.wait(5)
+            return 10.0
+
+        start = time.monotonic()
+        status = collect_status(
+            manifest(),
+            "hub",
+            hanging_ping,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            deadline=0.3,
+        )
+        release.set()
+        assert time.monotonic() - start < 2.0
+        n1, n2 = status.nodes[1], status.nodes[2]
+        assert n1.reachable is True
+        assert n2.reachable is None
+        assert status.overall == "ok"
+        assert any("n2 did not answer" in note for note in status.notes)
+        assert not any("unreachable" in note for note in status.notes)
+        assert "unknown" in render_html(status)
+
+    def test_late_census_leaves_replication_incomplete(self):
+        release = threading.Event()
+
+        def fetch(ip: str, since: int | None = None) -> dict:
+            if ip == "10.100.0.11":
+                release.wait(5)
+            return {"object_count": 1, "storage_indexes": ["si1"], "disk_used_bytes": 10}
+
+        status = collect_status(
+            manifest(),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            fetch_census=fetch,
+            deadline=0.3,
+        )
+        release.set()
+        assert status.replication is not None
+        assert not status.replication.complete
+        assert list(status.replication.per_server) == ["n1"]
+        assert any("n2 missed the collection deadline" in note for note in status.notes)
+
+    def test_batch_probe_replaces_per_node_pings(self):
+        batches: list[list[str]] = []
+
+        def probe_batch(targets: list[str]) -> dict[str, ProbeResult]:
+            batches.append(targets)
+            return {
+                "10.100.0.10": ProbeResult("10.100.0.10", sent=3, rtts_ms=[10.0, 14.0]),
+                "10.100.0.11": ProbeResult("10.100.0.11", sent=3),
+            }
+
+        status = collect_status(
+            manifest(),
+            "hub",
+            lambda _ip: pytest.fail("per-node ping used"),
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            probe_batch=probe_batch,
+        )
+        assert batches == [["10.100.0.10", "10.100.0.11"]]
+        n1, n2 = status.nodes[1], status.nodes[2]
+        assert (n1.reachable, n1.rtt_ms, n1.loss_pct) == (True, 12.0, 33.3)
+        assert (n2.reachable, n2.loss_pct) == (False, 100.0)
+        assert "33% loss" in render_html(status)
+
+    def test_needs_a_prober(self):
+        with pytest.raises(ValueError, match="ping or probe_batch"):
+            collect_status(
+                manifest(),
+                "hub",
+                None,
+                storage_connected=2,
+                furl_present=True,
+                manifest_synced_at=NOW,
+            )
+
+    def test_collector_timings_per_phase_and_node(self):
+        def slow_fetch(ip: str, since: int | None = None) -> dict:
+            time.sleep(0.05 if ip == "10.100.0.11" else 0)
+            return {"object_count": 1, "storage_indexes": ["si1"], "disk_used_bytes": 10}
+
+        status = collect_status(
+            manifest(),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            fetch_census=slow_fetch,
+        )
+        timings = status.collector
+        assert timings is not None
+        assert set(timings.phases) == {"census", "probe"}
+        assert timings.phases["census"] >= 0.05
+        assert set(timings.nodes) == {"n1", "n2"}
+        assert set(timings.nodes["n2"]) == {"ping", "census"}
+        assert timings.nodes["n2"]["census"] >= 0.05 > timings.nodes["n1"]["census"]
+        collector = status.to_dict()["collector"]
+        assert collector["overran"] is False
+        assert collector["nodes"]["n2"]["census"] == timings.nodes["n2"]["census"]
+
+    def test_inline_probes_skip_once_the_deadline_passed(self):
+        calls: list[str] = []
+
+        def ping(ip: str) -> float:
+            calls.append(ip)
+            return 1.0
+
+        status = collect_status(
+            manifest(),
+            "hub",
+            ping,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+            deadline=0,
+            workers=1,
+        )
+        assert calls == []
+        assert [n.reachable for n in status.nodes] == [True, None, None]
+
+
 class TestHistory:
     def test_uptime_from_samples(self, tmp_path: Path):
-        history = tmp_path / "history.jsonl"
+        history = HistoryStore(tmp_path / "history.bin")
         for minute in range(10):
             status = collect_status(
                 manifest(),
@@ -197,7 +384,7 @@ class TestHistory:
         assert stats["n1"] == 80.0
 
     def test_old_samples_excluded(self, tmp_path: Path):
-        history = tmp_path / "history.jsonl"
+        history = HistoryStore(tmp_path / "history.bin")
         old = collect_status(
             manifest(),
             "hub",
@@ -221,10 +408,141 @@ class TestHistory:
         stats = uptime_stats(history, timedelta(hours=24), now=NOW)
         assert stats["n1"] == 100.0
 
-    def test_corrupt_lines_ignored(self, tmp_path: Path):
-        history = tmp_path / "history.jsonl"
-        history.write_text("not json\n")
-        assert uptime_stats(history, timedelta(hours=24), now=NOW) == {}
+    def test_unknown_nodes_are_not_sampled(self, tmp_path: Path):
+        history = HistoryStore(tmp_path / "history.bin")
+        status = collect_status(
+            manifest(),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        status.nodes[2].reachable = None
+        append_sample(history, status)
+        stats = uptime_stats(history, timedelta(hours=1), now=NOW)
+        assert stats == {"hub": 100.0, "n1": 100.0}
+
+    def test_samples_survive_reopening(self, tmp_path: Path):
+        path = tmp_path / "history.bin"
+        history = HistoryStore(path)
+        history.append(Sample(1000.0, "degraded", {"n1": True, "n2": False}, {"n1": 12.34}))
+        history.close()
+
+        (sample,) = HistoryStore(path).samples()
+        assert sample == Sample(1000.0, "degraded", {"n1": True, "n2": False}, {"n1": 12.3})
+
+    def test_ring_keeps_the_newest_and_reads_windows(self, tmp_path: Path):
+        history = HistoryStore(tmp_path / "history.bin", capacity=5)
+        for minute in range(12):
+            history.append(Sample(60.0 * minute, "ok", {"n1": minute % 2 == 0}))
+        assert len(history) == 5
+        assert [s.ts for s in history.samples()] == [420, 480, 540, 600, 660]
+        assert [s.ts for s in history.samples(start=500, end=600)] == [540]
+        assert history.raw_uptime(start=540) == {"n1": 33.3}  # 540 down, 600 up, 660 down
+
+    def test_long_windows_come_from_rollups(self, tmp_path: Path):
+        path = tmp_path / "history.bin"
+        history = HistoryStore(path, capacity=60)  # raw ring: one hour only
+        day = 86400
+        for hour in range(40 * 24):  # 40 days, one sample per hour; n1 down on day 35
+            ts = hour * 3600.0
+            history.append(Sample(ts, "ok", {"n1": hour // 24 != 35, "n2": True}))
+        now = 40 * day
+        assert len(history) == 60
+        assert history.uptime(now - 7 * day, now) == {"n1": 85.7, "n2": 100.0}  # hourly
+        assert history.uptime(now - 30 * day, now)["n1"] == 96.7  # daily
+        assert history.uptime(now - 90 * day, now)["n1"] == 97.5
+        assert history.hourly.uptime(now - 7 * day) == history.uptime(now - 7 * day, now)
+
+        # The rollups persist, and are rebuilt from the raw ring if lost.
+        history.close()
+        assert HistoryStore(path).uptime(now - 30 * day, now)["n1"] == 96.7
+        (tmp_path / "history.daily.bin").unlink()
+        rebuilt = HistoryStore(path)
+        assert rebuilt.daily.uptime(0) == {"n1": 100.0, "n2": 100.0}  # only the last hour
+
+    def test_latency_series_from_samples(self, tmp_path: Path):
+        history = HistoryStore(tmp_path / "history.bin")
+        for minute in range(120):  # n1: 10-29 ms, a 100 ms spike every 10th sample
+            rtt = 100.0 if minute % 10 == 9 else 10.0 + minute % 20
+            history.append(Sample(60.0 * minute, "ok", {"n1": True}, {"n1": rtt}, {"n1": 5.0}))
+        series = history.latency("n1", 0, 7200, step=600)
+        assert (series["resolution"], series["step"]) == ("sample", 600)
+        assert series["ts"] == [600 * i for i in range(12)]
+        assert series["samples"][0] == 10
+        assert series["min_ms"][0] == 10.0
+        assert series["avg_ms"][0] == 22.6  # (10 + ... + 18 + 100) / 10
+        assert series["p95_ms"][0] == 100.0
+        assert series["loss_pct"][0] == 5.0
+        assert history.rtt_percentiles(0) == {"n1": (20.0, 100.0)}
+        # Never more than MAX_POINTS buckets, however small the step asked for.
+        assert len(history.latency("n1", 0, 7200, step=1)["ts"]) <= MAX_POINTS
+        assert history.latency("nobody", 0, 7200)["ts"] == []
+
+    def test_long_latency_series_come_from_rollups(self, tmp_path: Path):
+        history = HistoryStore(tmp_path / "history.bin", capacity=60)
+        for hour in range(40 * 24):
+            history.append(Sample(hour * 3600.0, "ok", {"n1": True}, {"n1": 20.0 + hour % 3}))
+        now = 40 * 86400
+        series = history.latency("n1", now - 90 * 86400, now)
+        assert series["resolution"] == "day"
+        assert series["step"] % 86400 == 0
+        assert sum(series["samples"]) == 40 * 24
+        assert series["min_ms"][0] == 20.0 and series["avg_ms"][0] == 21.0
+        # p95 is estimated from the RTT histogram: within one bucket of 22 ms.
+        assert 22 / 2**0.5 <= series["p95_ms"][0] <= 22 * 2**0.5
+        assert history.latency("n1", now - 3 * 86400, now)["resolution"] == "hour"
+
+    def test_older_rollups_rebuilt(self, tmp_path: Path):
+        path = tmp_path / "history.bin"
+        history = HistoryStore(path)
+        history.append(Sample(60.0, "ok", {"n1": True}, {"n1": 12.0}))
+        history.close()
+        hourly = tmp_path / "history.hourly.bin"
+        hourly.write_bytes(b"RNROLL\x00\x01" + bytes(100))  # the uptime-only layout
+        reopened = HistoryStore(path)
+        assert reopened.hourly.uptime(0) == {"n1": 100.0}
+        assert reopened.latency("n1", 0, 86400, step=3600)["avg_ms"] == [12.0]
+
+    def test_node_dictionary_grows(self, tmp_path: Path):
+        path = tmp_path / "history.bin"
+        history = HistoryStore(path, max_nodes=8)
+        history.append(Sample(1.0, "ok", {"early": True}))
+        history.append(Sample(2.0, "ok", {f"n{i}": i % 2 == 0 for i in range(20)}))
+        assert history.max_nodes == 32
+        early, later = HistoryStore(path).samples()
+        assert early.up == {"early": True}
+        assert len(later.up) == 20 and later.up["n4"] is True
+
+    def test_long_names_are_found_by_their_full_name(self, tmp_path: Path):
+        name = "n" * (NAME_BYTES + 8)
+        history = HistoryStore(tmp_path / "history.bin")
+        history.append(Sample(60.0, "ok", {name: True}, {name: 12.0}, {name: 0.0}))
+        assert name in history.latency_samples and name in history.daily
+        assert history.latency(name, 0, 3600)["avg_ms"] == [12.0]
+        assert history.hourly.uptime(0) == {name[:NAME_BYTES]: 100.0}
+
+    def test_ring_files_are_abstract(self):
+        with pytest.raises(TypeError, match="abstract"):
+            _RingFile(Path("unused"), 1)  # type: ignore[abstract]
+
+    def test_jsonl_history_migrated_once(self, tmp_path: Path):
+        legacy = tmp_path / "history.jsonl"
+        legacy.write_text(
+            'not json\n{"ts": "2026-08-10T12:00:00+00:00", "overall": "ok", "up": {"n1": true}}\n'
+        )
+        history = HistoryStore.open(tmp_path / "history.bin", legacy=legacy)
+        assert [s.up for s in history.samples()] == [{"n1": True}]
+        assert not legacy.exists()
+        assert (tmp_path / "history.jsonl.migrated").exists()
+
+    def test_foreign_file_rejected(self, tmp_path: Path):
+        path = tmp_path / "history.bin"
+        path.write_bytes(b"x" * 100)
+        with pytest.raises(ValueError, match="not a history store"):
+            HistoryStore(path)
 
 
 class TestRender:
@@ -239,6 +557,7 @@ class TestRender:
             now=NOW,
         )
         status.nodes[1].uptime_24h = 99.5
+        status.nodes[1].uptime_30d = 97.3
         html = render_html(status)
         assert "All systems operational" in html
         assert "3/3" in html  # nodes online
@@ -246,6 +565,7 @@ class TestRender:
         assert "1-of-2" in html
         assert "n1" in html and "n2" in html
         assert "99.5%" in html
+        assert "97.3%" in html and "<th>30d</th>" in html
         assert "status.json" in html
 
     def test_down_state_and_note_escaping(self):
@@ -289,3 +609,302 @@ class TestRender:
         assert data["overall"] == "ok"
         assert data["grid"]["tolerable_failures"] == 1
         assert len(data["nodes"]) == 3
+
+
+class TestRenderDiff:
+    @staticmethod
+    def status(ping, nodes: list[dict] | None = None):
+        return collect_status(
+            manifest(nodes),
+            "hub",
+            ping,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+
+    def test_page_carries_its_state_tag(self):
+        status = self.status(all_up)
+        html = render_html(status)
+        assert f'<main data-state="{state_tag(live_state(status))}">' in html
+        assert '<tr data-node="n1" data-pos="1">' in html
+        assert "EventSource" in html and '<meta http-equiv="refresh"' in html  # noscript fallback
+
+    def test_rtt_changes_push_nothing(self):
+        before, diff = render_diff(None, self.status(all_up))
+        assert diff is None  # nothing to patch on the first collection
+        after, diff = render_diff(before, self.status(lambda _ip: 80.0))
+        assert diff is None and after == before
+
+    def test_node_going_down(self):
+        before, _ = render_diff(None, self.status(all_up))
+        down = self.status(lambda ip: None if ip == "10.100.0.11" else 12.5)
+        after, diff = render_diff(before, down)
+        assert diff is not None
+        assert (diff["from"], diff["to"]) == (state_tag(before), state_tag(after))
+        assert set(diff["nodes"]) == {2} and "offline" in diff["nodes"][2]  # n2's row
+        assert diff["online"] == "2/3"
+        assert "Degraded" in diff["overall"] and "notes" in diff
+
+    def test_nodes_sharing_a_name_keep_their_own_rows(self):
+        twins = [
+            {"name": "twin", "vpn_ip": "10.100.0.10", "roles": ["tinc_vpn"]},
+            {"name": "twin", "vpn_ip": "10.100.0.11", "roles": ["tinc_vpn"]},
+        ]
+        before, _ = render_diff(None, self.status(all_up, twins))
+        down = self.status(lambda ip: None if ip == "10.100.0.10" else 12.5, twins)
+        _, diff = render_diff(before, down)
+        assert diff is not None and set(diff["nodes"]) == {0}
+        assert "offline" in diff["nodes"][0]
+
+    def test_node_set_change_reloads(self):
+        before, _ = render_diff(None, self.status(all_up))
+        nodes = manifest()["nodes"][:2]
+        _, diff = render_diff(before, self.status(all_up, nodes))
+        assert diff is not None and diff["reload"] is True
+
+
+def big_network(count: int = 250):
+    """``count`` storage nodes in two regions; every third one is down."""
+    nodes = [
+        {
+            "name": f"n{i:03d}",
+            "vpn_ip": f"10.100.{i // 200}.{i % 200 + 10}",
+            "roles": ["tinc_vpn", "tahoe_storage"] if i % 2 else ["tinc_vpn"],
+            "status": "active",
+            "region": "eu" if i % 5 else "us",
+        }
+        for i in range(count)
+    ]
+    down = {n["vpn_ip"] for i, n in enumerate(nodes) if i % 3 == 0}
+    status = collect_status(
+        manifest(nodes),
+        "hub",
+        lambda ip: None if ip in down else 12.5,
+        storage_connected=2,
+        furl_present=True,
+        manifest_synced_at=NOW,
+        now=NOW,
+    )
+    return status, StatusViews(status, render_parts(status))
+
+
+class TestViews:
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("", NodeQuery()),
+            ("role=tahoe_storage&page=2", NodeQuery(role="storage", page=2)),
+            ("state=OFFLINE&region=eu&_=123", NodeQuery(state="offline", region="eu")),
+        ],
+    )
+    def test_query_parsing(self, query, expected):
+        assert NodeQuery.parse(query) == expected
+
+    @pytest.mark.parametrize("query", ["state=sleeping", "page=0", "page=two"])
+    def test_bad_queries(self, query):
+        with pytest.raises(ValueError):
+            NodeQuery.parse(query)
+
+    def test_filters_intersect(self):
+        status, views = big_network()
+        nodes = views.parts.nodes
+        query = NodeQuery(role="storage", state="offline", region="us")
+        selected = [nodes[i] for i in views.index.select(query)]
+        expected = [
+            n
+            for n in nodes
+            if "tahoe_storage" in n.roles and n.reachable is False and n.region == "us"
+        ]
+        assert selected == expected and selected
+        assert views.index.select(NodeQuery(region="mars")) == []
+        views.index.check(NodeQuery(role="storage", region="us"))
+        with pytest.raises(ValueError, match="no node has region 'mars'"):
+            views.index.check(NodeQuery(region="mars"))
+        with pytest.raises(ValueError, match="role"):
+            views.index.check(NodeQuery(role="zzzz"))
+        assert len(views.index.select(NodeQuery())) == len(status.nodes)
+
+    def test_pages(self):
+        _, views = big_network()
+        last = views.page(NodeQuery(page=3))
+        assert last is not None and (last.matching, last.pages) == (250, 3)
+        assert len(last.positions) == 250 - 2 * PAGE_SIZE and last.first == 201
+        assert views.page(NodeQuery(page=4)) is None
+        empty = views.page(NodeQuery(region="mars"))
+        assert empty is not None and (empty.positions, empty.pages) == ([], 1)
+
+    def test_html_and_json_views(self):
+        _, views = big_network()
+        query = NodeQuery(state="online", page=2)
+        page = views.page(query)
+        html = views.html(query, page)
+        assert html.count("<tr data-node=") == len(page.positions)
+        assert "state online" in html and 'href="/?state=online"' in html  # back to page 1
+
+        data = json.loads(views.json(query, page))
+        assert [n["name"] for n in data["nodes"]] == [
+            views.parts.nodes[i].name for i in page.positions
+        ]
+        assert data["view"]["filters"] == {"state": "online"}
+        assert data["view"]["matching"] == page.matching
+        assert data["overall"] and data["grid"]
+
+    def test_default_view_of_a_small_network_is_the_full_page(self):
+        status = collect_status(
+            manifest(),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        views = StatusViews(status, render_parts(status))
+        assert views.html(NodeQuery(), views.first_page()) == render_html(status)
+
+    def test_duplicate_names_keep_their_own_json(self):
+        nodes = [
+            {"name": "twin", "vpn_ip": "10.100.0.20", "roles": ["tinc_vpn"], "region": "us"},
+            {"name": "twin", "vpn_ip": "10.100.0.10", "roles": ["tinc_vpn"], "region": "eu"},
+        ]
+        status = collect_status(
+            manifest(nodes),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        views = StatusViews(status, render_parts(status))
+        data = json.loads(views.json(NodeQuery(), views.first_page()))
+        assert [(n["vpn_ip"], n["region"]) for n in data["nodes"]] == [
+            ("10.100.0.10", "eu"),
+            ("10.100.0.20", "us"),
+        ]
+
+    def test_summary(self):
+        status, _ = big_network(30)
+        summary = status.summary_dict()
+        assert summary["nodes"] == {"total": 30, "online": 20, "offline": 10, "unknown": 0}
+        assert summary["notes"] == len(status.notes)
+        assert "nodes" not in json.dumps(summary["grid"])
+
+
+class TestMetrics:
+    def test_exposition_from_status(self):
+        status = collect_status(
+            manifest(),
+            "hub",
+            all_up,
+            storage_connected=2,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        status.nodes[1].uptime_24h = 99.5
+        phases = {"render": Histogram()}
+        phases["render"].observe(0.03)
+        phases["render"].observe(0.5)
+        text = render_metrics(status, phases, 1_700_000_000.0)
+
+        assert 'redundanet_overall_status{state="ok"} 1' in text
+        assert 'redundanet_node_reachable{node="n1"} 1' in text
+        assert (
+            f'redundanet_node_uptime_ratio{{node="{status.nodes[1].name}",window="24h"}} 0.995'
+            in text
+        )
+        assert "redundanet_storage_servers_connected 2" in text
+        assert (
+            'redundanet_collection_phase_duration_seconds_bucket{phase="render",le="0.05"} 1'
+            in text
+        )
+        assert (
+            'redundanet_collection_phase_duration_seconds_bucket{phase="render",le="+Inf"} 2'
+            in text
+        )
+        assert 'redundanet_collection_phase_duration_seconds_count{phase="render"} 2' in text
+        assert "redundanet_last_collection_timestamp_seconds 1700000000" in text
+        # Every sample belongs to a family declared before it.
+        declared = set()
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                declared.add(line.split()[2])
+            elif not line.startswith("#"):
+                name = line.split("{")[0].split()[0]
+                assert (
+                    name.removesuffix("_bucket").removesuffix("_sum").removesuffix("_count")
+                    in declared
+                    or name in declared
+                )
+
+    def test_labels_escaped_and_age(self):
+        nodes = [
+            {"name": 'odd"name', "vpn_ip": "10.100.0.9", "roles": ["tinc_vpn"], "status": "active"}
+        ]
+        status = collect_status(
+            manifest(nodes),
+            'odd"name',
+            all_up,
+            storage_connected=None,
+            furl_present=True,
+            manifest_synced_at=NOW,
+            now=NOW,
+        )
+        text = render_metrics(status, {}, 0.0)
+        assert 'node="odd\\"name"' in text
+        assert "storage_servers_connected" not in text  # unknown, not zero
+        assert snapshot_age_metric(12.5).endswith("redundanet_snapshot_age_seconds 12.5\n")
+
+
+class TestEncodedBody:
+    BODY = b"<html><body>" + b"<tr><td>node</td><td>ok</td></tr>" * 200 + b"</body></html>"
+
+    def test_variants_are_encoded_once(self):
+        encoded = EncodedBody(self.BODY, "text/html")
+        assert gzip.decompress(encoded.variants["gzip"][0]) == self.BODY
+        assert encoded.body == self.BODY
+        etags = [etag for _, etag in encoded.variants.values()]
+        assert len(set(etags)) == len(etags)  # strong: one tag per coding
+        assert EncodedBody(self.BODY, "text/html").variants == encoded.variants
+
+    def test_small_bodies_stay_identity(self):
+        assert set(EncodedBody(b'{"overall": "ok"}', "application/json").variants) == {"identity"}
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("", ("identity",)),
+            ("gzip, deflate", ("gzip", "identity")),
+            ("gzip;q=0.5, br", ("br", "gzip", "identity")),
+            ("gzip;q=0, *", ("br", "zstd", "identity")),
+            ("GZIP;Q=1.0", ("gzip", "identity")),
+        ],
+    )
+    def test_preferred_codings(self, header, expected):
+        assert preferred_codings(header) == expected
+
+    def test_negotiate_falls_back_to_what_exists(self):
+        encoded = EncodedBody(self.BODY, "text/html")
+        encoded.variants.pop("br", None)
+        coding, body, _ = encoded.negotiate("br;q=1, gzip;q=0.5")
+        assert (coding, gzip.decompress(body)) == ("gzip", self.BODY)
+        assert encoded.negotiate("")[:2] == ("identity", self.BODY)
+
+    def test_not_modified(self):
+        encoded = EncodedBody(self.BODY, "text/html")
+        _, _, etag = encoded.negotiate("gzip")
+        assert encoded.not_modified(etag, "gzip")
+        assert encoded.not_modified(f'"other", W/{etag}', "gzip")
+        assert encoded.not_modified("*", "gzip")
+        assert not encoded.not_modified("", "gzip")
+        changed = EncodedBody(b"changed", "text/html").negotiate("")[2]
+        assert not encoded.not_modified(changed, "")
+
+    def test_other_codings_tags_are_not_modified_for_this_one(self):
+        encoded = EncodedBody(self.BODY, "text/html")
+        _, _, identity = encoded.negotiate("")
+        assert not encoded.not_modified(identity, "gzip")
+        assert encoded.not_modified(identity, "")
@@ -0,0 +1,179 @@
+"""Unit tests for the batched ICMP prober."""
+
+from __future__ import annotations
+
+import json
+import struct
+import subprocess
+
+import pytest
+
+from redundanet.monitor import probe as probe_module
+from redundanet.monitor.probe import ProbeResult, probe, probe_socket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeEchoSocket:
+    """Answers echo requests after a per-target delay on a fake clock.
+
+    ``delays`` maps a target to its RTT in seconds (None: never answers).
+    """
+
+    def __init__(self, clock: FakeClock, delays: dict[str, float | None]) -> None:
+        self.clock = clock
+        self.delays = delays
+        self.sent: list[tuple[str, int]] = []
+        self.queue: list[tuple[float, bytes, str]] = []  # (due, packet, source)
+        self.timeout: float | None = None
+        self.closed = False
+
+    def sendto(self, data: bytes, address: tuple[str, int]) -> int:
+        kind, code, _, _, sequence = struct.unpack_from(">BBHHH", data)
+        assert (kind, code) == (8, 0)
+        self.sent.append((address[0], sequence))
+        delay = self.delays.get(address[0])
+        if delay is not None:
+            reply = struct.pack(">BBHHH", 0, 0, 0, 4242, sequence) + data[8:]
+            self.queue.append((self.clock.now + delay, reply, address[0]))
+            self.queue.sort()
+        return len(data)
+
+    def settimeout(self, value: float | None) -> None:
+        self.timeout = value
+
+    def recvfrom(self, bufsize: int) -> tuple[bytes, tuple[str, int]]:
+        assert self.timeout is not None
+        deadline = self.clock.now + self.timeout
+        if not self.queue or self.queue[0][0] > deadline:
+            self.clock.now = deadline
+            raise TimeoutError
+        due, packet, source = self.queue.pop(0)
+        self.clock.now = max(self.clock.now, due)
+        return packet, (source, 0)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestProbeSocket:
+    def test_whole_batch_measured_from_one_socket(self):
+        clock = FakeClock()
+        sock = FakeEchoSocket(clock, {"10.0.0.1": 0.010, "10.0.0.2": 0.030, "10.0.0.3": None})
+        results = probe_socket(
+            sock, ["10.0.0.1", "10.0.0.2", "10.0.0.3"], count=3, clock=clock, sleep=clock.sleep
+        )
+
+        assert len(sock.sent) == 9
+        assert len({seq for _, seq in sock.sent}) == 9  # sequence numbers unique per batch
+        fast, slow, dead = results["10.0.0.1"], results["10.0.0.2"], results["10.0.0.3"]
+        assert fast.rtts_ms == pytest.approx([10.0, 10.0, 10.0])
+        assert slow.avg_ms == pytest.approx(30.0)
+        assert (fast.loss_pct, dead.loss_pct) == (0.0, 100.0)
+        assert not dead.reachable and dead.min_ms is None
+
+    def test_reply_after_timeout_counts_as_lost(self):
+        clock = FakeClock()
+        sock = FakeEchoSocket(clock, {"10.0.0.1": 3.0})
+        result = probe_socket(
+            sock, ["10.0.0.1"], count=1, timeout=2.0, clock=clock, sleep=clock.sleep
+        )["10.0.0.1"]
+        assert result.sent == 1
+        assert result.received == 0
+
+    def test_replies_from_the_wrong_host_are_ignored(self):
+        clock = FakeClock()
+        sock = FakeEchoSocket(clock, {"10.0.0.1": 0.01})
+        real_recvfrom = sock.recvfrom
+
+        def spoofed(bufsize: int) -> tuple[bytes, tuple[str, int]]:
+            packet, _ = real_recvfrom(bufsize)
+            return packet, ("10.9.9.9", 0)
+
+        sock.recvfrom = spoofed  # type: ignore[method-assign]
+        result = probe_socket(sock, ["10.0.0.1"], count=2, clock=clock, sleep=clock.sleep)[
+            "10.0.0.1"
+        ]
+        assert (result.sent, result.received) == (2, 0)
+
+    def test_unroutable_target_is_lost_not_fatal(self):
+        clock = FakeClock()
+        sock = FakeEchoSocket(clock, {"10.0.0.1": 0.01})
+        real_sendto = sock.sendto
+
+        def sendto(data: bytes, address: tuple[str, int]) -> int:
+            if address[0] == "10.0.0.2":
+                raise OSError("Network is unreachable")
+            return real_sendto(data, address)
+
+        sock.sendto = sendto  # type: ignore[method-assign]
+        results = probe_socket(
+            sock, ["10.0.0.1", "10.0.0.2"], count=2, clock=clock, sleep=clock.sleep
+        )
+        assert results["10.0.0.1"].received == 2
+        assert (results["10.0.0.2"].sent, results["10.0.0.2"].loss_pct) == (2, 100.0)
+
+    def test_rounds_are_spaced_by_interval(self):
+        clock = FakeClock()
+        sock = FakeEchoSocket(clock, {"10.0.0.1": 0.010})
+        send_times: list[float] = []
+        real_sendto = sock.sendto
+
+        def sendto(data: bytes, address: tuple[str, int]) -> int:
+            send_times.append(clock.now)
+            return real_sendto(data, address)
+
+        sock.sendto = sendto  # type: ignore[method-assign]
+        result = probe_socket(
+            sock, ["10.0.0.1"], count=3, interval=0.2, clock=clock, sleep=clock.sleep
+        )["10.0.0.1"]
+        assert result.received == 3
+        # Each reply arrives after 10ms; the next round still waits out the interval.
+        assert send_times == pytest.approx([100.0, 100.2, 100.4])
+        assert clock.sleeps == pytest.approx([0.19, 0.19])
+
+
+class TestFallbacks:
+    def test_fping_batch_when_sockets_are_not_allowed(self, monkeypatch):
+        def refuse():
+            raise PermissionError("ping_group_range")
+
+        calls: list[list[str]] = []
+
+        def fake_run(args, **kwargs):
+            calls.append(args)
+            stderr = "10.0.0.1 : 0.41 0.39 0.40\n10.0.0.2 : - - -\n"
+            return subprocess.CompletedProcess(args, 1, stdout="", stderr=stderr)
+
+        monkeypatch.setattr(probe_module, "open_echo_socket", refuse)
+        monkeypatch.setattr(probe_module.subprocess, "run", fake_run)
+        # A generator is read once: the unprobed "" is still reported.
+        results = probe(t for t in ["10.0.0.1", "10.0.0.2", "10.0.0.1", ""])
+
+        assert len(calls) == 1  # one process for the whole batch
+        assert calls[0][0] == "fping" and calls[0][-2:] == ["10.0.0.1", "10.0.0.2"]
+        assert results["10.0.0.1"].min_ms == pytest.approx(0.39)
+        assert results["10.0.0.2"].loss_pct == 100.0
+        assert results[""].sent == 0  # no address: not probed
+
+    def test_result_serialises_summary(self):
+        data = ProbeResult("10.0.0.1", sent=4, rtts_ms=[1.0, 3.0]).to_dict()
+        assert json.loads(json.dumps(data)) == {
+            "target": "10.0.0.1",
+            "sent": 4,
+            "rtts_ms": [1.0, 3.0],
+            "min_ms": 1.0,
+            "avg_ms": 2.0,
+            "loss_pct": 50.0,
+        }
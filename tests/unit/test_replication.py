@@ -0,0 +1,147 @@
+"""Unit tests for the replication counting engine."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+
+import pytest
+
+from redundanet.monitor import replication
+from redundanet.monitor.census import PackedIndexes, bytes_to_si, index_key
+from redundanet.monitor.replication import IndexArray, PlacementMatrix, replication_counts
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def engine(request, monkeypatch):
+    """Run each test with NumPy and with the pure-Python fallback."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(replication, "np", None)
+    return request.param
+
+
+def random_sis(count: int, seed: int = 0) -> list[str]:
+    return [
+        bytes_to_si(hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest())
+        for i in range(count)
+    ]
+
+
+def legacy_counts(nodes: list[list[str]], target: int) -> tuple[int, int]:
+    holders = Counter(si for sis in nodes for si in set(sis))
+    return len(holders), sum(1 for count in holders.values() if count >= target)
+
+
+class TestIndexArray:
+    def test_sorted_and_deduplicated(self, engine):
+        sis = random_sis(50)
+        array = IndexArray.from_values(sis + sis[:10])
+        assert len(array) == 50
+        assert list(array) == sorted(index_key(si) for si in sis)
+        assert sis[3] in array
+        assert random_sis(1, seed=99)[0] not in array
+
+    def test_packed_census_and_non_si_values(self, engine):
+        sis = random_sis(20)
+        packed = PackedIndexes(b"".join(sorted(index_key(si) for si in sis)))
+        assert list(IndexArray.from_values(packed)) == list(IndexArray.from_values(sis))
+        legacy = IndexArray.from_values(["si-a", "si-b", "si-a"])
+        assert len(legacy) == 2 and "si-b" in legacy
+
+    def test_apply_delta(self, engine):
+        sis = random_sis(30)
+        array = IndexArray.from_values(sis[:20])
+        # Removing something absent and adding something present are no-ops.
+        updated = array.apply(added=sis[15:30], removed=sis[:5] + random_sis(2, seed=7))
+        assert list(updated) == list(IndexArray.from_values(sis[5:30]))
+        assert len(array) == 20  # the original is left alone
+
+    def test_apply_to_empty(self, engine):
+        sis = random_sis(5)
+        assert list(IndexArray().apply(sis, [])) == list(IndexArray.from_values(sis))
+        assert len(IndexArray.from_values(sis).apply([], sis)) == 0
+
+
+class TestReplicationCounts:
+    def test_matches_per_object_counting(self, engine):
+        universe = random_sis(2000)
+        # Node n holds an object when bit n of its key is set: 0-5 holders each.
+        nodes = [[si for si in universe if index_key(si)[-1] >> n & 1] for n in range(5)]
+        arrays = [IndexArray.from_values(sis) for sis in nodes]
+        for target in (1, 3, 5):
+            assert replication_counts(arrays, target) == legacy_counts(nodes, target)
+
+    def test_keys_sharing_a_prefix(self, engine):
+        # Distinct keys with equal first halves must not be merged into one object.
+        keys = [bytes(8) + i.to_bytes(8, "big") for i in (3, 1, 2)]
+        arrays = [IndexArray.from_values(keys), IndexArray.from_values(keys[:1])]
+        assert replication_counts(arrays, 2) == (3, 1)
+
+    def test_no_holders(self, engine):
+        assert replication_counts([], 3) == (0, 0)
+        assert replication_counts([IndexArray(), IndexArray()], 1) == (0, 0)
+
+
+class TestPlacementMatrix:
+    @pytest.fixture
+    def placement(self) -> dict[str, list[str]]:
+        """Objects on 1-5 of 7 servers, chosen by bits of their key."""
+        servers = [f"s{i}" for i in range(7)]
+        held: dict[str, list[str]] = {name: [] for name in servers}
+        for si in random_sis(1500):
+            key = index_key(si)
+            for i in range(1 + key[0] % 5):
+                held[servers[(key[1] + i * (1 + key[2] % 6)) % 7]].append(si)
+        return held
+
+    @staticmethod
+    def brute_lost(held: dict[str, list[str]], needed: int, failed: list[str]) -> int:
+        holders = Counter(si for sis in held.values() for si in set(sis))
+        left = Counter(si for name, sis in held.items() if name not in failed for si in set(sis))
+        return sum(1 for si, count in holders.items() if count >= needed > left[si])
+
+    def test_losses_match_brute_force(self, engine, placement):
+        matrix = PlacementMatrix(
+            {name: IndexArray.from_values(sis) for name, sis in placement.items()}, 2
+        )
+        singles = matrix.single_losses()
+        assert singles == {name: self.brute_lost(placement, 2, [name]) for name in placement}
+        pairs = matrix.pair_losses()
+        assert len(pairs) == 21
+        assert [lost for *_, lost in pairs] == sorted((lost for *_, lost in pairs), reverse=True)
+        for a, b, lost in pairs:
+            assert lost == self.brute_lost(placement, 2, [a, b])
+        for failed in (["s0", "s3", "s5"], list(placement)):
+            assert matrix.lost(failed) == self.brute_lost(placement, 2, failed)
+
+    def test_counts_at_risk_and_unreadable(self, engine):
+        sis = random_sis(4)
+        matrix = PlacementMatrix(
+            {
+                "a": IndexArray.from_values(sis[:3]),
+                "b": IndexArray.from_values(sis[1:3]),
+                "c": IndexArray.from_values(sis[2:]),
+            },
+            shares_needed=2,
+        )
+        # sis[0] and sis[3] are on one server; sis[1] on two; sis[2] on three.
+        assert (matrix.objects, matrix.unreadable, matrix.at_risk) == (4, 2, 1)
+        assert matrix.single_losses() == {"a": 1, "b": 1, "c": 0}
+        assert matrix.lost(["a", "unknown"]) == 1
+        assert matrix.lost(["a", "b"]) == 2
+
+    def test_empty(self, engine):
+        matrix = PlacementMatrix({"a": IndexArray()}, 1)
+        assert (matrix.objects, matrix.at_risk) == (0, 0)
+        assert matrix.single_losses() == {"a": 0}
+        assert matrix.lost(["a"]) == 0
+
+    def test_nothing_readable(self, engine):
+        sis = random_sis(3)
+        held = {"a": IndexArray.from_values(sis[:2]), "b": IndexArray.from_values(sis[2:])}
+        matrix = PlacementMatrix(held, shares_needed=3)
+        assert (matrix.objects, matrix.unreadable, matrix.at_risk) == (3, 3, 0)
+        assert matrix.single_losses() == {"a": 0, "b": 0}
+        assert matrix.pair_losses() == [("a", "b", 0)]
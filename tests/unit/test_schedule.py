@@ -0,0 +1,202 @@
+"""Unit tests for adaptive per-node probe scheduling."""
+
+from __future__ import annotations
+
+import itertools
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from redundanet.monitor.census import census_sketch
+from redundanet.monitor.history import HistoryStore
+from redundanet.monitor.schedule import ProbeScheduler
+from redundanet.monitor.status import (
+    CensusCache,
+    NodeStatus,
+    append_sample,
+    collect_status,
+    uptime_stats,
+)
+
+START = datetime(2026, 8, 10, 12, 0, 0, tzinfo=UTC)
+
+
+def node(name: str, status: str = "active", storage: bool = False) -> NodeStatus:
+    roles = ["tinc_vpn", "tahoe_storage"] if storage else ["tinc_vpn"]
+    return NodeStatus(name=name, vpn_ip="", roles=roles, manifest_status=status)
+
+
+def probe_times(scheduler: ProbeScheduler, target: NodeStatus, up, seconds: float) -> list[float]:
+    """Run the scheduler tick by tick; ``up(t)`` is the node's state at time t."""
+    probed = []
+    t = 0.0
+    while t < seconds:
+        if target.name in scheduler.plan([target], t).probe:
+            probed.append(t)
+            target.reachable = up(t)
+            scheduler.record(target, t)
+        t += scheduler.tick
+    return probed
+
+
+class TestProbeScheduler:
+    def test_healthy_nodes_every_interval(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        assert probe_times(scheduler, node("n1"), lambda _t: True, 300) == [0, 60, 120, 180, 240]
+
+    def test_unreachable_nodes_back_off(self):
+        scheduler = ProbeScheduler(base_interval=60, max_backoff=480)
+        times = probe_times(scheduler, node("n1"), lambda _t: False, 3600)
+        gaps = [b - a for a, b in itertools.pairwise(times)]
+        assert gaps[:5] == [60, 120, 240, 480, 480]
+
+    def test_recovery_resets_the_backoff(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        times = probe_times(scheduler, node("n1"), lambda t: t >= 400, 900)
+        assert times[:5] == [0, 60, 180, 420, 480]  # down, down (x2), down (x4), up, up
+
+    def test_inactive_nodes_rarely(self):
+        scheduler = ProbeScheduler(base_interval=60, max_backoff=600)
+        assert probe_times(scheduler, node("n1", "inactive"), lambda _t: True, 1800) == [
+            0,
+            600,
+            1200,
+        ]
+
+    def test_flapping_nodes_every_tick(self):
+        scheduler = ProbeScheduler(base_interval=60, flap_transitions=3)
+        target = node("n1")
+        times = probe_times(scheduler, target, lambda t: t // 60 % 2 == 0, 600)
+        assert scheduler.flapping("n1")
+        assert times[-4:] == [540, 555, 570, 585]
+
+    def test_census_fetches_are_staggered(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        nodes = [node(f"s{i}", storage=True) for i in range(40)]
+        fetched: Counter[float] = Counter()
+        t = 0.0
+        while t < 600:
+            plan = scheduler.plan(nodes, t)
+            for name in plan.census:
+                fetched[t] += 1
+                scheduler.census_fetched(name, t)
+            assert plan.census | plan.census_held == {n.name for n in nodes}
+            t += scheduler.tick
+        assert fetched[0] == 40  # everything at the first run
+        later = [fetched[t] for t in sorted(fetched) if t >= 120]
+        assert sum(later) == 40 * 8  # then once per node per interval...
+        assert max(later) < 20  # ...spread across the interval
+
+    def test_backed_off_storage_nodes_are_not_fetched(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        target = node("s1", storage=True)
+        for t in (0.0, 60.0):
+            scheduler.plan([target], t)
+            target.reachable = False
+            scheduler.record(target, t)
+        plan = scheduler.plan([target], 75.0)
+        assert not plan.census and not plan.census_held
+
+    def test_due_matches_the_plan(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        nodes = [node("n1"), node("s1", storage=True), node("s2", storage=True)]
+        t = 0.0
+        while t < 600:
+            plan = scheduler.plan(nodes, t)
+            assert scheduler.due(t) == bool(plan.probe or plan.census)
+            for target in nodes:
+                if target.name in plan.probe:
+                    target.reachable = target.name != "s2"  # s2 backs off
+                    scheduler.record(target, t)
+            for name in plan.census:
+                scheduler.census_fetched(name, t)
+            t += scheduler.tick
+        assert not ProbeScheduler().due(0.0)  # nothing planned yet
+
+
+def manifest() -> dict:
+    return {
+        "network": {"tahoe": {"shares_needed": 1, "shares_happy": 1, "shares_total": 2}},
+        "nodes": [
+            {"name": "hub", "vpn_ip": "10.100.0.1", "roles": ["tahoe_introducer"]},
+            {"name": "up", "vpn_ip": "10.100.0.10", "roles": ["tahoe_storage"]},
+            {"name": "dies", "vpn_ip": "10.100.0.11", "roles": ["tahoe_storage"]},
+        ],
+    }
+
+
+class TestScheduledCollection:
+    def test_uptime_stays_exact_under_backoff(self, tmp_path: Path):
+        """'dies' goes down at minute 20: probed ever less often, yet its
+        uptime over the hour is 20/60 and every run still has a verdict."""
+        scheduler = ProbeScheduler(base_interval=60)
+        cache = CensusCache()
+        history = HistoryStore(tmp_path / "history.bin")
+        pings: list[str] = []
+        fetches: list[str] = []
+
+        for minute in range(60):
+            now = START + timedelta(minutes=minute)
+
+            def ping(ip: str, minute: int = minute) -> float | None:
+                pings.append(ip)
+                return None if ip == "10.100.0.11" and minute >= 20 else 5.0
+
+            def fetch(ip: str, since: int | None = None, minute: int = minute) -> dict | None:
+                fetches.append(ip)
+                if ip == "10.100.0.11" and minute >= 20:
+                    return None
+                return {"object_count": 1, "storage_indexes": ["si1"], "generation": 1}
+
+            status = collect_status(
+                manifest(),
+                "hub",
+                ping,
+                storage_connected=2,
+                furl_present=True,
+                manifest_synced_at=now,
+                now=now,
+                fetch_census=fetch,
+                census_cache=cache,
+                scheduler=scheduler,
+                workers=1,
+            )
+            assert all(n.reachable is not None for n in status.nodes)
+            append_sample(history, status)
+
+        stats = uptime_stats(history, timedelta(hours=1), now=START + timedelta(minutes=60))
+        assert stats == {"hub": 100.0, "up": 100.0, "dies": 33.3}
+        assert pings.count("10.100.0.10") == 60
+        assert pings.count("10.100.0.11") < 30
+        assert fetches.count("10.100.0.11") < 30
+        dies = status.nodes[2]
+        assert dies.reachable is False and dies.probe_interval_s == 1800
+
+    def test_sketches_are_fetched_on_schedule_and_held_between(self):
+        scheduler = ProbeScheduler(base_interval=60)
+        cache = CensusCache()
+        sketch = {"object_count": 1, "sketch": census_sketch(["si1"], 1)}
+        fetches: list[str] = []
+
+        def fetch_sketch(ip: str) -> dict:
+            fetches.append(ip)
+            return sketch
+
+        runs = int(600 / scheduler.tick)  # ten intervals, one run per tick
+        for run in range(runs):
+            now = START + timedelta(seconds=run * scheduler.tick)
+            status = collect_status(
+                manifest(),
+                "hub",
+                lambda _ip: 5.0,
+                storage_connected=2,
+                furl_present=True,
+                manifest_synced_at=now,
+                now=now,
+                census_cache=cache,
+                fetch_sketch=fetch_sketch,
+                scheduler=scheduler,
+                workers=1,
+            )
+            assert status.replication is not None and status.replication.complete
+        assert Counter(fetches) == {"10.100.0.10": 10, "10.100.0.11": 10}
@@ -0,0 +1,150 @@
+"""Unit tests for the compiled schema validator."""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+from typing import Any
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from jsonschema import Draft7Validator
+
+from redundanet.core.exceptions import ValidationError
+from redundanet.core.manifest import MANIFEST_SCHEMA, MANIFEST_VALIDATOR, Manifest
+from redundanet.core.schema import SchemaValidator, compile_schema
+
+VALID = {
+    "network": {
+        "name": "test-network",
+        "version": "1.0.0",
+        "domain": "test.local",
+        "vpn_network": "10.100.0.0/16",
+        "tahoe": {"shares_needed": 1, "shares_happy": 1, "shares_total": 1},
+    },
+    "introducer_furl": None,
+    "nodes": [
+        {
+            "name": f"node{i}",
+            "internal_ip": f"10.100.0.{i}",
+            "status": "active",
+            "roles": ["tinc_vpn", "tahoe_storage"],
+            "ports": {"tinc": 655},
+            "is_publicly_accessible": False,
+        }
+        for i in range(1, 4)
+    ],
+}
+
+# Values of every JSON type, including the ones Draft 7 treats specially
+# (booleans are not integers; 1.0 is an integer).
+scalars = st.one_of(
+    st.none(),
+    st.booleans(),
+    st.integers(-2, 2),
+    st.sampled_from([0.5, 1.0, -1.0]),
+    st.sampled_from(["", "active", "paused", "tinc_vpn", "10.0.0.0/8", "10.0.0.0", "x"]),
+    st.text(alphabet="n", min_size=63, max_size=66),  # about the name length limit
+)
+values = st.recursive(
+    scalars,
+    lambda children: st.one_of(
+        st.lists(children, max_size=3),
+        st.dictionaries(st.sampled_from(["name", "ports", "tinc", "roles"]), children, max_size=3),
+    ),
+    max_leaves=6,
+)
+keys = ["network", "nodes", 0, 1, "name", "tahoe", "shares_needed", "vpn_network", "status"]
+keys += ["roles", "ports", "tinc", "introducer_furl", "is_publicly_accessible"]
+paths = st.lists(st.sampled_from(keys), max_size=4)
+
+
+def mutate(document: Any, path: list[Any], value: Any) -> Any:
+    """``document`` with the value at ``path`` replaced, where the path exists."""
+    document = copy.deepcopy(document)
+    if not path:
+        return value
+    parent = document
+    for key in path[:-1]:
+        try:
+            parent = parent[key]
+        except (KeyError, IndexError, TypeError):
+            return document
+    with contextlib.suppress(IndexError, TypeError):
+        parent[path[-1]] = value
+    return document
+
+
+class TestCompiledSchema:
+    def test_manifest_schema_compiles(self):
+        assert MANIFEST_VALIDATOR.compiled
+
+    @settings(max_examples=300)
+    @given(paths, values)
+    def test_agrees_with_draft7(self, path: list[Any], value: Any):
+        document = mutate(VALID, path, value)
+        assert MANIFEST_VALIDATOR.is_valid(document) == Draft7Validator(MANIFEST_SCHEMA).is_valid(
+            document
+        )
+
+    def test_unknown_keywords_use_jsonschema(self):
+        schema = {"type": "object", "additionalProperties": False}
+        assert compile_schema(schema) is None
+        validator = SchemaValidator(schema)
+        assert not validator.compiled
+        assert validator.is_valid({})
+        assert validator.errors({"a": 1})
+
+    def test_invalid_schema_is_refused(self):
+        with pytest.raises(Exception, match="is not valid"):
+            SchemaValidator({"type": "nonsense"})
+
+
+class TestErrorReporting:
+    def test_valid_has_no_errors(self):
+        assert MANIFEST_VALIDATOR.errors(VALID) == []
+
+    def test_every_error_is_reported_with_its_path(self):
+        document = copy.deepcopy(VALID)
+        del document["network"]["domain"]
+        document["nodes"][0]["status"] = "paused"
+        document["nodes"][2]["ports"]["tinc"] = "655"
+        errors = MANIFEST_VALIDATOR.errors(document)
+        assert errors == [
+            "network: 'domain' is a required property",
+            "nodes[0].status: 'paused' is not one of ['active', 'pending', 'inactive']",
+            "nodes[2].ports.tinc: '655' is not of type 'integer'",
+        ]
+
+    def test_root_errors_have_no_path(self):
+        assert MANIFEST_VALIDATOR.errors([]) == ["[] is not of type 'object'"]
+
+    def test_manifest_from_dict_reports_all_errors(self):
+        document = copy.deepcopy(VALID)
+        document["nodes"][0]["roles"] = ["warp_drive"]
+        document["nodes"][1]["is_publicly_accessible"] = "yes"
+        with pytest.raises(ValidationError) as excinfo:
+            Manifest.from_dict(document)
+        assert len(excinfo.value.errors) == 2
+
+    def test_over_long_node_names_are_refused(self):
+        document = copy.deepcopy(VALID)
+        document["nodes"][1]["name"] = "n" * 65
+        assert MANIFEST_VALIDATOR.errors(document) == [f"nodes[1].name: '{'n' * 65}' is too long"]
+        with pytest.raises(ValidationError):
+            Manifest.from_dict(document)
+
+    def test_large_valid_manifest(self):
+        document = copy.deepcopy(VALID)
+        document["nodes"] = [
+            {
+                **document["nodes"][0],
+                "name": f"node{i}",
+                "internal_ip": f"10.{i // 256}.{i % 256}.1",
+            }
+            for i in range(10_000)
+        ]
+        assert MANIFEST_VALIDATOR.is_valid(document)
+        document["nodes"][9_999]["status"] = "paused"
+        assert not MANIFEST_VALIDATOR.is_valid(document)
@@ -0,0 +1,95 @@
+"""Unit tests for the census HTTP exchange between storage nodes and the hub.
+
+Runs the storage node's census server (docker/entrypoints/share_census.py) on
+loopback and fetches from it with the hub's client (status_server.py).
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from redundanet.monitor.census import CensusIndex, CensusSnapshot, bytes_to_si
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT / "docker" / "entrypoints"))
+
+import share_census  # noqa: E402
+import status_server  # noqa: E402
+
+SI_A = bytes_to_si(b"\x01" * 16)
+SI_B = bytes_to_si(b"\x02" * 16)
+
+
+def add_share(shares: Path, si: str) -> None:
+    (shares / si[:2] / si).mkdir(parents=True)
+    (shares / si[:2] / si / "0").write_bytes(b"x" * 100)
+
+
+@pytest.fixture
+def census_server(tmp_path: Path, monkeypatch) -> Iterator[tuple[CensusSnapshot, Path]]:
+    shares = tmp_path / "shares"
+    add_share(shares, SI_A)
+    snapshot = CensusSnapshot("n1", CensusIndex(shares))
+    snapshot.refresh()
+    monkeypatch.setattr(share_census.Handler, "snapshot", snapshot)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), share_census.Handler)
+    monkeypatch.setattr(status_server, "CENSUS_PORT", server.server_address[1])
+    monkeypatch.setattr(status_server, "_CENSUS_VALIDATORS", {})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield snapshot, shares
+    server.shutdown()
+    server.server_close()
+
+
+def test_full_census_is_binary_and_compressed(census_server):
+    payload = status_server.fetch_census("127.0.0.1")
+    assert payload["node"] == "n1"
+    assert payload["storage_indexes"].strings() == [SI_A]
+    assert payload["object_count"] == 1
+
+
+def test_unchanged_node_answers_304_as_empty_delta(census_server, monkeypatch):
+    snapshot, _ = census_server
+    first = status_server.fetch_census("127.0.0.1")
+    # The full census's tag does not stand in for a delta: that is a 200.
+    delta = status_server.fetch_census("127.0.0.1", since=first["generation"])
+    assert len(delta["added"]) == len(delta["removed"]) == 0
+
+    calls: list[object] = []
+    real_response = snapshot.response
+    monkeypatch.setattr(
+        snapshot, "response", lambda *a, **kw: calls.append(a) or real_response(*a, **kw)
+    )
+
+    again = status_server.fetch_census("127.0.0.1", since=first["generation"])
+    assert calls == []  # answered from the validator, nothing encoded
+    assert again["since"] == again["generation"] == first["generation"]
+    assert (again["added"], again["removed"]) == ([], [])
+    assert again["object_count"] == 1
+
+
+def test_changed_node_sends_delta(census_server):
+    snapshot, shares = census_server
+    first = status_server.fetch_census("127.0.0.1")
+    add_share(shares, SI_B)
+    snapshot.refresh()
+
+    delta = status_server.fetch_census("127.0.0.1", since=first["generation"])
+    assert delta["since"] == first["generation"]
+    assert delta["added"].strings() == [SI_B]
+    assert len(delta["removed"]) == 0
+    assert delta["object_count"] == 2
+
+
+def test_unknown_path_is_404(census_server):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        urllib.request.urlopen(f"http://127.0.0.1:{status_server.CENSUS_PORT}/other", timeout=5)
+    assert excinfo.value.code == 404
@@ -0,0 +1,338 @@
+"""Unit tests for the hub's status server (docker/entrypoints/status_server.py)."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from redundanet.monitor.events import EventBroadcaster
+from redundanet.monitor.history import HistoryStore, Sample
+from redundanet.monitor.httpd import HTTPServer
+from redundanet.monitor.probe import ProbeResult
+from redundanet.monitor.schedule import ProbeScheduler
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(REPO_ROOT / "docker" / "entrypoints"))
+
+import status_server  # noqa: E402
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch) -> HistoryStore:
+    store = HistoryStore(tmp_path / "history.bin")
+    monkeypatch.setattr(status_server, "history_store", lambda: store)
+    for minute in range(60):
+        store.append(Sample(1_800_000_000 + 60.0 * minute, "ok", {"n1": True}, {"n1": 15.0}))
+    return store
+
+
+class TestHistorySeries:
+    def test_series_for_a_node(self, history):
+        code, body = status_server.history_series(
+            "node=n1&from=1800000000&to=2027-01-15T09:00:00Z&step=600"
+        )
+        assert code == 200
+        assert (body["node"], body["step"], body["resolution"]) == ("n1", 600, "sample")
+        assert body["samples"] == [10] * 6
+        assert body["avg_ms"] == [15.0] * 6
+
+    def test_defaults_to_the_last_day(self, history, monkeypatch):
+        monkeypatch.setattr(status_server.time, "time", lambda: 1_800_000_000 + 3600.0)
+        code, body = status_server.history_series("node=n1")
+        assert code == 200
+        assert body["from"] == 1_800_000_000 + 3600 - 86400
+        assert sum(body["samples"]) == 60
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("", 400),
+            ("node=n1&from=yesterday", 400),
+            ("node=n1&from=10&to=5", 400),
+            ("node=n1&step=0", 400),
+            ("node=ghost", 404),
+        ],
+    )
+    def test_bad_queries(self, history, query, expected):
+        code, body = status_server.history_series(query)
+        assert code == expected
+        assert "error" in body
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch) -> Path:
+    """A hub whose manifest, introducer, probes and history are all local."""
+    manifest_dir = tmp_path / "manifest"
+    manifest_dir.mkdir()
+    nodes = [
+        {"name": "hub", "vpn_ip": "10.100.0.1", "roles": ["tahoe_introducer"]},
+        {"name": "n1", "vpn_ip": "10.100.0.10", "roles": ["tahoe_storage"], "status": "active"},
+    ]
+    (manifest_dir / "manifest.yaml").write_text(yaml.safe_dump({"nodes": nodes}))
+    furl = tmp_path / "introducer.furl"
+    furl.write_text("pb://x@y/z")
+    store = HistoryStore(tmp_path / "history.bin")
+    monkeypatch.setattr(status_server, "MANIFEST_DIR", manifest_dir)
+    monkeypatch.setattr(status_server, "FURL_PATH", furl)
+    monkeypatch.setattr(status_server, "history_store", lambda: store)
+    monkeypatch.setattr(status_server, "storage_server_count", lambda: 1)
+    monkeypatch.setattr(
+        status_server,
+        "probe",
+        lambda targets: {t: ProbeResult(t, sent=3, rtts_ms=[4.0, 5.0, 6.0]) for t in targets},
+    )
+    monkeypatch.setattr(
+        status_server,
+        "fetch_census",
+        lambda _ip, _since=None: {"object_count": 1, "storage_indexes": ["si1"]},
+    )
+    monkeypatch.setattr(status_server, "SNAPSHOT", status_server.Snapshot())
+    monkeypatch.setattr(status_server, "SCHEDULER", ProbeScheduler())
+    monkeypatch.setattr(status_server, "EVENTS", EventBroadcaster())
+    monkeypatch.setattr(status_server, "LIVE_STATE", None)
+    monkeypatch.setattr(status_server, "BUILT", None)
+    monkeypatch.setattr(status_server, "HISTORY_STATS", None)
+    return tmp_path
+
+
+class TestCollectOnce:
+    def test_collector_section_and_metrics(self, hub):
+        status_server.collect_once("hub")
+        html, json_body, _ = status_server.SNAPSHOT.get()
+        collector = json.loads(json_body)["collector"]
+        assert {"manifest", "introducer", "census", "probe", "history"} <= set(collector["phases"])
+        assert "census" in collector["nodes"]["n1"]
+        assert collector["interval"] == status_server.INTERVAL
+        assert collector["overran"] is False
+        assert "longer than its" not in html
+
+        metrics, _ = status_server.SNAPSHOT.get_metrics()
+        assert b'collection_phase_duration_seconds_count{phase="render_html"}' in metrics
+
+    def test_history_sampled_once_per_interval(self, hub):
+        store = status_server.history_store()
+        for _ in range(3):  # runs come every tick, faster than INTERVAL
+            status_server.collect_once("hub")
+        assert len(store) == 1
+
+    def test_nothing_due_carries_the_snapshot_forward(self, hub, monkeypatch):
+        status_server.collect_once("hub", carry_forward=True)
+        view = status_server.SNAPSHOT._view
+        queried = []
+        monkeypatch.setattr(status_server, "storage_server_count", lambda: queried.append(1))
+        status_server.collect_once("hub", carry_forward=True)
+        assert status_server.SNAPSHOT._view is view
+        assert queried == []
+
+    def test_unchanged_results_carry_the_snapshot_forward(self, hub, monkeypatch):
+        status_server.collect_once("hub", carry_forward=True)
+        view = status_server.SNAPSHOT._view
+        monkeypatch.setattr(status_server.SCHEDULER, "due", lambda _now: True)
+        status_server.collect_once("hub", carry_forward=True)
+        assert status_server.SNAPSHOT._view is view
+
+        monkeypatch.setattr(status_server, "storage_server_count", lambda: 0)
+        status_server.collect_once("hub", carry_forward=True)
+        assert status_server.SNAPSHOT._view is not view
+
+    def test_history_is_sampled_an_interval_after_the_last_sample(self, hub, monkeypatch):
+        clock = [time.time()]
+        fake = SimpleNamespace(time=lambda: clock[0], perf_counter=time.perf_counter)
+        monkeypatch.setattr(status_server, "time", fake)
+        monkeypatch.setattr(status_server.SCHEDULER, "due", lambda _now: True)
+        store = status_server.history_store()
+        status_server.collect_once("hub", carry_forward=True)
+
+        clock[0] += status_server.INTERVAL / 2  # a change rebuilds, but takes no sample
+        monkeypatch.setattr(status_server, "storage_server_count", lambda: 0)
+        status_server.collect_once("hub", carry_forward=True)
+        assert len(store) == 1
+
+        clock[0] += status_server.INTERVAL / 2  # nothing changed, yet a sample is due
+        view = status_server.SNAPSHOT._view
+        status_server.collect_once("hub", carry_forward=True)
+        assert len(store) == 2
+        assert status_server.SNAPSHOT._view is not view
+
+    def test_overrun_is_noted_on_the_page(self, hub, monkeypatch):
+        monkeypatch.setattr(status_server, "INTERVAL", 0)
+        status_server.collect_once("hub")
+        html, json_body, _ = status_server.SNAPSHOT.get()
+        assert json.loads(json_body)["collector"]["overran"] is True
+        assert "longer than its 0s interval (slowest: " in html
+
+
+@pytest.fixture
+def server(hub):
+    """The status server on an ephemeral port, after one collection."""
+    status_server.collect_once("hub")
+    loop = asyncio.new_event_loop()
+    httpd = loop.run_until_complete(HTTPServer(status_server.route).start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.sockets[0].getsockname()[1]}"
+
+    async def stop() -> None:  # open event streams included
+        httpd.close()
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def get(url: str, **headers: str) -> tuple[int, dict[str, str], bytes]:
+    request = urllib.request.Request(url, headers=headers)  # noqa: S310
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+class TestEncodedResponses:
+    def test_page_in_the_accepted_coding(self, server):
+        code, headers, body = get(server + "/", **{"Accept-Encoding": "gzip"})
+        assert code == 200
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Vary"] == "Accept-Encoding"
+        html, _, _ = status_server.SNAPSHOT.get()
+        assert gzip.decompress(body) == html.encode()
+
+        code, headers, body = get(server + "/status.json")
+        assert "Content-Encoding" not in headers
+        assert json.loads(body)["overall"]
+
+    def test_if_none_match_gets_304(self, server):
+        _, headers, _ = get(server + "/status.json", **{"Accept-Encoding": "gzip"})
+        code, again, body = get(
+            server + "/status.json", **{"Accept-Encoding": "gzip", "If-None-Match": headers["ETag"]}
+        )
+        assert (code, body) == (304, b"")
+        assert again["ETag"] == headers["ETag"]
+        # The gzip tag does not stand in for the identity body.
+        code, _, _ = get(server + "/status.json", **{"If-None-Match": headers["ETag"]})
+        assert code == 200
+
+        status_server.collect_once("hub")  # a new snapshot, a new tag
+        code, _, _ = get(server + "/status.json", **{"If-None-Match": headers["ETag"]})
+        assert code == 200
+
+    def test_stale_page_is_marked(self, server, monkeypatch):
+        _, fresh, _ = get(server + "/")
+        monkeypatch.setattr(status_server, "STALE_AFTER", -1)
+        _, headers, body = get(server + "/")
+        assert b"<!-- stale since " in body
+        assert headers["ETag"] != fresh["ETag"]
+        assert status_server.SNAPSHOT.get_page() is status_server.SNAPSHOT.get_page()
+
+
+class TestRoutes:
+    def test_healthz_metrics_and_unknown_paths(self, server):
+        assert get(server + "/healthz")[::2] == (200, b"ok\n")
+        code, _, body = get(server + "/metrics")
+        assert code == 200 and b"redundanet_snapshot_age_seconds" in body
+        assert get(server + "/nowhere")[0] == 404
+
+    def test_history_with_a_query(self, server):
+        code, _, body = get(server + "/history.json?node=n1")
+        assert code == 200
+        assert json.loads(body)["node"] == "n1"
+        assert get(server + "/history.json")[0] == 400
+
+
+def read_event(response) -> tuple[str, str]:
+    """The next non-comment event on an open event stream: ``(event, data)``."""
+    fields: dict[str, str] = {}
+    while True:
+        line = response.readline().decode().rstrip("\n")
+        if not line:
+            if "event" in fields:
+                return fields["event"], fields.get("data", "")
+            continue
+        if not line.startswith(":"):
+            name, _, value = line.partition(": ")
+            fields[name] = value
+
+
+class TestEvents:
+    def test_hello_then_a_diff_when_a_node_goes_down(self, server, monkeypatch):
+        request = urllib.request.Request(server + "/events")  # noqa: S310
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            assert response.headers["Content-Type"] == "text/event-stream"
+            assert read_event(response) == ("hello", status_server.SNAPSHOT.get_state_tag())
+
+            monkeypatch.setattr(
+                status_server,
+                "probe",
+                lambda targets: {t: ProbeResult(t, sent=3, rtts_ms=[]) for t in targets},
+            )
+            monkeypatch.setattr(status_server, "SCHEDULER", ProbeScheduler())  # all due again
+            status_server.collect_once("hub")
+            event, data = read_event(response)
+
+        diff = json.loads(data)
+        assert event == "diff"
+        assert diff["to"] == status_server.SNAPSHOT.get_state_tag()
+        assert "offline" in diff["nodes"]["1"]  # n1's row, after the hub's
+
+    def test_quiet_collection_sends_its_time(self, server):
+        request = urllib.request.Request(server + "/events")  # noqa: S310
+        with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+            read_event(response)  # hello
+            status_server.collect_once("hub")
+            event, data = read_event(response)
+        assert event == "updated"
+        assert data == json.loads(status_server.SNAPSHOT.get()[1])["generated_at"]
+
+    def test_stream_cap(self, server, monkeypatch):
+        monkeypatch.setattr(status_server, "MAX_EVENT_STREAMS", 0)
+        code, headers, _ = get(server + "/events")
+        assert code == 503 and headers["Retry-After"] == "30"
+
+
+class TestFilteredViews:
+    def test_filtered_page_and_json(self, server):
+        code, _, body = get(server + "/?role=storage")
+        assert code == 200
+        assert b'data-node="n1"' in body and b'data-node="hub"' not in body
+        code, _, body = get(server + "/status.json?state=online&role=introducer")
+        assert [n["name"] for n in json.loads(body)["nodes"]] == ["hub"]
+
+    def test_summary_variant(self, server):
+        code, headers, body = get(server + "/status.json?summary=1")
+        assert code == 200 and "ETag" in headers
+        summary = json.loads(body)
+        assert summary["nodes"]["total"] == 2 and "per_server" not in json.dumps(summary)
+
+    def test_bad_filters_and_pages(self, server):
+        assert get(server + "/?state=sleeping")[0] == 400
+        assert get(server + "/status.json?page=9")[0] == 404
+
+    def test_unknown_roles_and_regions_are_refused_uncached(self, server):
+        code, _, body = get(server + "/?region=nowhere")
+        assert code == 400 and b"no node has region 'nowhere'" in body
+        assert get(server + "/status.json?role=zzzz")[0] == 400
+        assert status_server.SNAPSHOT._view.cache == {}
+
+    def test_views_are_cached_per_snapshot(self, server):
+        query = status_server.NodeQuery(role="storage")
+        first = status_server.SNAPSHOT.get_page(query)
+        assert status_server.SNAPSHOT.get_page(query) is first
+        status_server.collect_once("hub")
+        assert status_server.SNAPSHOT.get_page(query) is not first
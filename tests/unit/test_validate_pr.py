@@ -117,6 +117,14 @@ class TestErrors:
         assert any("invalid role" in e for e in errors)
         assert any("invalid status" in e for e in errors)
 
+    def test_schema_type_errors_are_reported_once(self, tmp_path: Path):
+        manifest = valid_manifest()
+        manifest["nodes"][0]["ports"] = {"tinc": "655"}
+        manifest["nodes"][0]["status"] = "sleeping"
+        errors, _ = validate_pr.validate(write_manifest(tmp_path, manifest))
+        assert "Schema: nodes[0].ports.tinc: '655' is not of type 'integer'" in errors
+        assert len([e for e in errors if "sleeping" in e]) == 1
+
 
 class TestKeyIdPredicate:
     @given(st.text(max_size=60))
@@ -0,0 +1,69 @@
+"""Unit tests for the YAML I/O helpers."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from redundanet.utils import yaml_io
+from redundanet.utils.files import read_yaml, write_yaml
+
+DOCUMENT = {
+    "network": {"name": "test-network", "version": "1.0.0", "vpn_network": "10.100.0.0/16"},
+    "introducer_furl": "pb://abc@tcp:10.100.0.1:3458/introducer",
+    "nodes": [
+        {
+            "name": f"node{i}",
+            "vpn_ip": f"10.100.0.{i}",
+            "roles": ["tinc_vpn", "tahoe_storage"],
+            "storage_contribution": "100GB",
+            "is_publicly_accessible": i % 2 == 0,
+            "public_ip": None,
+            "notes": "Zürich rack, 'top' shelf: \"b\"\n",
+            "ports": {"tinc": 655},
+        }
+        for i in range(1, 20)
+    ],
+}
+
+needs_libyaml = pytest.mark.skipif(not yaml_io.LIBYAML, reason="PyYAML built without libyaml")
+
+
+class TestYamlIO:
+    def test_round_trip(self, tmp_path: Path):
+        path = tmp_path / "doc.yaml"
+        yaml_io.dump_file(path, DOCUMENT)
+        assert yaml_io.load_file(path) == DOCUMENT
+
+    def test_empty_document_is_none(self):
+        assert yaml_io.load("") is None
+
+    def test_keys_keep_insertion_order_in_block_style(self):
+        text = yaml_io.dump({"b": 1, "a": [1, 2]})
+        assert text == "b: 1\na:\n- 1\n- 2\n"
+
+    def test_errors_are_yaml_errors(self):
+        with pytest.raises(yaml_io.YAMLError):
+            yaml_io.load("a: [1, 2")
+
+    def test_unsafe_tags_are_refused(self):
+        with pytest.raises(yaml_io.YAMLError):
+            yaml_io.load("!!python/object/apply:os.system ['true']")
+
+    @needs_libyaml
+    def test_libyaml_dump_is_byte_identical_to_pure_python(self):
+        pure = yaml.dump(
+            DOCUMENT, Dumper=yaml.SafeDumper, default_flow_style=False, sort_keys=False
+        )
+        assert yaml_io.dump(DOCUMENT) == pure
+
+    @needs_libyaml
+    def test_libyaml_load_matches_pure_python(self):
+        text = yaml_io.dump(DOCUMENT)
+        assert yaml_io.load(text) == yaml.safe_load(text)
+
+    def test_files_helpers_use_the_same_format(self, tmp_path: Path):
+        path = tmp_path / "nested" / "doc.yaml"
+        write_yaml(path, DOCUMENT)
+        assert path.read_text() == yaml_io.dump(DOCUMENT)
+        assert read_yaml(path) == DOCUMENT